@@ -0,0 +1,6 @@
+"""
+Benchmarks for hot paths of maprdb package.
+Each module can be run on its own, e.g.:
+
+    python3 -m benchmarks.conversion
+"""
@@ -0,0 +1,59 @@
+"""
+Benchmark of binary values conversion on documents with 1 MB blobs.
+Compares copies of whole ranges with element by element copies
+of Java byte arrays.
+
+    python3 -m benchmarks.binary
+"""
+import argparse
+import os
+
+import jpype
+
+from maprdb.utils import java_to_python_cast, python_to_java_cast
+from benchmarks.common import start_jvm, measure
+
+
+def legacy_bytes_to_java(value):
+    """
+    Binary value copied to Java array element by element.
+    """
+    java_array = jpype.JArray(jpype.JByte)(len(value))
+    for i, b in enumerate(value):
+        java_array[i] = b - 256 if b > 127 else b
+    return jpype.java.nio.ByteBuffer.wrap(java_array)
+
+
+def legacy_bytes_to_python(java_buffer):
+    """
+    Java byte buffer copied to python element by element.
+    """
+    return bytes(java_buffer.get(i) & 0xFF for i in range(java_buffer.position(), java_buffer.limit()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=5)
+    parser.add_argument("--size", type=int, default=1024 * 1024, help="size of a blob in bytes")
+    args = parser.parse_args()
+
+    start_jvm()
+    blobs = [os.urandom(args.size) for _ in range(args.documents)]
+    writable_blobs = [bytearray(blob) for blob in blobs]
+    java_buffers = [python_to_java_cast(blob) for blob in blobs]
+
+    print("binary conversion, {} bytes per blob".format(args.size))
+    print("  bytes to Java, before (per byte):           {:10.1f} blobs/s".format(
+        measure(legacy_bytes_to_java, blobs, repeat=1)))
+    print("  bytes to Java, after (one copy):            {:10.1f} blobs/s".format(
+        measure(python_to_java_cast, blobs)))
+    print("  bytearray to Java, after (one copy):        {:10.1f} blobs/s".format(
+        measure(python_to_java_cast, writable_blobs)))
+    print("  Java to python, before (per byte):          {:10.1f} blobs/s".format(
+        measure(legacy_bytes_to_python, java_buffers, repeat=1)))
+    print("  Java to python, after (one copy):           {:10.1f} blobs/s".format(
+        measure(java_to_python_cast, java_buffers)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark of writing documents: Table.insert_or_replace per document
+against Table.bulk_writer. Requires MapRDB cluster.
+
+    python3 -m benchmarks.bulk_write --table /tmp/benchmark_bulk_write
+"""
+import argparse
+import time
+
+import maprdb
+from benchmarks.common import generate_document
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--table", default="/tmp/benchmark_bulk_write")
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    connection = maprdb.connect()
+    if connection.exists(args.table):
+        connection.delete(args.table)
+    table = connection.create(args.table)
+    documents = []
+    for i in range(args.documents):
+        document = generate_document(args.width, depth=1, index=i)
+        document["_id"] = "doc{}".format(i)
+        documents.append(maprdb.Document(document))
+
+    try:
+        started = time.perf_counter()
+        for document in documents:
+            table.insert_or_replace(document)
+        table.flush()
+        one_by_one = len(documents) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with table.bulk_writer(batch_size=args.batch_size) as writer:
+            for document in documents:
+                writer.insert_or_replace(document)
+        bulk = len(documents) / (time.perf_counter() - started)
+    finally:
+        table.close()
+        connection.delete(args.table)
+
+    print("Writing {} documents of {} fields".format(len(documents), args.width))
+    print("  insert_or_replace: {:10.1f} docs/s".format(one_by_one))
+    print("  bulk_writer:       {:10.1f} docs/s".format(bulk))
+
+
+if __name__ == "__main__":
+    main()
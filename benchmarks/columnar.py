@@ -0,0 +1,62 @@
+"""
+Benchmark of reading a wide numeric projection: Table.find with a dict per row
+pivoted into NumPy arrays, against Table.find_columnar.
+Documents are Java maps served by in-process fake table, cluster is not required.
+
+    python3 -m benchmarks.columnar
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy
+
+from maprdb import Table
+from maprdb.utils import python_to_java_cast
+from benchmarks.common import FakeJavaTable, start_jvm
+
+
+def rows_then_pivot(table, columns):
+    documents = list(table.find(columns=columns))
+    return {column: numpy.array([document.get(column) for document in documents]) for column in columns}
+
+
+def columnar(table, columns):
+    return table.find_columnar(columns)
+
+
+def run(function, table, columns):
+    started = time.perf_counter()
+    function(table, columns)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    function(table, columns)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=50000)
+    parser.add_argument("--width", type=int, default=20)
+    args = parser.parse_args()
+
+    start_jvm()
+    columns = ["field_{}".format(i) for i in range(args.width)]
+    documents = []
+    for i in range(args.documents):
+        document = {column: i * j if j % 2 else i / (j + 1.0) for j, column in enumerate(columns)}
+        document["_id"] = "doc{}".format(i)
+        documents.append(python_to_java_cast(document))
+    table = Table(FakeJavaTable(documents, key=lambda document: document.get("_id")))
+
+    print("Projection of {} numeric columns, {} documents".format(args.width, args.documents))
+    for name, function in [("find + pivot", rows_then_pivot), ("find_columnar", columnar)]:
+        elapsed, peak = run(function, table, columns)
+        print("  {:14s} {:8.3f} s, peak {:8.1f} MiB".format(name, elapsed, peak / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Helpers shared by benchmarks: JVM start, synthetic documents and timing.
+"""
+import datetime
+import math
+import os
+import time
+
+import jpype
+
+from maprdb import JARS_LIST
+
+
+def start_jvm():
+    """
+    Starts JVM with maprdb dependencies on class path.
+    Cluster is not required, only Java classes are used.
+    """
+    if not jpype.isJVMStarted():
+        jpype.startJVM(jpype.getDefaultJVMPath(),
+                       "-Djava.class.path={}".format(os.pathsep.join(JARS_LIST)))
+
+
+def generate_document(width=10, depth=2, index=0, size=None):
+    """
+    Generates synthetic document with scalar, date, list and nested dict values.
+    :param width: number of fields on every level
+    :param depth: number of nested levels
+    :param index: number which makes generated documents different
+    :param size: length of string values, short strings by default
+    :returns: dict
+    """
+    document = {}
+    for i in range(width):
+        kind = i % 5
+        key = "field_{}".format(i)
+        if kind == 0:
+            document[key] = index * width + i
+        elif kind == 1:
+            document[key] = (index + i) / 3.0
+        elif kind == 2:
+            document[key] = "value_{}_{}".format(index, i)
+            if size:
+                document[key] = document[key].ljust(size, "x")[:size]
+        elif kind == 3:
+            document[key] = datetime.datetime(2015, 9, 10, 12, 27, i % 60)
+        else:
+            document[key] = [index, i, "item_{}".format(i)]
+    if depth > 1:
+        document["nested"] = generate_document(width, depth - 1, index, size)
+    return document
+
+
+def generate_timestamps_document(width=50, index=0):
+    """
+    Generates time series document, which values are mostly timestamps, with a few dates and times.
+    :param width: number of timestamp values
+    :param index: number which makes generated documents different
+    :returns: dict
+    """
+    start = datetime.datetime(2015, 9, 10, 12, 27, 35, 123000) + datetime.timedelta(hours=index)
+    return {
+        "day": start.date(),
+        "opened": start.time(),
+        "samples": [{"at": start + datetime.timedelta(seconds=i, microseconds=i), "value": i}
+                    for i in range(width)],
+    }
+
+
+def measure(function, items, repeat=3):
+    """
+    Calls function for every item and reports the best of several runs.
+    :param function: function of one argument
+    :param items: list of arguments
+    :param repeat: number of runs
+    :returns: operations per second
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            function(item)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(items) / best if best else float("inf")
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile.
+    :param sorted_values: non-empty sorted list
+    :param fraction: percentile as a fraction, e.g. 0.99
+    """
+    index = int(math.ceil(fraction * len(sorted_values))) - 1
+    return sorted_values[min(max(index, 0), len(sorted_values) - 1)]
+
+
+def measure_latencies(function, items):
+    """
+    Calls function for every item and times every call.
+    :param function: function of one argument
+    :param items: list of arguments
+    :returns: dictionary with number of operations, throughput in operations
+    per second and latency percentiles in microseconds
+    """
+    latencies = []
+    timer = time.perf_counter
+    started = timer()
+    for item in items:
+        call_started = timer()
+        function(item)
+        latencies.append(timer() - call_started)
+    return summarize(latencies, timer() - started)
+
+
+def summarize(latencies, elapsed):
+    """
+    :param latencies: list of durations of single operations, seconds
+    :param elapsed: wall time of all operations, seconds
+    :returns: dictionary of statistics, see measure_latencies
+    """
+    latencies = sorted(latencies)
+    microseconds = [latency * 1e6 for latency in latencies]
+    return {
+        "operations": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else float("inf"),
+        "latency_us": {
+            "mean": sum(microseconds) / len(microseconds),
+            "p50": percentile(microseconds, 0.50),
+            "p90": percentile(microseconds, 0.90),
+            "p99": percentile(microseconds, 0.99),
+            "max": microseconds[-1],
+        },
+    }
+
+
+class FakeJavaTable(object):
+    """
+    In-process stand-in of com.mapr.db.Table, which stores python dicts
+    and sleeps to simulate a round trip to the server.
+    """
+    def __init__(self, documents=(), latency=0.0, key=None):
+        key = key or (lambda document: document['_id'])
+        self.documents = {key(document): document for document in documents}
+        self.latency = latency
+
+    def findById(self, key, columns=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.documents.get(key)
+
+    def find(self, columns=None):
+        return FakeDocumentStream(list(self.documents.values()))
+
+
+class FakeDocumentStream(object):
+    """
+    Stand-in of com.mapr.db.DocumentStream over a list of python dicts.
+    """
+    def __init__(self, documents):
+        self.documents = documents
+
+    def iterator(self):
+        return FakeIterator(self.documents)
+
+    def close(self):
+        pass
+
+
+class FakeIterator(object):
+    def __init__(self, items):
+        self.items = items
+        self.position = 0
+
+    def hasNext(self):
+        return self.position < len(self.items)
+
+    def next(self):
+        self.position += 1
+        return self.items[self.position - 1]
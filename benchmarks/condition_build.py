@@ -0,0 +1,44 @@
+"""
+Benchmark of building $in conditions of growing size:
+native "in" condition against OR of equality clauses.
+
+    python3 -m benchmarks.condition_build
+"""
+import argparse
+import time
+
+import maprdb
+from maprdb import conditions
+from maprdb.conditions import Condition
+from benchmarks.common import start_jvm
+
+
+def build_time(size, repeat):
+    values = ["key{}".format(i) for i in range(size)]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        Condition({"_id": {"$in": values}}).java_condition
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start_jvm()
+    maprdb.connect()
+    native = conditions.native_in_supported()
+    print("Build time of $in condition, native 'in' is {}available".format("" if native else "not "))
+    print("  {:>8s} {:>12s} {:>12s}".format("values", "expanded, ms", "native, ms"))
+    for size in [int(size) for size in args.sizes.split(",")]:
+        conditions._native_in = False
+        expanded = build_time(size, args.repeat)
+        conditions._native_in = native
+        native_time = build_time(size, args.repeat) if native else float("nan")
+        print("  {:8d} {:12.2f} {:12.2f}".format(size, expanded * 1000, native_time * 1000))
+
+
+if __name__ == "__main__":
+    main()
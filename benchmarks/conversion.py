@@ -0,0 +1,69 @@
+"""
+Benchmark of java_to_python_cast on synthetic nested documents.
+Compares the cached class dispatch with the reflection walk done for every value.
+
+    python3 -m benchmarks.conversion
+"""
+import argparse
+import datetime
+
+from maprdb.utils import is_based_on_class, java_to_python_cast, python_to_java_cast
+from benchmarks.common import start_jvm, generate_document, measure
+
+
+def legacy_java_date_to_python(value):
+    """
+    Date conversion as it was before epoch conversion: seven getters called for every value.
+    """
+    return datetime.datetime(1900 + value.getYear(), 1 + value.getMonth(),
+                             value.getDate(), value.getHours(),
+                             value.getMinutes(), value.getSeconds(), int(value.getNanos()/1000))
+
+
+def legacy_java_to_python_cast(value):
+    """
+    java_to_python_cast as it was before the class dispatch cache:
+    class hierarchy is walked for every converted value.
+    """
+    java_class = value.__javaclass__ if hasattr(value, '__javaclass__') else None
+
+    if is_based_on_class(java_class, 'java.lang.Number'):
+        return value.value
+    elif is_based_on_class(java_class, 'java.util.Date'):
+        return legacy_java_date_to_python(value)
+    elif is_based_on_class(java_class, 'java.util.List'):
+        new_value = []
+        it = value.iterator()
+        while it.hasNext():
+            new_value.append(legacy_java_to_python_cast(it.next()))
+        return new_value
+    elif is_based_on_class(java_class, 'java.util.Map'):
+        new_value = {}
+        it = value.keySet().iterator()
+        while it.hasNext():
+            k = legacy_java_to_python_cast(it.next())
+            new_value[k] = legacy_java_to_python_cast(value.get(k))
+        return new_value
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    args = parser.parse_args()
+
+    start_jvm()
+    java_documents = [python_to_java_cast(generate_document(args.width, args.depth, i))
+                      for i in range(args.documents)]
+
+    before = measure(legacy_java_to_python_cast, java_documents)
+    after = measure(java_to_python_cast, java_documents)
+    print("java_to_python_cast, {} fields x {} levels".format(args.width, args.depth))
+    print("  before (reflection per value): {:10.1f} docs/s".format(before))
+    print("  after (class dispatch cache):  {:10.1f} docs/s".format(after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Benchmark of reading documents: per-field conversion through JNI
+against the conversion of whole document through OJAI JSON string.
+
+    python3 -m benchmarks.json_conversion
+"""
+import argparse
+
+import maprdb
+from maprdb.document import Document
+from benchmarks.common import start_jvm, generate_document, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    args = parser.parse_args()
+
+    start_jvm()
+    maprdb.connect()
+    java_documents = [Document(generate_document(args.width, args.depth, i))._get_java_object()
+                      for i in range(args.documents)]
+
+    per_field = measure(Document.python_document_from_java, java_documents)
+    json_string = measure(Document.python_document_from_json, java_documents)
+    print("Java document to python, {} fields x {} levels".format(args.width, args.depth))
+    print("  per-field conversion: {:10.1f} docs/s".format(per_field))
+    print("  JSON conversion:      {:10.1f} docs/s".format(json_string))
+
+
+if __name__ == "__main__":
+    main()
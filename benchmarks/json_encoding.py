@@ -0,0 +1,63 @@
+"""
+Benchmark of writing documents: Java document built field by field
+against one built from OJAI JSON string in one call.
+With --table, documents are also written to MapRDB cluster both ways.
+
+    python3 -m benchmarks.json_encoding
+    python3 -m benchmarks.json_encoding --table /tmp/benchmark_json_encoding
+"""
+import argparse
+import time
+
+import maprdb
+from maprdb.document import Document
+from benchmarks.common import start_jvm, generate_document, measure
+
+
+def write_rate(table, documents, json_encoding):
+    started = time.perf_counter()
+    for document in documents:
+        table.insert_or_replace(document, json_encoding=json_encoding)
+    table.flush()
+    return len(documents) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--width", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--table", default=None)
+    args = parser.parse_args()
+
+    start_jvm()
+    connection = maprdb.connect()
+    documents = []
+    for i in range(args.documents):
+        document = generate_document(args.width, args.depth, i)
+        document["_id"] = "doc{}".format(i)
+        documents.append(Document(document))
+
+    per_field = measure(lambda document: document._get_java_object(), documents)
+    json_string = measure(Document.java_document_from_json, documents)
+    print("Python document to Java, {} fields x {} levels".format(args.width, args.depth))
+    print("  per-field set():  {:10.1f} docs/s".format(per_field))
+    print("  JSON string:      {:10.1f} docs/s".format(json_string))
+
+    if args.table:
+        if connection.exists(args.table):
+            connection.delete(args.table)
+        table = connection.create(args.table)
+        try:
+            per_field = write_rate(table, documents, json_encoding=False)
+            json_string = write_rate(table, documents, json_encoding=True)
+        finally:
+            table.close()
+            connection.delete(args.table)
+        print("insert_or_replace into {}".format(args.table))
+        print("  per-field set():  {:10.1f} docs/s".format(per_field))
+        print("  JSON string:      {:10.1f} docs/s".format(json_string))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark of reading two fields of wide documents: eager conversion
+of whole document against maprdb.document.LazyDocument.
+
+    python3 -m benchmarks.lazy_document
+"""
+import argparse
+import tracemalloc
+
+import maprdb
+from maprdb.document import Document, LazyDocument
+from benchmarks.common import start_jvm, generate_document, measure
+
+
+def read_two_fields(convert):
+    def read(java_document):
+        document = convert(java_document)
+        return document["field_0"], document["field_2"]
+    return read
+
+
+def peak_memory(convert, java_documents):
+    tracemalloc.start()
+    documents = [convert(java_document) for java_document in java_documents]
+    for document in documents:
+        document["field_0"], document["field_2"]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--width", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=2)
+    args = parser.parse_args()
+
+    start_jvm()
+    maprdb.connect()
+    java_documents = [Document(generate_document(args.width, args.depth, i))._get_java_object()
+                      for i in range(args.documents)]
+
+    eager = measure(read_two_fields(Document.python_document_from_java), java_documents)
+    lazy = measure(read_two_fields(LazyDocument), java_documents)
+    eager_memory = peak_memory(Document.python_document_from_java, java_documents)
+    lazy_memory = peak_memory(LazyDocument, java_documents)
+    print("Reading 2 of {} fields x {} levels".format(args.width, args.depth))
+    print("  eager Document: {:10.1f} docs/s, {:8.1f} KiB peak".format(eager, eager_memory / 1024.0))
+    print("  LazyDocument:   {:10.1f} docs/s, {:8.1f} KiB peak".format(lazy, lazy_memory / 1024.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark of Table.find_by_id with list of keys against one call per key.
+Runs against in-process fake table, cluster and JVM are not required.
+
+    python3 -m benchmarks.multi_get
+"""
+import argparse
+import time
+
+from maprdb import Table
+from benchmarks.common import FakeJavaTable, generate_document
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.001, help="simulated round trip, seconds")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--parallelism", type=int, default=8)
+    args = parser.parse_args()
+
+    documents = []
+    for i in range(args.keys):
+        document = generate_document(width=10, depth=1, index=i)
+        document["_id"] = "key{}".format(i)
+        documents.append(document)
+    table = Table(FakeJavaTable(documents, latency=args.latency))
+    keys = [document["_id"] for document in documents]
+
+    started = time.perf_counter()
+    for key in keys:
+        table.find_by_id(key)
+    one_by_one = len(keys) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    table.find_by_id(keys, batch_size=args.batch_size, parallelism=args.parallelism)
+    multi_get = len(keys) / (time.perf_counter() - started)
+
+    print("find_by_id, {} keys, {:.1f} ms latency".format(len(keys), args.latency * 1000))
+    print("  one call per key:  {:10.1f} lookups/s".format(one_by_one))
+    print("  batched multi-get: {:10.1f} lookups/s".format(multi_get))
+
+
+if __name__ == "__main__":
+    main()
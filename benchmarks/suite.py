@@ -0,0 +1,292 @@
+"""
+Benchmark suite of the hot paths: conversion between python and Java values,
+condition and mutation building, scans and point operations.
+Throughput and latency percentiles of every case are written as JSON,
+so results of different runs can be compared.
+
+    python3 -m benchmarks --output results.json
+    python3 -m benchmarks --baseline results.json --max-regression 0.1
+
+Cases which need Java classes are skipped when JVM with maprdb jars can't be started.
+Table cases run against in-process maprdb.backends.MemoryBackend unless --cluster is set.
+"""
+import argparse
+import datetime
+import json
+import logging
+import platform
+import sys
+import time
+
+import maprdb
+from maprdb import Condition, Document, Mutation, Table
+from maprdb.backends import MemoryBackend
+from maprdb.utils import python_to_java_cast, java_to_python_cast
+from benchmarks.common import generate_document, generate_timestamps_document, measure_latencies, summarize
+
+logger = logging.getLogger(__name__)
+
+
+class Context(object):
+    """
+    Data shared by benchmark cases.
+    """
+    def __init__(self, args):
+        self.args = args
+        self.documents = [generate_document(args.width, args.depth, i, args.size)
+                          for i in range(args.operations)]
+        self.keys = ["doc{:08d}".format(i) for i in range(args.operations)]
+        self.table = None
+        self._java_documents = None
+        self.timestamps_documents = [generate_timestamps_document(args.width, i) for i in range(args.operations)]
+
+    @property
+    def java_documents(self):
+        if self._java_documents is None:
+            self._java_documents = [python_to_java_cast(document) for document in self.documents]
+        return self._java_documents
+
+    def conditions(self):
+        return [[{"field_0": {"$between": [i, i + 100]}, "field_2": {"$ne": "value"}},
+                 {"field_1": {"$in": [i, i + 1, i + 2]}},
+                 {"nested.field_0": {"$exists": True}}]
+                for i in range(len(self.documents))]
+
+    def mutations(self):
+        return [[{"field_0": {"$inc": 1}},
+                 {"field_2": {"$set": "updated_{}".format(i)}},
+                 {"field_4": {"$append": [i]}}]
+                for i in range(len(self.documents))]
+
+
+def python_to_java(context):
+    return measure_latencies(python_to_java_cast, context.documents)
+
+
+def java_to_python(context):
+    return measure_latencies(java_to_python_cast, context.java_documents)
+
+
+def timestamps_to_java(context):
+    return measure_latencies(python_to_java_cast, context.timestamps_documents)
+
+
+def timestamps_to_python(context):
+    java_documents = [python_to_java_cast(document) for document in context.timestamps_documents]
+    return measure_latencies(java_to_python_cast, java_documents)
+
+
+def document_to_java(context):
+    documents = [Document(document) for document in context.documents]
+    return measure_latencies(lambda document: document._get_java_object(), documents)
+
+
+def document_from_json(context):
+    documents = [Document(document) for document in context.documents]
+    return measure_latencies(Document.java_document_from_json, documents)
+
+
+def condition_build(context):
+    return measure_latencies(lambda shorthand: Condition(shorthand).java_condition, context.conditions())
+
+
+def mutation_parse(context):
+    return measure_latencies(Mutation, context.mutations())
+
+
+def mutation_build(context):
+    return measure_latencies(lambda shorthand: Mutation(shorthand).build().java_mutation, context.mutations())
+
+
+def insert_or_replace(context):
+    documents = [Document(dict(document, _id=key)) for key, document in zip(context.keys, context.documents)]
+    stats = measure_latencies(context.table.insert_or_replace, documents)
+    context.table.flush()
+    return stats
+
+
+def find_by_id(context):
+    return measure_latencies(context.table.find_by_id, context.keys)
+
+
+def scan(context):
+    latencies = []
+    timer = time.perf_counter
+    started = last = timer()
+    for _ in context.table.find():
+        now = timer()
+        latencies.append(now - last)
+        last = now
+    return summarize(latencies, last - started)
+
+
+def update(context):
+    mutations = [Mutation(shorthand) for shorthand in context.mutations()]
+    stats = measure_latencies(lambda item: context.table.update(*item), list(zip(context.keys, mutations)))
+    context.table.flush()
+    return stats
+
+
+def delete(context):
+    stats = measure_latencies(context.table.delete, context.keys)
+    context.table.flush()
+    return stats
+
+
+# (name, requires JVM, requires table, function), table cases depend on the order
+CASES = [
+    ("python_to_java_cast", True, False, python_to_java),
+    ("java_to_python_cast", True, False, java_to_python),
+    ("timestamps_to_java", True, False, timestamps_to_java),
+    ("timestamps_to_python", True, False, timestamps_to_python),
+    ("document_to_java", True, False, document_to_java),
+    ("document_from_json", True, False, document_from_json),
+    ("condition_build", True, False, condition_build),
+    ("mutation_parse", False, False, mutation_parse),
+    ("mutation_build", True, False, mutation_build),
+    ("insert_or_replace", False, True, insert_or_replace),
+    ("find_by_id", False, True, find_by_id),
+    ("scan", False, True, scan),
+    ("update", False, True, update),
+    ("delete", False, True, delete),
+]
+
+
+def _connect(args):
+    """
+    :returns: None if JVM with maprdb classes is available, reason otherwise
+    """
+    try:
+        maprdb.connect(mapr_home=args.mapr_home)
+        return None
+    except Exception as e:
+        if args.cluster:
+            raise
+        return "JVM is not available: {}".format(e)
+
+
+def _open_table(args):
+    if args.cluster:
+        connection = maprdb.connect()
+        if connection.exists(args.table):
+            connection.delete(args.table)
+        return connection.create(args.table)
+    return Table(MemoryBackend(latency=args.latency).create_table(args.table))
+
+
+def run(args):
+    """
+    Runs selected benchmark cases.
+    :returns: dictionary with "meta" and "cases" entries
+    """
+    selected = set(args.cases.split(",")) if args.cases else None
+    unknown = (selected or set()) - {name for name, _, _, _ in CASES}
+    if unknown:
+        raise ValueError("Unknown benchmark cases: {}".format(", ".join(sorted(unknown))))
+
+    jvm_missing = _connect(args)
+    context = Context(args)
+    results = {}
+    try:
+        for name, requires_jvm, requires_table, function in CASES:
+            if selected is not None and name not in selected:
+                continue
+            if requires_jvm and jvm_missing:
+                results[name] = {"skipped": jvm_missing}
+                continue
+            if requires_table and context.table is None:
+                context.table = _open_table(args)
+            logger.info("Running %s", name)
+            results[name] = function(context)
+    finally:
+        if context.table is not None:
+            context.table.close()
+            if args.cluster:
+                maprdb.connect().delete(args.table)
+
+    parameters = {key: value for key, value in vars(args).items() if key not in ("baseline", "output")}
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "cluster" if args.cluster else "memory",
+            "jvm": jvm_missing is None,
+            "parameters": parameters,
+        },
+        "cases": results,
+    }
+
+
+def compare(results, baseline, max_regression):
+    """
+    Compares throughput of cases with a previous run.
+    :param results: results of run()
+    :param baseline: results of a previous run()
+    :param max_regression: allowed relative drop of throughput, e.g. 0.1
+    :returns: names of cases, which throughput dropped more than allowed
+    """
+    regressions = []
+    for name, stats in results["cases"].items():
+        previous = baseline["cases"].get(name, {})
+        if "throughput" not in stats or not previous.get("throughput"):
+            continue
+        change = stats["throughput"] / previous["throughput"] - 1
+        if change < -max_regression:
+            regressions.append(name)
+        print("  {:20s} {:+8.1%}{}".format(name, change, "  REGRESSION" if name in regressions else ""))
+    return regressions
+
+
+def print_results(results):
+    print("{:20s} {:>10s} {:>14s} {:>10s} {:>10s} {:>10s}".format(
+        "case", "ops", "ops/s", "p50, us", "p99, us", "max, us"))
+    for name, stats in results["cases"].items():
+        if "skipped" in stats:
+            print("{:20s} skipped: {}".format(name, stats["skipped"]))
+            continue
+        latency = stats["latency_us"]
+        print("{:20s} {:10d} {:14.1f} {:10.1f} {:10.1f} {:10.1f}".format(
+            name, stats["operations"], stats["throughput"], latency["p50"], latency["p99"], latency["max"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=1000, help="documents and operations per case")
+    parser.add_argument("--width", type=int, default=10, help="fields on every level of documents")
+    parser.add_argument("--depth", type=int, default=2, help="nested levels of documents")
+    parser.add_argument("--size", type=int, default=None, help="length of string values of documents")
+    parser.add_argument("--cases", default=None, help="comma separated names of cases, all by default")
+    parser.add_argument("--cluster", action="store_true", help="run table cases against MapRDB cluster")
+    parser.add_argument("--mapr-home", default=None)
+    parser.add_argument("--table", default="/tmp/benchmark_suite")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated round trip of in-process table, seconds")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file, '-' for stdout")
+    parser.add_argument("--baseline", default=None, help="JSON file of a previous run to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.1,
+                        help="allowed relative drop of throughput against baseline")
+    args = parser.parse_args(argv)
+    if args.operations < 1:
+        parser.error("--operations should be positive")
+
+    results = run(args)
+    print_results(results)
+    if args.output == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        print("Throughput against {}:".format(args.baseline))
+        if compare(results, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
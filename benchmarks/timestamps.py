@@ -0,0 +1,93 @@
+"""
+Benchmark of date and time conversions on time series documents.
+Compares epoch conversion, which makes one or two calls to Java per value,
+with the deprecated getters and constructors of java.util.Date, which make seven.
+
+    python3 -m benchmarks.timestamps
+"""
+import argparse
+import datetime
+
+import jpype
+
+from maprdb import utils
+from maprdb.utils import java_to_python_cast, python_to_java_cast
+from benchmarks.common import start_jvm, generate_timestamps_document, measure
+from benchmarks.conversion import legacy_java_date_to_python
+
+
+def legacy_python_datetime_to_java(value):
+    return jpype.java.sql.Timestamp(value.year - 1900, value.month - 1, value.day,
+                                    value.hour, value.minute, value.second, 1000*value.microsecond)
+
+
+def legacy_python_date_to_java(value):
+    return jpype.java.sql.Date(value.year - 1900, value.month - 1, value.day)
+
+
+def legacy_python_time_to_java(value):
+    return jpype.java.sql.Time(value.hour, value.minute, value.second)
+
+
+def legacy_java_sql_date_to_python(value):
+    return datetime.date(1900 + value.getYear(), 1 + value.getMonth(), value.getDate())
+
+
+def legacy_java_sql_time_to_python(value):
+    return datetime.time(value.getHours(), value.getMinutes(), value.getSeconds())
+
+
+LEGACY_PYTHON_CONVERTERS = {
+    datetime.datetime: legacy_python_datetime_to_java,
+    datetime.date: legacy_python_date_to_java,
+    datetime.time: legacy_python_time_to_java,
+}
+
+LEGACY_JAVA_CONVERTERS = {
+    "java.sql.Timestamp": legacy_java_date_to_python,
+    "java.sql.Date": legacy_java_sql_date_to_python,
+    "java.sql.Time": legacy_java_sql_time_to_python,
+}
+
+
+def measure_converters(python_converters, java_converters, documents, java_documents):
+    """
+    Measures both directions with the converters registered instead of the current ones.
+    :returns: (python to Java, Java to python) documents per second
+    """
+    saved_python = {t: utils._PYTHON_TYPE_CONVERTERS[t] for t in python_converters}
+    saved_java = {name: utils._JAVA_CLASS_CONVERTERS[name] for name in java_converters}
+    try:
+        for python_type, converter in python_converters.items():
+            utils.register_python_converter(python_type, converter)
+        for class_name, converter in java_converters.items():
+            utils.register_java_converter(class_name, converter)
+        return measure(python_to_java_cast, documents), measure(java_to_python_cast, java_documents)
+    finally:
+        for python_type, converter in saved_python.items():
+            utils.register_python_converter(python_type, converter)
+        for class_name, converter in saved_java.items():
+            utils.register_java_converter(class_name, converter)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--width", type=int, default=50, help="number of timestamps in a document")
+    args = parser.parse_args()
+
+    start_jvm()
+    documents = [generate_timestamps_document(args.width, i) for i in range(args.documents)]
+    java_documents = [python_to_java_cast(document) for document in documents]
+
+    before = measure_converters(LEGACY_PYTHON_CONVERTERS, LEGACY_JAVA_CONVERTERS, documents, java_documents)
+    after = measure_converters({}, {}, documents, java_documents)
+    print("date and time conversion, {} timestamps per document".format(args.width))
+    print("  python to Java, before (deprecated constructors): {:10.1f} docs/s".format(before[0]))
+    print("  python to Java, after (epoch millis):             {:10.1f} docs/s".format(after[0]))
+    print("  Java to python, before (seven getters):           {:10.1f} docs/s".format(before[1]))
+    print("  Java to python, after (epoch millis and nanos):   {:10.1f} docs/s".format(after[1]))
+
+
+if __name__ == "__main__":
+    main()
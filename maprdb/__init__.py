@@ -9,7 +9,8 @@ import os
 JARS_LIST = glob.glob(os.path.join(os.path.dirname(__file__), "dependency", "*.jar"))
 
 from .connection import Connection, connect
-from .conditions import Condition
+from .conditions import Condition, Param
 from .mutation import Mutation
 from .tables import Table
-from .document import Document
+from .async_tables import AsyncTable
+from .document import Document, LazyDocument
@@ -0,0 +1,188 @@
+import asyncio
+import functools
+
+from maprdb.utils import shared_executor
+
+
+class AsyncTable(object):
+    """
+    asyncio wrapper of maprdb.tables.Table.
+    Blocking calls of the table run on threads of maprdb.utils.shared_executor,
+    so they don't stall the event loop. At most concurrency calls of the table run at once.
+
+    This class is usually not instantiated by user,
+    but returned from maprdb.connection.Connection.get_async:
+
+    >>> table = connection.get_async("/tmp/test_table", concurrency=16)
+    >>> document = await table.find_by_id("doc1")
+    >>> async for document in table.find(columns=["count"]):
+    ...     print(document)
+    >>> await table.close()
+    """
+    def __init__(self, table, concurrency=8):
+        """
+        :param table: maprdb.tables.Table class instance
+        :param concurrency: maximum number of table calls running at once
+        """
+        self.table = table
+        self.concurrency = concurrency
+        # created in the running event loop on first call
+        self._semaphore = None
+
+    async def _run(self, function, *args, **kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(shared_executor(), functools.partial(function, *args, **kwargs))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def find_by_id(self, key, columns=None, **kwargs):
+        """
+        Awaitable maprdb.tables.Table.find_by_id.
+        """
+        return await self._run(self.table.find_by_id, key, columns, **kwargs)
+
+    def find(self, columns=None, chunk_size=100, **kwargs):
+        """
+        Asynchronous iterator over all documents in the table, see maprdb.tables.Table.find.
+
+        :param chunk_size: number of documents read by a worker thread at once.
+        Only one chunk is read ahead of the consumer.
+        :returns: maprdb.async_tables.AsyncDocumentIterator class instance
+        """
+        return AsyncDocumentIterator(self, functools.partial(self.table.find, columns, **kwargs), chunk_size)
+
+    def find_by_condition(self, condition, columns=None, chunk_size=100, **kwargs):
+        """
+        Asynchronous iterator over documents that satisfy the condition,
+        see maprdb.tables.Table.find_by_condition.
+
+        :param chunk_size: number of documents read by a worker thread at once.
+        Only one chunk is read ahead of the consumer.
+        :returns: maprdb.async_tables.AsyncDocumentIterator class instance
+        """
+        return AsyncDocumentIterator(self, functools.partial(self.table.find_by_condition, condition, columns,
+                                                             **kwargs), chunk_size)
+
+    async def insert(self, doc, key=None, **kwargs):
+        """
+        Awaitable maprdb.tables.Table.insert.
+        """
+        return await self._run(self.table.insert, doc, key=key, **kwargs)
+
+    async def insert_or_replace(self, doc, key=None, **kwargs):
+        """
+        Awaitable maprdb.tables.Table.insert_or_replace.
+        """
+        return await self._run(self.table.insert_or_replace, doc, key=key, **kwargs)
+
+    async def update(self, key, mutation, **kwargs):
+        """
+        Awaitable maprdb.tables.Table.update.
+        """
+        return await self._run(self.table.update, key, mutation, **kwargs)
+
+    async def update_all(self, values, **kwargs):
+        """
+        Awaitable maprdb.tables.Table.update_all.
+        """
+        return await self._run(self.table.update_all, values, **kwargs)
+
+    async def check_and_mutate(self, key, condition, mutation):
+        """
+        Awaitable maprdb.tables.Table.check_and_mutate.
+        """
+        return await self._run(self.table.check_and_mutate, key, condition, mutation)
+
+    async def check_and_replace(self, key, condition, doc, **kwargs):
+        """
+        Awaitable maprdb.tables.Table.check_and_replace.
+        """
+        return await self._run(self.table.check_and_replace, key, condition, doc, **kwargs)
+
+    async def delete(self, key, **kwargs):
+        """
+        Awaitable maprdb.tables.Table.delete.
+        """
+        return await self._run(self.table.delete, key, **kwargs)
+
+    async def flush(self):
+        """
+        Awaitable maprdb.tables.Table.flush.
+        """
+        return await self._run(self.table.flush)
+
+    async def close(self):
+        """
+        Closes the table.
+        """
+        await self._run(self.table.close)
+
+
+def _read_chunk(iterator, chunk_size):
+    chunk = []
+    for document in iterator:
+        chunk.append(document)
+        if len(chunk) >= chunk_size:
+            break
+    return chunk
+
+
+class AsyncDocumentIterator(object):
+    """
+    Asynchronous iterator over documents of a table scan.
+    Documents are read in chunks on worker threads of maprdb.async_tables.AsyncTable,
+    the next chunk is requested only when the consumer starts processing the current one.
+    """
+    def __init__(self, async_table, open_scan, chunk_size=100):
+        self._async_table = async_table
+        self._open_scan = open_scan
+        self._chunk_size = chunk_size
+        self._iterator = None
+        self._chunk = []
+        self._next_chunk = None
+        self._exhausted = False
+
+    def __aiter__(self):
+        return self
+
+    def _request_chunk(self):
+        self._next_chunk = asyncio.ensure_future(self._async_table._run(_read_chunk, self._iterator,
+                                                                        self._chunk_size))
+
+    async def __anext__(self):
+        if self._iterator is None:
+            self._iterator = await self._async_table._run(self._open_scan)
+            self._request_chunk()
+
+        if not self._chunk:
+            if self._exhausted:
+                raise StopAsyncIteration
+            self._chunk = await self._next_chunk
+            self._chunk.reverse()
+            self._next_chunk = None
+            if len(self._chunk) < self._chunk_size:
+                self._exhausted = True
+            else:
+                self._request_chunk()
+            if not self._chunk:
+                raise StopAsyncIteration
+        return self._chunk.pop()
+
+    async def aclose(self):
+        """
+        Stops the scan, closing the underlying document stream.
+        """
+        self._exhausted = True
+        self._chunk = []
+        if self._next_chunk is not None:
+            await self._next_chunk
+            self._next_chunk = None
+        if self._iterator is not None:
+            await self._async_table._run(self._iterator.close)
@@ -0,0 +1,19 @@
+"""
+Storage backends of maprdb.
+
+A backend manages tables for maprdb.connection.Connection and has methods:
+    get_table(name), create_table(name), delete_table(name), table_exists(name)
+
+Tables returned by a backend are wrapped by maprdb.tables.Table and provide methods of com.mapr.db.Table:
+    findById(key[, columns]), find([condition][, columns]), insert(document), insertOrReplace(document),
+    update(key, mutation), delete(key), flush(), close(), getName()
+where find returns a document stream with iterator() and close() methods.
+
+Backends are pickled to be used by worker processes of maprdb.tables.Table.parallel_scan,
+unpickled backend should give access to the same tables.
+
+Tables with python_values attribute set to True take maprdb.Document, maprdb.Condition and maprdb.Mutation
+objects as they are and return documents as python dicts, values passed to other tables are converted to Java objects.
+"""
+from .java import JavaBackend
+from .memory import MemoryBackend, MemoryTable
@@ -0,0 +1,56 @@
+import logging
+import os
+
+import jpype
+from jpype import startJVM, getDefaultJVMPath, isJVMStarted
+
+from maprdb import JARS_LIST
+from maprdb.utils import handle_java_exceptions
+
+
+logger = logging.getLogger(__name__)
+
+
+class JavaBackend(object):
+    """
+    Backend, which works with MapRDB cluster through Java API.
+    Wrapper for com.mapr.db.MapRDB, starts JVM on creation.
+    """
+    def __init__(self, connection_info):
+        """
+        :param connection_info: dictionary with JVM arguments
+        """
+        self.connection_info = connection_info
+        self._open()
+        self.MapRDB = jpype.JClass("com.mapr.db.MapRDB")
+
+    def __reduce__(self):
+        # JVM is started again, when the backend is passed to another process
+        return JavaBackend, (self.connection_info,)
+
+    @handle_java_exceptions
+    def _open(self):
+        logger.info("Starting JVM")
+        if isJVMStarted():
+            logger.warn("JVM is already started. Only one connection can be opened,"
+                        "previously created connection will be used.")
+            return
+
+        startJVM(getDefaultJVMPath(), *self._jvm_args())
+
+    def _jvm_args(self):
+        args = ["-Djava.class.path={}".format(os.pathsep.join(JARS_LIST))]
+        args += ["-D{}={}".format(key, value) for key,value in self.connection_info.items()]
+        return args
+
+    def get_table(self, name):
+        return self.MapRDB.getTable(name)
+
+    def create_table(self, name):
+        return self.MapRDB.createTable(name)
+
+    def delete_table(self, name):
+        self.MapRDB.deleteTable(name)
+
+    def table_exists(self, name):
+        return self.MapRDB.tableExists(name) == 1
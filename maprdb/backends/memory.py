@@ -0,0 +1,407 @@
+import bisect
+import copy
+import os
+import pickle
+import threading
+import time
+from urllib.parse import quote
+
+from maprdb.utils import MapRDBError
+
+
+class MemoryBackend(object):
+    """
+    Pure python backend, which keeps tables in memory.
+    Stand-in of MapRDB cluster for tests and benchmarks, JVM is not required.
+
+    >>> connection = maprdb.connect(backend=MemoryBackend(path="/tmp/maprdb", latency=0.001))
+    """
+    def __init__(self, path=None, latency=0.0):
+        """
+        :param path: if set, tables are saved to files in this directory on flush and close,
+        and loaded from them when opened.
+        :param latency: artificial delay of every table call, in seconds.
+        """
+        self.path = path
+        self.latency = latency
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # other processes see the tables through their files
+        if self.path is None:
+            raise MapRDBError("MemoryBackend without path can't be shared with other processes")
+        return MemoryBackend, (self.path, self.latency)
+
+    def _file_name(self, name):
+        return os.path.join(self.path, quote(name, safe="") + ".pickle") if self.path else None
+
+    def get_table(self, name):
+        with self._lock:
+            if name not in self._tables:
+                file_name = self._file_name(name)
+                if file_name is None or not os.path.exists(file_name):
+                    raise MapRDBError("Table '{}' does not exist".format(name))
+                self._tables[name] = MemoryTable(file_name=file_name, latency=self.latency, name=name)
+            return self._tables[name]
+
+    def create_table(self, name):
+        with self._lock:
+            if self.table_exists(name):
+                raise MapRDBError("Table '{}' already exists".format(name))
+            table = MemoryTable(file_name=self._file_name(name), latency=self.latency, name=name)
+            table.flush()
+            self._tables[name] = table
+            return table
+
+    def delete_table(self, name):
+        with self._lock:
+            if not self.table_exists(name):
+                raise MapRDBError("Table '{}' does not exist".format(name))
+            self._tables.pop(name, None)
+            file_name = self._file_name(name)
+            if file_name is not None and os.path.exists(file_name):
+                os.remove(file_name)
+
+    def table_exists(self, name):
+        file_name = self._file_name(name)
+        return name in self._tables or (file_name is not None and os.path.exists(file_name))
+
+
+def _get_field(document, path):
+    value = document
+    for name in path.split("."):
+        if not isinstance(value, dict) or name not in value:
+            return _MISSING
+        value = value[name]
+    return value
+
+
+def _set_field(document, path, value):
+    names = path.split(".")
+    for name in names[:-1]:
+        if not isinstance(document.get(name), dict):
+            document[name] = {}
+        document = document[name]
+    document[names[-1]] = value
+
+
+def _delete_field(document, path):
+    names = path.split(".")
+    for name in names[:-1]:
+        document = document.get(name)
+        if not isinstance(document, dict):
+            return
+    document.pop(names[-1], None)
+
+
+class _Missing(object):
+    def __repr__(self):
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+
+def _comparable(a, b):
+    numbers = (int, float)
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) == type(b)
+    if isinstance(a, numbers) and isinstance(b, numbers):
+        return True
+    return type(a) == type(b)
+
+
+def _compare(operator, field_value, value):
+    if field_value is _MISSING or not _comparable(field_value, value):
+        return False
+    if operator in ("$eq", "$equal", "="):
+        return field_value == value
+    if operator in ("$ne", "$neq", "!="):
+        return field_value != value
+    if operator in ("$lt", "$less", "<"):
+        return field_value < value
+    if operator in ("$lte", "$le", "<="):
+        return field_value <= value
+    if operator in ("$gt", "$greater", ">"):
+        return field_value > value
+    if operator in ("$ge", "$gte", ">="):
+        return field_value >= value
+    raise MapRDBError("Unknown operator '{}'".format(operator))
+
+
+def matches(document, shorthand):
+    """
+    Evaluates condition shorthand (see maprdb.conditions.Condition) on python document.
+    """
+    if isinstance(shorthand, list):
+        return any(matches(document, condition) for condition in shorthand)
+
+    for field, field_condition in shorthand.items():
+        operators = list(field_condition.items()) if isinstance(field_condition, dict) else [("=", field_condition)]
+        field_value = _get_field(document, field)
+        for operator, value in operators:
+            if not _matches_operator(field_value, operator, value):
+                return False
+    return True
+
+
+def _matches_operator(field_value, operator, value):
+    if operator == "$between":
+        if not isinstance(value, list) or len(value) != 2:
+            raise MapRDBError("For $between operator value should be list of two elements")
+        return _compare(">=", field_value, value[0]) and _compare("<=", field_value, value[1])
+    elif operator in ("$in", "!$in"):
+        if not isinstance(value, list):
+            raise MapRDBError("For $in operator value should be list")
+        result = any(_compare("=", field_value, item) for item in value)
+        if operator == "!$in":
+            result = field_value is not _MISSING and not result
+        return result
+    elif operator == "$exists":
+        return (field_value is not _MISSING and field_value is not None) == bool(value)
+    elif operator in ("$like", "$matches", "!$like", "!$matches"):
+        raise NotImplementedError("{} is not implemented".format(operator.lstrip("!")))
+    return _compare(operator, field_value, value)
+
+
+def apply_mutation(document, operations):
+    """
+    Applies operations of maprdb.mutation.Mutation to python document in place.
+    """
+    for operator_name, field, value in operations:
+        current = _get_field(document, field)
+        if operator_name == "$set":
+            if current is not _MISSING and not _comparable(current, value):
+                raise MapRDBError("Field '{}' has a value of different type".format(field))
+            _set_field(document, field, copy.deepcopy(value))
+        elif operator_name == "$setOrReplace":
+            _set_field(document, field, copy.deepcopy(value))
+        elif operator_name == "$inc":
+            if current is _MISSING:
+                _set_field(document, field, value)
+            elif isinstance(current, (int, float)) and not isinstance(current, bool):
+                _set_field(document, field, current + value)
+            else:
+                raise MapRDBError("Field '{}' is not numeric".format(field))
+        elif operator_name == "$append":
+            if current is _MISSING:
+                _set_field(document, field, copy.deepcopy(value))
+            elif isinstance(current, list):
+                current.extend(copy.deepcopy(value) if isinstance(value, list) else [value])
+            elif isinstance(current, str) and isinstance(value, str):
+                _set_field(document, field, current + value)
+            else:
+                raise MapRDBError("Can't append to field '{}'".format(field))
+        elif operator_name == "$delete":
+            _delete_field(document, field)
+        else:
+            raise MapRDBError("Unknown operator '{}'".format(operator_name))
+
+
+def project(document, columns):
+    """
+    Returns copy of document with _id and the columns only.
+    """
+    result = {"_id": document["_id"]}
+    for column in columns:
+        value = _get_field(document, column)
+        if value is not _MISSING:
+            _set_field(result, column, copy.deepcopy(value))
+    return result
+
+
+class MemoryTable(object):
+    """
+    In-memory table with methods of com.mapr.db.Table, which stores python dicts.
+    Documents are kept sorted by _id, like in MapRDB.
+
+    This class is usually not instantiated by user, but returned by maprdb.backends.MemoryBackend.
+    It can also be wrapped by maprdb.tables.Table directly:
+
+    >>> table = maprdb.Table(MemoryTable())
+    """
+    python_values = True
+
+    def __init__(self, documents=(), file_name=None, latency=0.0, name=None):
+        """
+        :param documents: initial documents
+        :param file_name: if set, documents are loaded from this file and saved to it on flush and close,
+        if they were changed.
+        :param latency: artificial delay of every call, in seconds.
+        :param name: path of the table in its backend
+        """
+        self.name = name
+        self.file_name = file_name
+        self.latency = latency
+        self._documents = {}
+        self._keys = []
+        self._lock = threading.RLock()
+        # documents differ from the file, a new table is saved on the first flush
+        self._modified = file_name is not None
+
+        if file_name is not None and os.path.exists(file_name):
+            with open(file_name, "rb") as f:
+                self._documents = pickle.load(f)
+            self._keys = sorted(self._documents)
+            self._modified = False
+        for document in documents:
+            self._put(dict(document))
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _put(self, document):
+        key = document.get("_id")
+        if key is None:
+            raise MapRDBError("Document has no _id")
+        if key not in self._documents:
+            bisect.insort(self._keys, key)
+        self._documents[key] = document
+        self._modified = True
+
+    def _condition(self, condition):
+        if condition is None:
+            return None
+        shorthand = condition if isinstance(condition, (dict, list)) else getattr(condition, "_initial", None)
+        if shorthand is None:
+            raise MapRDBError("Memory backend supports only conditions created from shorthand")
+        return shorthand
+
+    def getName(self):
+        return self.name
+
+    def findById(self, key, columns=None):
+        self._wait()
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                return None
+            return project(document, columns) if columns else copy.deepcopy(document)
+
+    def find(self, *args):
+        """
+        Accepts the same arguments as com.mapr.db.Table.find:
+        find(), find(columns), find(condition) or find(condition, columns).
+        """
+        self._wait()
+        condition, columns = None, None
+        if args and isinstance(args[0], (list, tuple)):
+            columns = args[0]
+        elif args:
+            condition = self._condition(args[0])
+            columns = args[1] if len(args) > 1 else None
+
+        with self._lock:
+            documents = [self._documents[key] for key in self._keys]
+        return MemoryDocumentStream(documents, condition, columns)
+
+    def insert(self, document):
+        self._wait()
+        with self._lock:
+            if document.get("_id") in self._documents:
+                raise MapRDBError("Document with _id '{}' already exists".format(document.get("_id")))
+            self._put(copy.deepcopy(dict(document)))
+
+    def insertOrReplace(self, document):
+        self._wait()
+        with self._lock:
+            self._put(copy.deepcopy(dict(document)))
+
+    def update(self, key, mutation):
+        self._wait()
+        with self._lock:
+            document = copy.deepcopy(self._documents.get(key, {"_id": key}))
+            apply_mutation(document, mutation.operations)
+            self._put(document)
+
+    def checkAndMutate(self, key, condition, mutation):
+        self._wait()
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None or not matches(document, self._condition(condition)):
+                return False
+            document = copy.deepcopy(document)
+            apply_mutation(document, mutation.operations)
+            self._put(document)
+            return True
+
+    def checkAndReplace(self, key, condition, document):
+        self._wait()
+        with self._lock:
+            current = self._documents.get(key)
+            if current is None or not matches(current, self._condition(condition)):
+                return False
+            self._put(copy.deepcopy(dict(document)))
+            return True
+
+    def delete(self, key):
+        self._wait()
+        with self._lock:
+            if self._documents.pop(key, None) is not None:
+                del self._keys[bisect.bisect_left(self._keys, key)]
+                self._modified = True
+
+    def flush(self):
+        self._wait()
+        if self.file_name is None:
+            return
+        with self._lock:
+            if not self._modified:
+                return
+            os.makedirs(os.path.dirname(self.file_name) or ".", exist_ok=True)
+            # temporary file is per process, tables of several processes can share the file
+            temporary_name = "{}.{}.tmp".format(self.file_name, os.getpid())
+            with open(temporary_name, "wb") as f:
+                pickle.dump(self._documents, f)
+            os.replace(temporary_name, self.file_name)
+            self._modified = False
+
+    def close(self):
+        self.flush()
+
+
+class MemoryDocumentStream(object):
+    """
+    Document stream of maprdb.backends.MemoryTable, documents are filtered and copied while iterated.
+    """
+    def __init__(self, documents, condition=None, columns=None):
+        self.documents = documents
+        self.condition = condition
+        self.columns = columns
+        self.closed = False
+
+    def iterator(self):
+        return MemoryDocumentIterator(self)
+
+    def close(self):
+        self.closed = True
+
+    def __iter__(self):
+        for document in self.documents:
+            if self.closed:
+                return
+            if self.condition is not None and not matches(document, self.condition):
+                continue
+            yield project(document, self.columns) if self.columns else copy.deepcopy(document)
+
+
+class MemoryDocumentIterator(object):
+    """
+    Iterator with hasNext() and next() methods of java.util.Iterator.
+    """
+    def __init__(self, stream):
+        self._iterator = iter(stream)
+        self._next = _MISSING
+
+    def hasNext(self):
+        if self._next is _MISSING:
+            self._next = next(self._iterator, _MISSING)
+        return self._next is not _MISSING
+
+    def next(self):
+        if not self.hasNext():
+            raise StopIteration
+        value, self._next = self._next, _MISSING
+        return value
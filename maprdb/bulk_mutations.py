@@ -0,0 +1,129 @@
+"""
+Mutations of documents, which keys are streamed from a scan, see maprdb.tables.Table.delete_where
+and maprdb.tables.Table.update_where.
+
+Keys are grouped into batches, which are mutated by JVM-attached worker threads.
+Only a bounded number of batches is submitted ahead of the workers, so memory use
+doesn't depend on the number of matched documents.
+"""
+import collections
+import itertools
+import threading
+import time
+
+from maprdb.utils import call_attached_to_jvm, shared_executor
+
+
+class RateLimiter(object):
+    """
+    Thread safe limiter, which spaces calls of acquire evenly to keep rate of operations.
+    """
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param rate: maximum number of operations per second
+        """
+        self.interval = 1.0 / rate
+        self._clock = clock
+        self._sleep = sleep
+        self._next = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Waits until the next operation is allowed.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._next is None or self._next < now:
+                self._next = now
+            wait = self._next - now
+            self._next += self.interval
+        if wait > 0:
+            self._sleep(wait)
+
+
+class BulkMutationReport(object):
+    """
+    Progress and result of mutations of streamed keys.
+
+    >>> report = table.delete_where({"status": "expired"})
+    >>> report.succeeded, report.failures
+    (1000, {'doc7': MapRDBError(...)})
+    """
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.started = clock()
+        self.processed = 0
+        self.failures = {}
+
+    @property
+    def succeeded(self):
+        return self.processed - len(self.failures)
+
+    @property
+    def elapsed(self):
+        return self._clock() - self.started
+
+    def _add(self, processed, failures):
+        self.processed += processed
+        self.failures.update(failures)
+
+    def __repr__(self):
+        return "BulkMutationReport(processed={}, failed={})".format(self.processed, len(self.failures))
+
+
+def _batches(keys, batch_size):
+    keys = iter(keys)
+    while True:
+        batch = list(itertools.islice(keys, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def mutate_keys(keys, mutate, parallelism=4, batch_size=100, rate=None, progress=None, executor=None):
+    """
+    Calls mutate for every key on worker threads.
+    :param keys: iterable of keys, consumed as batches are submitted
+    :param mutate: function of a key
+    :param parallelism: number of worker threads
+    :param batch_size: number of keys mutated by a worker at once
+    :param rate: maximum number of mutations per second, unlimited if None
+    :param progress: function called with BulkMutationReport after every finished batch
+    :param executor: concurrent.futures.Executor running the batches, maprdb.utils.shared_executor by default
+    :returns: BulkMutationReport
+    """
+    report = BulkMutationReport()
+    limiter = RateLimiter(rate) if rate else None
+
+    def mutate_batch(batch):
+        failures = {}
+        for key in batch:
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                mutate(key)
+            except Exception as e:
+                failures[key] = e
+        return len(batch), failures
+
+    def finish(future):
+        report._add(*future.result())
+        if progress is not None:
+            progress(report)
+
+    if executor is None:
+        executor = shared_executor()
+    pending = collections.deque()
+    try:
+        for batch in _batches(keys, batch_size):
+            # at most parallelism batches are mutated at once, the next batch is read when one of them is done
+            if len(pending) >= parallelism:
+                finish(pending.popleft())
+            pending.append(executor.submit(call_attached_to_jvm, mutate_batch, batch))
+        while pending:
+            finish(pending.popleft())
+    finally:
+        for future in pending:
+            future.cancel()
+    return report
@@ -0,0 +1,186 @@
+import collections
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+import jpype
+
+from maprdb.document import Document
+from maprdb.utils import handle_java_exceptions, shared_executor
+
+
+logger = logging.getLogger(__name__)
+
+
+class BulkWriter(object):
+    """
+    Buffers documents written to the table, converts and writes them in batches
+    on the shared JVM-attached thread pool, one batch at a time in the order of documents.
+
+    This class is usually not instantiated by user, but returned from maprdb.tables.Table.bulk_writer:
+
+    >>> with table.bulk_writer(batch_size=1000) as writer:
+    ...     for doc in docs:
+    ...         writer.insert_or_replace(doc)
+    >>> writer.failures
+    [({'_id': 'doc1', ...}, MapRDBError(...))]
+    """
+    def __init__(self, table, batch_size=1000, flush_interval=None, max_pending_batches=4):
+        """
+        :param table: maprdb.tables.Table class instance to write to.
+        :param batch_size: number of documents converted and written at once.
+        :param flush_interval: if set, a partial batch is written when a document is added
+        later than flush_interval seconds after the previous batch.
+        :param max_pending_batches: number of batches waiting to be written,
+        adding documents blocks while this number is exceeded.
+        """
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending_batches = max_pending_batches
+        self.failures = []
+        self.written = 0
+
+        self._batch = []
+        self._pending = []
+        self._last_submit = time.monotonic()
+        # batches waiting for the previous batch to be written, with their futures
+        self._queue = collections.deque()
+        self._writing = False
+        self._lock = threading.Lock()
+        self._buffer_write_option = None
+        self._enable_buffered_writes()
+
+    def _enable_buffered_writes(self):
+        """
+        Turns on buffered writes of the table, the previous value of the option is restored on close.
+        """
+        if not jpype.isJVMStarted() or not hasattr(self.table.java_table, "setOption"):
+            return
+        try:
+            table_option = jpype.JClass("com.mapr.db.TableOption")
+            java_table = self.table.java_table
+            previous = bool(java_table.getOption(table_option.BUFFERWRITE)) \
+                if hasattr(java_table, "getOption") else False
+            java_table.setOption(table_option.BUFFERWRITE, True)
+            self._buffer_write_option = (table_option.BUFFERWRITE, previous)
+        except (jpype.JavaException, RuntimeError) as e:
+            logger.debug("Buffered writes are not available: %s", e)
+
+    def _restore_buffered_writes(self):
+        if self._buffer_write_option is not None:
+            option, previous = self._buffer_write_option
+            self._buffer_write_option = None
+            self.table.java_table.setOption(option, previous)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def insert(self, doc, key=None):
+        """
+        Queues the document for maprdb.tables.Table.insert.
+        """
+        self._add(self.table.java_table.insert, doc, key)
+
+    def insert_or_replace(self, doc, key=None):
+        """
+        Queues the document for maprdb.tables.Table.insert_or_replace.
+        """
+        self._add(self.table.java_table.insertOrReplace, doc, key)
+
+    def _add(self, operation, doc, key):
+        self._batch.append((operation, doc, key))
+        if len(self._batch) >= self.batch_size or \
+                (self.flush_interval is not None and time.monotonic() - self._last_submit >= self.flush_interval):
+            self._submit()
+
+    def _submit(self):
+        if self._batch:
+            while len(self._pending) >= self.max_pending_batches:
+                self._pending.pop(0).result()
+            future = Future()
+            self._pending.append(future)
+            with self._lock:
+                self._queue.append((self._batch, future))
+                start, self._writing = not self._writing, True
+            if start:
+                shared_executor().submit(self._write_queued)
+            self._batch = []
+        self._last_submit = time.monotonic()
+
+    def _write_queued(self):
+        """
+        Writes the next queued batch, then submits writing of the following one,
+        so the writer occupies at most one thread of the shared pool.
+        """
+        with self._lock:
+            batch, future = self._queue.popleft()
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(self._write_batch(batch))
+            except Exception as e:
+                future.set_exception(e)
+        with self._lock:
+            if not self._queue:
+                self._writing = False
+                return
+        shared_executor().submit(self._write_queued)
+
+    def _write_batch(self, batch):
+        converted = []
+        for operation, doc, key in batch:
+            try:
+                if not isinstance(doc, Document):
+                    doc = Document(doc)
+                doc = self.table._fill_document_key(doc, key=key)
+                converted.append((operation, doc, self.table._cast_document(doc)))
+            except Exception as e:
+                self.failures.append((doc, e))
+
+        written = []
+        for operation, doc, java_document in converted:
+            try:
+                self._write(operation, java_document)
+                written.append(doc)
+            except Exception as e:
+                self.failures.append((doc, e))
+            finally:
+                self.table._invalidate([doc['_id']])
+
+        if written and self._buffer_write_option is not None:
+            # buffered writes report server errors on flush, they are attributed to the documents of the batch
+            try:
+                self.table.flush()
+            except Exception as e:
+                self.failures.extend((doc, e) for doc in written)
+                return
+        self.written += len(written)
+
+    @handle_java_exceptions
+    def _write(self, operation, java_document):
+        operation(java_document)
+
+    def flush(self):
+        """
+        Writes all queued documents and flushes the table. Returns on completion.
+        Documents, which failed to be written, are collected in failures list.
+        """
+        self._submit()
+        while self._pending:
+            self._pending.pop(0).result()
+        self.table.flush()
+
+    def close(self):
+        """
+        Flushes queued documents and restores buffered writes option of the table.
+        """
+        try:
+            self.flush()
+        finally:
+            self._restore_buffered_writes()
+            if self.failures:
+                logger.warning("%d documents failed to be written", len(self.failures))
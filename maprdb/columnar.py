@@ -0,0 +1,207 @@
+"""
+Columnar export of scan results to NumPy arrays or Arrow record batches.
+NumPy is required for maprdb.tables.Table.find_columnar, pyarrow for its as_arrow mode.
+"""
+import collections
+
+from maprdb.utils import java_to_python_cast, MapRDBError
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+DictionaryEncoded = collections.namedtuple("DictionaryEncoded", ["codes", "categories"])
+DictionaryEncoded.__doc__ = """
+Dictionary encoded column: codes is masked array of indices in categories array.
+"""
+
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError("numpy is required for columnar export, install it with 'pip install numpy'")
+    return numpy
+
+
+def require_pyarrow():
+    if pyarrow is None:
+        raise ImportError("pyarrow is required for Arrow export, install it with 'pip install pyarrow'")
+    return pyarrow
+
+
+def column_value(document, path):
+    """
+    Returns value of the field of Java document, path is a list of field names.
+    Only the requested field is converted to python value.
+    """
+    value = document
+    for name in path:
+        if not hasattr(value, "get"):
+            return None
+        value = value.get(name)
+        if value is None:
+            return None
+    return java_to_python_cast(value)
+
+
+def row_reader(columns):
+    """
+    Returns a function, which reads values of columns from Java document into a tuple.
+    Column names may contain dots to read nested fields.
+    """
+    if not any("." in column for column in columns):
+        def read_flat_row(document):
+            get = document.get
+            return tuple([java_to_python_cast(get(column)) for column in columns])
+        return read_flat_row
+
+    paths = [column.split(".") for column in columns]
+
+    def read_row(document):
+        return tuple([column_value(document, path) for path in paths])
+    return read_row
+
+
+def _numpy_type(types):
+    if not types:
+        return numpy.float64
+    if types == {bool}:
+        return numpy.bool_
+    if types == {int}:
+        return numpy.int64
+    if types <= {int, float}:
+        return numpy.float64
+    return object
+
+
+def _numpy_column(values, dtype):
+    has_nulls = any(value is None for value in values)
+    if has_nulls:
+        mask = numpy.equal([value is None for value in values], True)
+        if dtype is not object:
+            values = [0 if value is None else value for value in values]
+    else:
+        mask = numpy.ma.nomask
+
+    if dtype is object:
+        data = numpy.empty(len(values), dtype=object)
+        data[:] = values
+    else:
+        data = numpy.array(values, dtype=dtype)
+    return numpy.ma.MaskedArray(data, mask=mask)
+
+
+def _cast_column(array, dtype):
+    """
+    Converts array of a chunk to dtype of the whole column.
+    """
+    if array.dtype == dtype:
+        return array
+    mask = numpy.ma.getmaskarray(array)
+    if dtype is object:
+        values = [None if masked else value for value, masked in zip(array.data.tolist(), mask)]
+        return _numpy_column(values, object)
+    return numpy.ma.MaskedArray(array.data.astype(dtype), mask=array.mask)
+
+
+def _dictionary_encode(column):
+    categories, codes = numpy.unique(column.compressed(), return_inverse=True)
+    all_codes = numpy.zeros(len(column), dtype=numpy.int32)
+    all_codes[~numpy.ma.getmaskarray(column)] = codes
+    return DictionaryEncoded(numpy.ma.MaskedArray(all_codes, mask=numpy.ma.getmaskarray(column)), categories)
+
+
+def numpy_columns(row_chunks, columns, dictionary_encode=False):
+    """
+    Builds masked NumPy array for every column from chunks of rows.
+    Arrays are built per chunk while the rows are streamed, and concatenated at the end.
+
+    :param row_chunks: iterable of lists of tuples with values of columns
+    :param columns: list of column names
+    :param dictionary_encode: if True, string columns are returned as DictionaryEncoded
+    :returns: dict, which maps column name to numpy.ma.MaskedArray or DictionaryEncoded
+    """
+    require_numpy()
+    parts = {column: [] for column in columns}
+    types = {column: set() for column in columns}
+    for rows in row_chunks:
+        for column, values in zip(columns, zip(*rows)):
+            chunk_types = set(map(type, values))
+            chunk_types.discard(type(None))
+            types[column] |= chunk_types
+            parts[column].append(_numpy_column(values, _numpy_type(chunk_types)))
+
+    result = {}
+    for column in columns:
+        if not parts[column]:
+            result[column] = numpy.ma.MaskedArray(numpy.empty(0, dtype=numpy.float64))
+            continue
+        # dtype depends on the types of all values, not on the way they were split into chunks
+        dtype = _numpy_type(types[column])
+        column_parts = [_cast_column(part, dtype) for part in parts[column]]
+        array = column_parts[0] if len(column_parts) == 1 else numpy.ma.concatenate(column_parts)
+        if dictionary_encode and array.dtype == object and \
+                all(isinstance(value, str) for value in array.compressed()):
+            array = _dictionary_encode(array)
+        result[column] = array
+    return result
+
+
+def _arrow_batch(columns_values, columns, types, dictionary_encode):
+    arrays = []
+    for column, values in zip(columns, columns_values):
+        try:
+            array = pyarrow.array(values)
+            if array.type != types[column]:
+                # safe cast fails instead of truncating values, like floats in an integer column
+                array = array.cast(types[column])
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, pyarrow.ArrowNotImplementedError) as e:
+            raise MapRDBError("Values of column '{}' don't match its type {}, "
+                              "pass the schema explicitly: {}".format(column, types[column], e)) from e
+        if dictionary_encode and pyarrow.types.is_string(array.type):
+            array = array.dictionary_encode()
+        arrays.append(array)
+    return pyarrow.RecordBatch.from_arrays(arrays, names=list(columns))
+
+
+def arrow_batches(row_chunks, columns, dictionary_encode=False, schema=None):
+    """
+    Generator of pyarrow.RecordBatch objects, one for every chunk of rows.
+    All batches have the same schema. Type of a column not given in the schema is inferred
+    from the first chunk, which has values of the column, batches are held back until types
+    of all columns are known. Columns without any values have null type.
+    Values, which can't be converted to the type of their column without loss, raise maprdb.utils.MapRDBError.
+
+    :param row_chunks: iterable of lists of tuples with values of columns
+    :param columns: list of column names
+    :param dictionary_encode: if True, string columns are dictionary encoded
+    :param schema: pyarrow.Schema or dict, which maps column names to pyarrow types
+    """
+    require_pyarrow()
+    if isinstance(schema, pyarrow.Schema):
+        schema = {field.name: field.type for field in schema}
+    types = {column: (schema or {}).get(column) for column in columns}
+
+    held = []
+    for rows in row_chunks:
+        columns_values = list(zip(*rows))
+        for column, values in zip(columns, columns_values):
+            if types[column] is None:
+                inferred = pyarrow.array(values).type
+                if not pyarrow.types.is_null(inferred):
+                    types[column] = inferred
+        held.append(columns_values)
+        if all(column_type is not None for column_type in types.values()):
+            for held_values in held:
+                yield _arrow_batch(held_values, columns, types, dictionary_encode)
+            held = []
+
+    types = {column: pyarrow.null() if column_type is None else column_type for column, column_type in types.items()}
+    for held_values in held:
+        yield _arrow_batch(held_values, columns, types, dictionary_encode)
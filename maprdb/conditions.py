@@ -1,13 +1,66 @@
+import copy
 import jpype
 import logging
 from multipledispatch import dispatch
 from maprdb import Connection
-from maprdb.utils import handle_java_exceptions, python_to_java_cast, MapRDBError
+from maprdb.utils import handle_java_exceptions, python_to_java_cast, MapRDBError, LRUCache
 
 
 logger = logging.getLogger(__name__)
 
 
+class Param(object):
+    """
+    Named parameter of condition template, see maprdb.conditions.Condition.template.
+    >> template = Condition.template({"age": {"$gt": Param("min_age")}})
+    >> c = template.bind(min_age=18)
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "Param({!r})".format(self.name)
+
+    def __eq__(self, other):
+        return isinstance(other, Param) and other.name == self.name
+
+    def __hash__(self):
+        return hash((Param, self.name))
+
+
+def _canonical(value):
+    """
+    Returns hashable canonical form of condition shorthand.
+    Order of keys of dicts doesn't matter, types of values do, e.g. 1 and True are different.
+    """
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, _canonical(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(_canonical(v) for v in value))
+    hash(value)
+    return (type(value), value)
+
+
+# Built conditions, keyed by canonical form of shorthand
+condition_cache = LRUCache(maxsize=1024)
+
+# $in lists longer than this are split into several queries, if Java API has no native "in" condition
+MAX_IN_VALUES = 1000
+
+_native_in = None
+
+
+def native_in_supported():
+    """
+    Returns True if Java condition of MapRDB version in use supports "in" and "notIn" methods.
+    """
+    global _native_in
+    if _native_in is None:
+        java_condition = Connection.get_instance().MapRDB.newCondition()
+        _native_in = hasattr(java_condition, "in_") and hasattr(java_condition, "notIn")
+    return _native_in
+
+
 class Condition(object):
     """
     Python wrapper of com.mapr.db.Condition object.
@@ -17,24 +70,93 @@ class Condition(object):
     >> c = Condition({"country": "China", "age": 34})
 
     List of conditions converts to OR clause
-    Dict of conditions converts to AND clause
+    Dict of conditions converts to AND clause,
+    as well as dict of several operators of a field:
+    >> c = Condition({"age": {"$ge": 18, "$lt": 65}})
     """
     def __init__(self, initial=None):
         self._java_condition = None
         self._MapRDB = None
         self._initial = initial
+        self._frozen = False
+        self._cache_key = None
+        self._build = None
+
+    @staticmethod
+    def cached(initial):
+        """
+        Returns condition for the shorthand, reusing Java condition built earlier
+        for an equal shorthand. Built conditions are kept in maprdb.conditions.condition_cache.
+        Returned condition is immutable, its fluent interface can't be used.
+        >> c = Condition.cached({"country": "China", "age": 34})
+
+        :param initial: dict or list, shorthand of condition
+        :returns: maprdb.conditions.Condition class instance
+        """
+        try:
+            key = (Condition, _canonical(initial))
+        except TypeError:
+            logger.debug("Condition %r can't be cached", initial)
+            return Condition(initial)
+
+        return Condition._frozen_condition(initial, key, lambda: Condition(initial).java_condition)
+
+    @staticmethod
+    def template(initial):
+        """
+        Parses shorthand with maprdb.conditions.Param placeholders once,
+        conditions are built from the template by binding values of parameters.
+        >> template = Condition.template({"age": {"$gt": Param("min_age")}})
+        >> c = template.bind(min_age=18)
+
+        :param initial: dict or list, shorthand of condition
+        :returns: maprdb.conditions.ConditionTemplate class instance
+        """
+        return ConditionTemplate(initial)
+
+    @staticmethod
+    def _frozen_condition(initial, key, build):
+        """
+        Creates immutable condition, which Java object is taken from condition_cache by key,
+        or created by build function and put to the cache.
+        """
+        condition = Condition(initial)
+        condition._cache_key = key
+        condition._build = build
+        condition._frozen = True
+        return condition
+
+    def _cached_java_condition(self):
+        java_condition = condition_cache.get(self._cache_key) if self._cache_key is not None else None
+        if java_condition is None:
+            # built condition can't be changed by fluent calls on the shared Java object
+            java_condition = self._build().build()
+            if self._cache_key is not None:
+                condition_cache.put(self._cache_key, java_condition)
+        return java_condition
 
     @property
     def java_condition(self):
         if self._java_condition is None:
             logger.debug("'Condition' Java object creation requested")
-            self._create_condition()
+            if self._frozen:
+                self._java_condition = self._cached_java_condition()
+            else:
+                self._create_condition()
         return self._java_condition
 
     @java_condition.setter
     def java_condition(self, value):
+        self._check_mutable()
         self._java_condition = value
 
+    def _check_mutable(self):
+        """
+        Raises before fluent interface touches Java object, which of cached condition is shared.
+        """
+        if self._frozen:
+            raise MapRDBError("Cached condition can't be changed")
+
     @handle_java_exceptions
     def _create_condition(self):
         self._MapRDB = Connection.get_instance().MapRDB
@@ -44,44 +166,63 @@ class Condition(object):
 
     @handle_java_exceptions
     def _and(self):
+        self._check_mutable()
         self.java_condition = getattr(self.java_condition, "and") ()
         return self
 
     @handle_java_exceptions
     def _or(self):
+        self._check_mutable()
         self.java_condition = self.java_condition.or_()
         return self
 
     @handle_java_exceptions
     def _close(self):
+        self._check_mutable()
         self.java_condition = self.java_condition.close()
         return self
 
     @handle_java_exceptions
     def _exists(self, name):
+        self._check_mutable()
         self.java_condition = self.java_condition.exists(name)
         return self
 
     @handle_java_exceptions
     def _not_exists(self, name):
+        self._check_mutable()
         self.java_condition = self.java_condition.notExists(name)
         return self
 
     @handle_java_exceptions
     def _is(self, field, condition, value):
+        self._check_mutable()
         value = python_to_java_cast(value)
         self.java_condition = self.java_condition.is_(field, condition, value)
         return self
 
+    @handle_java_exceptions
+    def _is_in(self, field, values):
+        self._check_mutable()
+        self.java_condition = self.java_condition.in_(field, python_to_java_cast(values))
+        return self
+
+    @handle_java_exceptions
+    def _is_not_in(self, field, values):
+        self._check_mutable()
+        self.java_condition = self.java_condition.notIn(field, python_to_java_cast(values))
+        return self
+
     @dispatch(dict)
     def _parse_condition(self, initial):
         """
         Parse dictionary, which is alias for AND condition
         """
-        if len(initial) > 1:
+        clauses = [(key, operator, value) for key, field_value in initial.items()
+                   for operator, value in self._parse_operators_and_values(field_value)]
+        if len(clauses) > 1:
             self._and()
-        for key,value in initial.items():
-            operator, value = self._parse_operator_and_value(value)
+        for key, operator, value in clauses:
             # ['LESS', 'LESS_OR_EQUAL', 'EQUAL', 'NOT_EQUAL', 'GREATER_OR_EQUAL', 'GREATER']
             if operator in ["$eq", "$equal", "="]:
                 self._is(key, Op.EQUAL, value)
@@ -102,6 +243,8 @@ class Condition(object):
             elif operator in ["!$in"]:
                 self._not_in(key, value)
             elif operator in ["$exists"]:
+                if isinstance(value, Param):
+                    raise MapRDBError("Parameter can't be used as value of $exists")
                 if value:
                     self._exists(key)
                 else:
@@ -113,12 +256,15 @@ class Condition(object):
 
             else:
                 raise MapRDBError("Unknown operator '{}'".format(operator))
-        if len(initial) > 1:
+        if len(clauses) > 1:
             self._close()
 
     def _not_in(self, key, in_list):
         if not isinstance(in_list, list):
             raise MapRDBError("For $in operator value should be list")
+        if native_in_supported():
+            self._is_not_in(key, in_list)
+            return
         self._and()
         for item in in_list:
             self._is(key, Op.NOT_EQUAL, item)
@@ -127,11 +273,38 @@ class Condition(object):
     def _in(self, key, in_list):
         if not isinstance(in_list, list):
             raise MapRDBError("For $in operator value should be list")
+        if native_in_supported():
+            self._is_in(key, in_list)
+            return
         self._or()
         for item in in_list:
             self._is(key, Op.EQUAL, item)
         self._close()
 
+    def _split_in(self, max_values=None):
+        """
+        Splits condition with long $in list into conditions with parts of the list,
+        if Java API has no native "in" condition. Results of queries by these conditions
+        should be merged by client.
+        Only $in of top level AND clause of shorthand is split.
+        :returns: list of maprdb.conditions.Condition class instances
+        """
+        max_values = max_values or MAX_IN_VALUES
+        if not isinstance(self._initial, dict) or native_in_supported():
+            return [self]
+        for key, value in self._initial.items():
+            operator, in_list = self._parse_operator_and_value(value)
+            if isinstance(value, dict) and len(value) > 1:
+                continue
+            if operator == "$in" and isinstance(in_list, list) and len(in_list) > max_values:
+                conditions = []
+                for i in range(0, len(in_list), max_values):
+                    initial = copy.copy(self._initial)
+                    initial[key] = {"$in": in_list[i:i + max_values]}
+                    conditions.append(Condition(initial))
+                return conditions
+        return [self]
+
     def _between(self, key, pair):
         if not isinstance(pair, list) or len(pair) != 2:
             raise MapRDBError("For $between operator value should be list of two elements")
@@ -152,6 +325,14 @@ class Condition(object):
         if len(initial) > 1:
             self._close()
 
+    def _parse_operators_and_values(self, value):
+        """
+        Dictionary of several operators, e.g. {"$ge": 1, "$lt": 10}, is an AND of them.
+        """
+        if isinstance(value, dict):
+            return list(value.items())
+        return [("=", value)]
+
     def _parse_operator_and_value(self, value):
         if isinstance(value, dict):
             operator = list(value.keys())[0]
@@ -166,6 +347,138 @@ class Condition(object):
 
 
 
+class _RecordingCondition(Condition):
+    """
+    Condition, which records calls of fluent interface made by shorthand parser instead of making them.
+    """
+    def __init__(self, initial):
+        super().__init__(initial)
+        self.operations = []
+
+    def _and(self):
+        self.operations.append(("_and", ()))
+        return self
+
+    def _or(self):
+        self.operations.append(("_or", ()))
+        return self
+
+    def _close(self):
+        self.operations.append(("_close", ()))
+        return self
+
+    def _exists(self, name):
+        self.operations.append(("_exists", (name,)))
+        return self
+
+    def _not_exists(self, name):
+        self.operations.append(("_not_exists", (name,)))
+        return self
+
+    def _is(self, field, condition, value):
+        self.operations.append(("_is", (field, condition, value)))
+        return self
+
+    def _is_in(self, field, values):
+        self.operations.append(("_is_in", (field, values)))
+        return self
+
+    def _is_not_in(self, field, values):
+        self.operations.append(("_is_not_in", (field, values)))
+        return self
+
+    def _in(self, key, in_list):
+        # calls for the list are made on replay, when its length is known
+        if isinstance(in_list, Param):
+            self.operations.append(("_in", (key, in_list)))
+        else:
+            super()._in(key, in_list)
+
+    def _not_in(self, key, in_list):
+        if isinstance(in_list, Param):
+            self.operations.append(("_not_in", (key, in_list)))
+        else:
+            super()._not_in(key, in_list)
+
+
+def _substitute(value, params):
+    if isinstance(value, Param):
+        return params[value.name]
+    if isinstance(value, list):
+        return [_substitute(item, params) for item in value]
+    if isinstance(value, dict):
+        return value.__class__((k, _substitute(v, params)) for k, v in value.items())
+    return value
+
+
+def _params(value):
+    if isinstance(value, Param):
+        return {value.name}
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return set().union(*[_params(item) for item in value])
+    return set()
+
+
+def _has_exists_param(value):
+    if isinstance(value, dict):
+        if isinstance(value.get("$exists"), Param):
+            return True
+        value = list(value.values())
+    if isinstance(value, list):
+        return any(_has_exists_param(item) for item in value)
+    return False
+
+
+class ConditionTemplate(object):
+    """
+    Condition shorthand with maprdb.conditions.Param placeholders for values.
+    A parameter can be a whole list of $in operator, e.g. {"country": {"$in": Param("countries")}}.
+    It is parsed once, when the first bound condition is used, and later bindings only replay the Java fluent calls.
+    Bound conditions are kept in maprdb.conditions.condition_cache.
+
+    This class is usually not instantiated by user, but returned from maprdb.conditions.Condition.template.
+    """
+    def __init__(self, initial):
+        # $exists selects the Java call made by the parser, it can't be replayed with another value
+        if _has_exists_param(initial):
+            raise MapRDBError("Parameter can't be used as value of $exists")
+        self._initial = initial
+        self._key = _canonical(initial)
+        self._operations = None
+        self.params = _params(initial)
+
+    def _compile(self):
+        recorder = _RecordingCondition(self._initial)
+        recorder._parse_condition(self._initial)
+        self._operations = recorder.operations
+
+    def _replay(self, params):
+        if self._operations is None:
+            self._compile()
+        condition = Condition()
+        for name, args in self._operations:
+            getattr(condition, name)(*[_substitute(arg, params) for arg in args])
+        return condition.java_condition
+
+    def bind(self, **params):
+        """
+        Builds condition with parameters substituted by passed values.
+        :param params: values of parameters, by name
+        :returns: immutable maprdb.conditions.Condition class instance
+        """
+        missing = self.params - set(params)
+        if missing:
+            raise MapRDBError("Values of parameters {} are not passed".format(", ".join(sorted(missing))))
+
+        try:
+            key = (ConditionTemplate, self._key, _canonical(params))
+        except TypeError:
+            key = None
+        return Condition._frozen_condition(_substitute(self._initial, params), key, lambda: self._replay(params))
+
+
 class OperationsType(type):
     """
     Metaclass for Op object.
@@ -1,27 +1,28 @@
-import os
 import logging
 
-import jpype
-from jpype import startJVM, getDefaultJVMPath, isJVMStarted
-
-from maprdb import JARS_LIST
 from maprdb.tables import Table
-from maprdb.utils import Singleton, handle_java_exceptions
+from maprdb.table_pool import TablePool
+from maprdb.async_tables import AsyncTable
+from maprdb.backends import JavaBackend
+from maprdb import metrics
+from maprdb.utils import Singleton, handle_java_exceptions, set_binary_views
 
 logger = logging.getLogger(__name__)
 
 
-def connect(mapr_home=None, **connection_info):
+def connect(mapr_home=None, backend=None, **connection_info):
     """
     Connect to MapRDB.
     :param mapr_home: -Dmapr.home.dir argument to JVM. Should point to the directory
     with 'conf/mapr-cluster.conf' file.
+    :param backend: storage backend, e.g. maprdb.backends.MemoryBackend instance.
+    By default MapRDB cluster is used through Java API.
     :returns: Connection object
     """
     info = connection_info.copy()
     if mapr_home:
         info.update({"mapr.home.dir": mapr_home})
-    return Connection.get_instance(conn_info=info)
+    return Connection.get_instance(conn_info=info, backend=backend)
 
 
 class Connection(object, metaclass=Singleton):
@@ -30,34 +31,26 @@ class Connection(object, metaclass=Singleton):
     Represents both connection to JVM and MapRDB class.
     Wrapper for com.mapr.db.MapRDB.
     """
-    def __init__(self, conn_info, options=None):
+    def __init__(self, conn_info, options=None, backend=None):
         """
         Constructor of connection.
         :param conn_info: dictionary with JVM arguments
         :param options: map of options, not required [dict]
+        :param backend: storage backend, see maprdb.backends. If not set,
+        JVM is started and MapRDB cluster is used.
         """
         if not options:
             options = {}
         self.options = options
         self.connection_info = conn_info
+        self._apply_metrics_option(options)
+        self._apply_binary_views_option(options)
 
-        self._open()
-        self.MapRDB = jpype.JClass("com.mapr.db.MapRDB")
-
-    @handle_java_exceptions
-    def _open(self):
-        logger.info("Starting JVM")
-        if isJVMStarted():
-            logger.warn("JVM is already started. Only one connection can be opened,"
-                        "previously created connection will be used.")
-            return
-
-        startJVM(getDefaultJVMPath(), *self._jvm_args())
-
-    def _jvm_args(self):
-        args = ["-Djava.class.path={}".format(os.pathsep.join(JARS_LIST))]
-        args += ["-D{}={}".format(key, value) for key,value in self.connection_info.items()]
-        return args
+        if backend is None:
+            backend = JavaBackend(conn_info)
+        self.backend = backend
+        self.MapRDB = getattr(backend, "MapRDB", None)
+        self.table_pool = TablePool(self.get, idle_ttl=options.get("table_idle_ttl", 60.0))
 
     @handle_java_exceptions
     def get(self, name):
@@ -66,8 +59,32 @@ class Connection(object, metaclass=Singleton):
         :param name: table name [str]
         :returns: table object [maprdb.Table]
         """
-        j_table = self.MapRDB.getTable(name)
-        return Table(j_table)
+        j_table = self.backend.get_table(name)
+        return Table(j_table, options=self.options)
+
+    def table(self, name):
+        """
+        Context manager, which returns a table from the pool of open tables of the connection.
+        Table is shared with other users of the pool and must not be closed,
+        it's closed by the pool after "table_idle_ttl" seconds of not being used.
+        Statistics of the pool are returned by table_pool.stats().
+
+        >>> with connection.table("/tmp/users") as table:
+        ...     table.find_by_id("user1")
+
+        :param name: table name [str]
+        """
+        return self.table_pool.table(name)
+
+    def get_async(self, name, concurrency=8):
+        """
+        Finds a table and returns a reference of type maprdb.AsyncTable,
+        which methods can be awaited in asyncio event loop.
+        :param name: table name [str]
+        :param concurrency: maximum number of table calls running at once [int]
+        :returns: table object [maprdb.AsyncTable]
+        """
+        return AsyncTable(self.get(name), concurrency=concurrency)
 
     @handle_java_exceptions
     def create(self, name):
@@ -76,8 +93,8 @@ class Connection(object, metaclass=Singleton):
         :param name: table name [str]
         :returns: table object [maprdb.Table]
         """
-        j_table = self.MapRDB.createTable(name)
-        return Table(j_table)
+        j_table = self.backend.create_table(name)
+        return Table(j_table, options=self.options)
 
     @handle_java_exceptions
     def delete(self, name):
@@ -85,7 +102,8 @@ class Connection(object, metaclass=Singleton):
         Deletes a table.
         :param name: table name [str]
         """
-        self.MapRDB.deleteTable(name)
+        self.table_pool.discard(name)
+        self.backend.delete_table(name)
 
     @handle_java_exceptions
     def exists(self, name):
@@ -94,14 +112,51 @@ class Connection(object, metaclass=Singleton):
         :param name: table name [str]
         :returns: True if exists, False otherwise [bool]
         """
-        return self.MapRDB.tableExists(name) == 1
+        return self.backend.table_exists(name)
 
     def setOptions(self, **options):
         """
         Sets the options specified in the map or return the state of all options.
+        Supported options:
+            json_conversion - convert documents read by tables through JSON strings [bool]
+            json_encoding - pass documents written by tables to Java as JSON strings [bool]
+            lazy_documents - return documents read by tables as maprdb.document.LazyDocument [bool]
+            parallelism - number of worker threads for operations of tables on lists of keys [int]
+            executor - concurrent.futures.Executor shared by tables for operations on lists of keys
+            table_idle_ttl - seconds, after which unused tables of table() are closed [float]
+            metrics - record timings and counters of table operations and conversions, see metrics() [bool]
+            binary_views - return read-only direct binary values as memoryview without copying,
+                see maprdb.utils.set_binary_views [bool]
+            document_cache - cache documents of find_by_id in tables opened later, True or keyword arguments
+                of maprdb.tables.Table.enable_cache [bool or dict]
         :param options: dictionary of changed options
         """
         self.options.update(options)
+        self._apply_metrics_option(options)
+        self._apply_binary_views_option(options)
+        if "table_idle_ttl" in options:
+            self.table_pool.idle_ttl = options["table_idle_ttl"]
+
+    @staticmethod
+    def _apply_metrics_option(options):
+        if "metrics" in options:
+            if options["metrics"]:
+                metrics.enable()
+            else:
+                metrics.disable()
+
+    @staticmethod
+    def _apply_binary_views_option(options):
+        if "binary_views" in options:
+            set_binary_views(options["binary_views"])
+
+    def metrics(self):
+        """
+        Returns timings and counters recorded since "metrics" option was set,
+        see maprdb.metrics for hooks pushing them to monitoring systems.
+        :returns: dictionary with "operations" and "conversions" entries
+        """
+        return metrics.snapshot()
 
     def getOptions(self):
         """
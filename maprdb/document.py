@@ -1,4 +1,10 @@
+import logging
+from collections.abc import MutableMapping
+
 from maprdb.utils import python_to_java_cast, java_to_python_cast
+from maprdb import extended_json
+
+logger = logging.getLogger(__name__)
 
 
 class Document(dict):
@@ -10,6 +16,28 @@ class Document(dict):
     def python_document_from_java(java_object):
         return Document(java_to_python_cast(java_object))
 
+    @staticmethod
+    def python_document_from_json(java_object):
+        """
+        Converts whole Java document in one call: it is serialized to OJAI extended JSON
+        on Java side and decoded in python.
+        """
+        return Document(extended_json.loads(java_object.asJsonString()))
+
+    @staticmethod
+    def java_document_from_json(document):
+        """
+        Creates Java document in one call from OJAI extended JSON string of the python document.
+        Documents with values, which have no JSON form, are converted field by field.
+        """
+        from maprdb.connection import Connection
+        try:
+            json_string = extended_json.dumps(document)
+        except (TypeError, ValueError) as e:
+            logger.debug("Document is converted field by field: %s", e)
+            return python_to_java_cast(document)
+        return Connection.get_instance().MapRDB.newDocument(json_string)
+
     def _get_java_object(self):
         from maprdb.connection import Connection
         maprdb = Connection.get_instance().MapRDB
@@ -19,3 +47,78 @@ class Document(dict):
             java_document.set(python_to_java_cast(k),python_to_java_cast(v))
 
         return java_document
+
+
+_NOT_CONVERTED = object()
+
+
+class LazyDocument(MutableMapping):
+    """
+    Document, which keeps reference to Java document and converts a field
+    only when it's accessed for the first time. Converted values are cached.
+    Has the same mapping interface as maprdb.document.Document,
+    to_dict() converts all fields at once.
+    Once a list or dict field is accessed, the document is converted back from python
+    when it's passed to Java, as the field could have been changed in place.
+    """
+    __slots__ = ("_java_document", "_fields", "_modified")
+
+    def __init__(self, java_document):
+        self._java_document = java_document
+        self._fields = None
+        self._modified = False
+
+    def _load_fields(self):
+        fields = {}
+        it = self._java_document.keySet().iterator()
+        while it.hasNext():
+            fields[java_to_python_cast(it.next())] = _NOT_CONVERTED
+        self._fields = fields
+        return fields
+
+    def __getitem__(self, key):
+        fields = self._fields if self._fields is not None else self._load_fields()
+        value = fields[key]
+        if value is _NOT_CONVERTED:
+            value = fields[key] = java_to_python_cast(self._java_document.get(key))
+            if isinstance(value, (list, dict)):
+                # returned list or dict can be changed in place, so Java document may be out of date
+                self._modified = True
+        return value
+
+    def __setitem__(self, key, value):
+        fields = self._fields if self._fields is not None else self._load_fields()
+        fields[key] = value
+        self._modified = True
+
+    def __delitem__(self, key):
+        fields = self._fields if self._fields is not None else self._load_fields()
+        del fields[key]
+        self._modified = True
+
+    def __iter__(self):
+        fields = self._fields if self._fields is not None else self._load_fields()
+        return iter(list(fields))
+
+    def __len__(self):
+        fields = self._fields if self._fields is not None else self._load_fields()
+        return len(fields)
+
+    def __contains__(self, key):
+        fields = self._fields if self._fields is not None else self._load_fields()
+        return key in fields
+
+    def __repr__(self):
+        return "LazyDocument({!r})".format(self.to_dict())
+
+    def to_dict(self):
+        """
+        Converts all fields.
+        :returns: maprdb.document.Document class instance
+        """
+        return Document({key: self[key] for key in self})
+
+    def _get_java_object(self):
+        if not self._modified:
+            return self._java_document
+        return self.to_dict()._get_java_object()
@@ -0,0 +1,161 @@
+"""
+Conversion between OJAI extended JSON and python values.
+OJAI documents serialize types which are not present in JSON
+as objects with a single "$type" key, e.g. {"$numberLong": 34}.
+"""
+import base64
+import calendar
+import datetime
+import decimal
+import json
+import re
+import struct
+from collections.abc import Mapping
+
+from maprdb.utils import MapRDBError, _local_datetime, _epoch_millis
+
+
+_DATE_RE = re.compile(r"(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(?:\.(\d{1,6})\d*)?(Z|[+-]\d\d:?\d\d)?$")
+_TIME_RE = re.compile(r"(\d\d):(\d\d):(\d\d)(?:\.(\d{1,6})\d*)?$")
+
+
+def _microseconds(fraction):
+    return int(fraction.ljust(6, "0")) if fraction else 0
+
+
+def _parse_timestamp(text):
+    """
+    Parses ISO-8601 timestamp to naive datetime in local timezone of JVM,
+    the same way java.sql.Timestamp values are converted.
+    """
+    match = _DATE_RE.match(text)
+    if not match:
+        raise MapRDBError("Invalid $date value '{}'".format(text))
+    year, month, day, hour, minute, second = (int(g) for g in match.groups()[:6])
+    fraction, zone = match.group(7), match.group(8)
+
+    value = datetime.datetime(year, month, day, hour, minute, second, _microseconds(fraction))
+    if zone is None:
+        return value
+    if zone != "Z":
+        sign = -1 if zone[0] == "-" else 1
+        digits = zone[1:].replace(":", "")
+        value -= sign * datetime.timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+    return _local_datetime(calendar.timegm(value.timetuple()) * 1000, value.microsecond)
+
+
+def _parse_date(text):
+    return datetime.datetime.strptime(text, "%Y-%m-%d").date()
+
+
+def _parse_time(text):
+    match = _TIME_RE.match(text)
+    if not match:
+        raise MapRDBError("Invalid $time value '{}'".format(text))
+    hour, minute, second = (int(g) for g in match.groups()[:3])
+    return datetime.time(hour, minute, second, _microseconds(match.group(4)))
+
+
+def _parse_float(value):
+    """
+    Widens float value through float32, like java.lang.Float values of field by field conversion,
+    e.g. 0.1 becomes 0.10000000149011612.
+    """
+    return struct.unpack("f", struct.pack("f", float(value)))[0]
+
+
+def _parse_decimal(value):
+    return decimal.Decimal(str(value))
+
+
+_EXTENDED_TYPES = {
+    "$numberLong": int,
+    "$numberInt": int,
+    "$numberShort": int,
+    "$numberByte": int,
+    "$numberFloat": _parse_float,
+    "$numberDouble": float,
+    "$numberDecimal": _parse_decimal,
+    "$date": _parse_timestamp,
+    "$dateDay": _parse_date,
+    "$time": _parse_time,
+    "$interval": int,
+    "$binary": base64.b64decode,
+}
+
+
+def _object_hook(value):
+    if len(value) == 1:
+        key, = value
+        parse = _EXTENDED_TYPES.get(key)
+        if parse is not None:
+            return parse(value[key])
+    return value
+
+
+_decoder = json.JSONDecoder(object_hook=_object_hook)
+
+
+def loads(text):
+    """
+    Decodes OJAI extended JSON string to python value
+    :param text: JSON string, as returned by org.ojai.Document.asJsonString()
+    :returns: python value with extended types restored
+    """
+    return _decoder.decode(text)
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _format_timestamp(value):
+    """
+    Formats datetime as ISO-8601 UTC timestamp with milliseconds,
+    naive datetime is treated as local time of JVM, the same way as in java.sql.Timestamp values.
+    OJAI timestamps have millisecond precision, so datetime with sub-millisecond part
+    raises ValueError instead of being truncated, java.sql.Timestamp of field by field conversion keeps it.
+    """
+    if value.microsecond % 1000:
+        raise ValueError("Timestamp {} has sub-millisecond precision".format(value.isoformat()))
+    seconds, milliseconds = divmod(_epoch_millis(value), 1000)
+    utc = _EPOCH + datetime.timedelta(seconds=seconds)
+    return "{:04d}-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}.{:03d}Z".format(
+        utc.year, utc.month, utc.day, utc.hour, utc.minute, utc.second, milliseconds)
+
+
+def _format_time(value):
+    text = "{:02d}:{:02d}:{:02d}".format(value.hour, value.minute, value.second)
+    if value.microsecond:
+        text += ".{:03d}".format(value.microsecond // 1000)
+    return text
+
+
+def _default(value):
+    if isinstance(value, datetime.datetime):
+        return {"$date": _format_timestamp(value)}
+    elif isinstance(value, datetime.date):
+        return {"$dateDay": value.isoformat()}
+    elif isinstance(value, datetime.time):
+        return {"$time": _format_time(value)}
+    elif isinstance(value, decimal.Decimal):
+        return {"$numberDecimal": str(value)}
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        return {"$binary": base64.b64encode(value).decode("ascii")}
+    elif isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError("Value of type {} can't be encoded as OJAI JSON".format(type(value).__name__))
+
+
+_encoder = json.JSONEncoder(default=_default, allow_nan=False, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(value):
+    """
+    Encodes python value to OJAI extended JSON string.
+    Integers are written as JSON numbers, which OJAI reads as long values.
+    :param value: python value
+    :returns: JSON string, accepted by com.mapr.db.MapRDB.newDocument
+    :raises TypeError: if value contains objects which have no JSON form
+    :raises ValueError: if value contains NaN or infinite floats, or datetime with sub-millisecond precision
+    """
+    return _encoder.encode(value)
@@ -0,0 +1,357 @@
+"""
+Opt-in instrumentation of maprdb.Table methods and of conversions between python and Java values.
+
+enable() wraps public methods of maprdb.Table and conversion functions used by maprdb modules,
+disable() puts the original functions back, so disabled instrumentation costs nothing.
+
+Recorded are call counts, latency histograms, numbers of converted documents, fields and values, bytes,
+and an approximate number of JNI calls: one per Table call and one per converted value.
+
+    >>> from maprdb import metrics
+    >>> metrics.enable()
+    >>> table.find_by_id("key")
+    >>> connection.metrics()["operations"]["find_by_id"]["latency"]["p99"]
+
+Hooks receive every recorded event and can push it to statsd:
+
+    >>> metrics.add_hook(lambda event: statsd.timing("maprdb." + event["name"], event["seconds"] * 1000))
+
+For Prometheus, prometheus_text() renders the current values in text exposition format.
+"""
+import bisect
+import threading
+import time
+import types
+from functools import wraps
+
+
+# upper bounds of histogram buckets, seconds: 1 us to 10 s in half-decade steps
+BUCKETS = tuple(10 ** (exponent / 2.0) * 1e-6 for exponent in range(15))
+
+_local = threading.local()
+_originals = []
+
+
+class Histogram(object):
+    """
+    Latency histogram with fixed buckets.
+    """
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """
+        Returns upper bound of the bucket, which contains the percentile, or max for the last bucket.
+        """
+        rank = fraction * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if count and cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+
+class Metrics(object):
+    """
+    Thread safe registry of recorded operations and conversions.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hooks = []
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}
+            self.conversions = {}
+
+    def add_hook(self, hook):
+        """
+        :param hook: function called with a dictionary of every recorded event,
+        which has "kind" ("operation" or "conversion"), "name" and "seconds" keys
+        and the counters of the event.
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def record_operation(self, name, seconds, error, jni_calls):
+        with self._lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = {"calls": 0, "errors": 0, "jni_calls": 0, "latency": Histogram()}
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["jni_calls"] += jni_calls
+            stats["latency"].observe(seconds)
+        if self._hooks:
+            self._notify({"kind": "operation", "name": name, "seconds": seconds,
+                          "error": error, "jni_calls": jni_calls})
+
+    def record_conversion(self, name, seconds, documents, values, size):
+        with self._lock:
+            stats = self.conversions.get(name)
+            if stats is None:
+                stats = self.conversions[name] = {"calls": 0, "documents": 0, "values": 0, "bytes": 0,
+                                                  "latency": Histogram()}
+            stats["calls"] += 1
+            stats["documents"] += documents
+            stats["values"] += values
+            stats["bytes"] += size
+            stats["latency"].observe(seconds)
+        if self._hooks:
+            self._notify({"kind": "conversion", "name": name, "seconds": seconds,
+                          "documents": documents, "values": values, "bytes": size})
+
+    def _notify(self, event):
+        for hook in list(self._hooks):
+            hook(event)
+
+    def snapshot(self):
+        """
+        :returns: dictionary with "enabled", "operations" and "conversions" entries,
+        latency histograms are in seconds.
+        """
+        with self._lock:
+            operations = {}
+            for name, stats in self.operations.items():
+                operations[name] = dict(stats, latency=stats["latency"].snapshot(),
+                                        jni_calls_per_call=stats["jni_calls"] / stats["calls"])
+            conversions = {name: dict(stats, latency=stats["latency"].snapshot())
+                           for name, stats in self.conversions.items()}
+        return {"enabled": enabled(), "operations": operations, "conversions": conversions}
+
+    def prometheus_text(self, prefix="maprdb"):
+        """
+        Renders current values in Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for kind, label, counters in [("operation", "operation", ("calls", "errors", "jni_calls")),
+                                      ("conversion", "conversion", ("calls", "documents", "values", "bytes"))]:
+            entries = snapshot[kind + "s"]
+            metric = "{}_{}_seconds".format(prefix, kind)
+            lines.append("# TYPE {} histogram".format(metric))
+            for name, stats in sorted(entries.items()):
+                latency = stats["latency"]
+                for bound, count in latency["buckets"]:
+                    lines.append('{}_bucket{{{}="{}",le="{:g}"}} {}'.format(metric, label, name, bound, count))
+                lines.append('{}_bucket{{{}="{}",le="+Inf"}} {}'.format(metric, label, name, latency["count"]))
+                lines.append('{}_sum{{{}="{}"}} {!r}'.format(metric, label, name, latency["sum"]))
+                lines.append('{}_count{{{}="{}"}} {}'.format(metric, label, name, latency["count"]))
+            for counter in counters:
+                metric = "{}_{}_{}_total".format(prefix, kind, counter)
+                lines.append("# TYPE {} counter".format(metric))
+                for name, stats in sorted(entries.items()):
+                    lines.append('{}{{{}="{}"}} {}'.format(metric, label, name, stats[counter]))
+        return "\n".join(lines) + "\n"
+
+
+registry = Metrics()
+
+
+def footprint(value):
+    """
+    Counts values of python structure and estimates their size.
+    :returns: (number of values, approximate size in bytes)
+    """
+    values = 0
+    size = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        values += 1
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, (str, bytes, bytearray)):
+            size += len(value)
+        elif value is not None:
+            size += 8
+    return values, size
+
+
+def _add_jni_calls(count):
+    calls = getattr(_local, "jni_calls", None)
+    if calls is not None:
+        _local.jni_calls = calls + count
+
+
+def _timed_generator(name, generator, seconds, jni_calls):
+    error = True
+    try:
+        while True:
+            outer = getattr(_local, "jni_calls", None)
+            _local.jni_calls = 1
+            started = time.perf_counter()
+            try:
+                item = next(generator)
+            except StopIteration:
+                error = False
+                return
+            finally:
+                seconds += time.perf_counter() - started
+                jni_calls += _local.jni_calls
+                _local.jni_calls = outer
+            try:
+                yield item
+            except GeneratorExit:
+                error = False
+                raise
+    finally:
+        generator.close()
+        registry.record_operation(name, seconds, error, jni_calls)
+
+
+def _instrument_operation(name, function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        outer = getattr(_local, "jni_calls", None)
+        _local.jni_calls = 1
+        started = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException:
+            registry.record_operation(name, time.perf_counter() - started, True, _local.jni_calls)
+            raise
+        finally:
+            jni_calls = _local.jni_calls
+            _local.jni_calls = outer if outer is None else outer + jni_calls
+        seconds = time.perf_counter() - started
+        if isinstance(result, types.GeneratorType):
+            # the work is done while the generator is consumed
+            return _timed_generator(name, result, seconds, jni_calls)
+        registry.record_operation(name, seconds, False, jni_calls)
+        return result
+    return wrapper
+
+
+def _instrument_conversion(name, function, python_result):
+    @wraps(function)
+    def wrapper(value, *args, **kwargs):
+        if getattr(_local, "converting", False):
+            return function(value, *args, **kwargs)
+        _local.converting = True
+        started = time.perf_counter()
+        try:
+            result = function(value, *args, **kwargs)
+        finally:
+            _local.converting = False
+        seconds = time.perf_counter() - started
+        python_value = result if python_result else value
+        values, size = footprint(python_value)
+        registry.record_conversion(name, seconds, int(isinstance(python_value, dict)), values, size)
+        _add_jni_calls(values)
+        return result
+    return wrapper
+
+
+def _json_conversion(name, function, python_result):
+    @wraps(function)
+    def wrapper(value):
+        started = time.perf_counter()
+        result = function(value)
+        values, size = footprint(result if python_result else value)
+        registry.record_conversion(name, time.perf_counter() - started, 1, values, size)
+        _add_jni_calls(1)
+        return result
+    return wrapper
+
+
+def _patch(owner, name, replacement):
+    _originals.append((owner, name, owner.__dict__[name]))
+    setattr(owner, name, replacement)
+
+
+def enabled():
+    return bool(_originals)
+
+
+def enable():
+    """
+    Installs instrumentation, does nothing if it's already installed.
+    """
+    if _originals:
+        return
+    from maprdb import tables, document, conditions, mutation, columnar, utils
+    from maprdb.tables import Table
+    from maprdb.document import Document
+
+    for name, attribute in list(vars(Table).items()):
+        if not name.startswith("_") and isinstance(attribute, types.FunctionType):
+            _patch(Table, name, _instrument_operation(name, attribute))
+
+    for module in (tables, document, conditions, mutation, columnar):
+        if getattr(module, "python_to_java_cast", None) is utils.python_to_java_cast:
+            _patch(module, "python_to_java_cast",
+                   _instrument_conversion("python_to_java", utils.python_to_java_cast, False))
+        if getattr(module, "java_to_python_cast", None) is utils.java_to_python_cast:
+            _patch(module, "java_to_python_cast",
+                   _instrument_conversion("java_to_python", utils.java_to_python_cast, True))
+
+    from_json = Document.__dict__["python_document_from_json"].__func__
+    _patch(Document, "python_document_from_json",
+           staticmethod(_json_conversion("json_to_python", from_json, True)))
+    to_json = Document.__dict__["java_document_from_json"].__func__
+    _patch(Document, "java_document_from_json",
+           staticmethod(_json_conversion("python_to_json", to_json, False)))
+
+
+def disable():
+    """
+    Removes instrumentation, recorded values are kept.
+    """
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+
+
+def snapshot():
+    return registry.snapshot()
+
+
+def reset():
+    registry.reset()
+
+
+def add_hook(hook):
+    registry.add_hook(hook)
+
+
+def remove_hook(hook):
+    registry.remove_hook(hook)
+
+
+def prometheus_text(prefix="maprdb"):
+    return registry.prometheus_text(prefix)
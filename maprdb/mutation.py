@@ -26,14 +26,56 @@ class Mutation(object):
         decrement("some_float", 1.0).\
         set("some_new_field", 123).\
         build()
+
+    Operations are recorded in operations list as (operator, field_name, value) tuples,
+    Java object is created when it's requested for the first time.
     """
 
     def __init__(self, mutation_dictionaries=None):
-        self.java_mutation = Connection.get_instance().MapRDB.newMutation()
+        self._java_mutation = None
+        self._built = False
+        self.operations = []
 
         if mutation_dictionaries:
             self._parse_mutation(mutation_dictionaries)
 
+    @property
+    def java_mutation(self):
+        if self._java_mutation is None:
+            self._create_mutation()
+        return self._java_mutation
+
+    @handle_java_exceptions
+    def _create_mutation(self):
+        java_mutation = Connection.get_instance().MapRDB.newMutation()
+        for operation in self.operations:
+            java_mutation = self._apply(java_mutation, operation)
+        if self._built:
+            java_mutation = java_mutation.build()
+        self._java_mutation = java_mutation
+
+    def _apply(self, java_mutation, operation):
+        operator_name, field_name, value = operation
+        if operator_name == '$set':
+            return java_mutation.set(field_name, python_to_java_cast(value))
+        elif operator_name == '$setOrReplace':
+            return java_mutation.setOrReplace(field_name, python_to_java_cast(value))
+        elif operator_name == '$append':
+            return java_mutation.append(field_name, python_to_java_cast(value))
+        elif operator_name == '$inc':
+            return java_mutation.increment(field_name, value)
+        elif operator_name == '$delete':
+            return java_mutation.delete(field_name)
+        raise MapRDBError("Unknown operator '{}'".format(operator_name))
+
+    @handle_java_exceptions
+    def _add(self, operator_name, field_name, value=None):
+        operation = (operator_name, field_name, value)
+        self.operations.append(operation)
+        if self._java_mutation is not None:
+            self._java_mutation = self._apply(self._java_mutation, operation)
+        return self
+
     def _get_function_by_operator_name(self, operator_name):
         try:
             return {
@@ -53,7 +95,6 @@ class Mutation(object):
                 for operator_name, value in field_mutation.items():
                     self._get_function_by_operator_name(operator_name)(field_name, value)
 
-    @handle_java_exceptions
     def set(self, field_name, value):
         """
         Sets the value of a field if no previous value exists.
@@ -62,10 +103,8 @@ class Mutation(object):
         :param value: a list, dictionary, numeric or date value to set for the field.
         :return: maprdb.mutation.Mutation resulting instance
         """
-        self.java_mutation = self.java_mutation.set(field_name, python_to_java_cast(value))
-        return self
+        return self._add('$set', field_name, value)
 
-    @handle_java_exceptions
     def set_or_replace(self, field_name, value):
         """
         Sets the value of a field conditionally. If a previous value exists, it is overwritten.
@@ -74,10 +113,8 @@ class Mutation(object):
         :param value: a list, dictionary, numeric or date value to set for the field.
         :return: maprdb.mutation.Mutation resulting instance
         """
-        self.java_mutation = self.java_mutation.setOrReplace(field_name, python_to_java_cast(value))
-        return self
+        return self._add('$setOrReplace', field_name, value)
 
-    @handle_java_exceptions
     def append(self, field_name, value):
         """
         Appends the specified value to the specified field.
@@ -86,10 +123,8 @@ class Mutation(object):
         :param value: a list or string value to append.
         :return: maprdb.mutation.Mutation resulting instance
         """
-        self.java_mutation = self.java_mutation.append(field_name, python_to_java_cast(value))
-        return self
+        return self._add('$append', field_name, value)
 
-    @handle_java_exceptions
     def increment(self, field_name, value):
         """
         Increments the specified field by a specified value.
@@ -98,10 +133,8 @@ class Mutation(object):
         :param value: a numeric value to append.
         :return: maprdb.mutation.Mutation resulting instance
         """
-        self.java_mutation = self.java_mutation.increment(field_name, value)
-        return self
+        return self._add('$inc', field_name, value)
 
-    @handle_java_exceptions
     def decrement(self, field_name, value):
         """
         Decrements the specified field by a specified value.
@@ -110,10 +143,8 @@ class Mutation(object):
         :param value: a numeric value to append.
         :return: maprdb.mutation.Mutation resulting instance
         """
-        self.java_mutation = self.java_mutation.increment(field_name, -1*value)
-        return self
+        return self._add('$inc', field_name, -1*value)
 
-    @handle_java_exceptions
     def delete(self, field_name, value=None):
         """
         Deletes the specified field.
@@ -121,8 +152,7 @@ class Mutation(object):
         :param field_name: string value, which is a name of field to delete.
         :return: maprdb.mutation.Mutation resulting instance
         """
-        self.java_mutation = self.java_mutation.delete(field_name)
-        return self
+        return self._add('$delete', field_name)
 
     @handle_java_exceptions
     def build(self):
@@ -130,7 +160,9 @@ class Mutation(object):
         Builds up the mutation, so it becomes usable, as an
         argument for other maprdb functions.
         """
-        self.java_mutation = self.java_mutation.build()
+        self._built = True
+        if self._java_mutation is not None:
+            self._java_mutation = self._java_mutation.build()
         return self
 
     def _get_java_object(self):
@@ -0,0 +1,252 @@
+"""
+Scan of a table split into _id ranges, which are read by worker processes,
+see maprdb.tables.Table.parallel_scan.
+
+Every worker process opens its own connection, so documents are converted in parallel,
+without contention for GIL of the consumer. Documents are sent back in chunks through a queue.
+"""
+import collections
+import logging
+import multiprocessing
+import pickle
+import queue
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from maprdb.utils import MapRDBError, _java_bytes_to_python
+
+
+logger = logging.getLogger(__name__)
+
+# number of sampled keys used to choose split points
+SPLIT_SAMPLE_SIZE = 10000
+
+# chunks of a range, which are sent but not yet returned by ordered scan, before its worker waits
+MAX_BUFFERED_CHUNKS = 4
+
+_CHUNK = "chunk"
+_END = "end"
+_ERROR = "error"
+
+# state of worker process, set by _init_worker
+_worker = {}
+
+
+def sample_split_points(keys, parts, sample_size=SPLIT_SAMPLE_SIZE, rng=random):
+    """
+    Chooses keys, which split the keys into parts of about the same size.
+    A reservoir sample of keys is kept, so memory use doesn't depend on the number of keys.
+    :param keys: iterable of keys
+    :param parts: number of parts
+    :returns: sorted list of at most parts - 1 distinct keys
+    """
+    sample = []
+    for i, key in enumerate(keys):
+        if i < sample_size:
+            sample.append(key)
+        else:
+            j = rng.randint(0, i)
+            if j < sample_size:
+                sample[j] = key
+    sample.sort()
+    if not sample:
+        return []
+    points = [sample[len(sample) * i // parts] for i in range(1, parts)]
+    return sorted(set(points) - {sample[0]})
+
+
+def tablet_split_points(java_table):
+    """
+    Returns start keys of tablets of the table, but the first one. Tablets are _id ranges of about the same size,
+    so their boundaries are known without reading keys.
+    :param java_table: com.mapr.db.Table
+    :returns: sorted list of keys, None if tablets of the table are not known
+    """
+    if not hasattr(java_table, "getTabletInfos"):
+        return None
+    try:
+        points = set()
+        for tablet in java_table.getTabletInfos():
+            for key_range in tablet.getCondition().getRowkeyRanges():
+                start = key_range.getStartRow()
+                if start is not None and len(start):
+                    points.add(_java_bytes_to_python(start, 0, len(start)).decode("utf-8"))
+        return sorted(points)
+    except Exception as e:
+        logger.debug("Tablets of the table are not known: %s", e)
+        return None
+
+
+def key_ranges(split_points):
+    """
+    :param split_points: sorted keys
+    :returns: list of (start, stop) pairs, which cover all keys, None means unbounded
+    """
+    bounds = [None] + list(split_points) + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def range_condition(shorthand, start=None, stop=None):
+    """
+    Adds start <= _id < stop restriction to condition shorthand.
+    :param shorthand: dict or list, shorthand of maprdb.conditions.Condition, or None
+    :returns: shorthand, None if there is no restriction at all
+    """
+    bounds = {}
+    if start is not None:
+        bounds["$ge"] = start
+    if stop is not None:
+        bounds["$lt"] = stop
+    if not bounds:
+        return shorthand
+    if shorthand is None:
+        return {"_id": bounds}
+    if isinstance(shorthand, list):
+        return [range_condition(item, start, stop) for item in shorthand]
+    if "_id" not in shorthand:
+        return dict(shorthand, _id=bounds)
+
+    key_condition = shorthand["_id"]
+    key_condition = dict(key_condition) if isinstance(key_condition, dict) else {"=": key_condition}
+    for op, value in bounds.items():
+        # keep the narrower bound, if the condition has its own
+        if op not in key_condition:
+            key_condition[op] = value
+        elif op == "$ge":
+            key_condition[op] = max(key_condition[op], value)
+        else:
+            key_condition[op] = min(key_condition[op], value)
+    return dict(shorthand, _id=key_condition)
+
+
+def _init_worker(backend, result_queue, stop, credits):
+    import maprdb
+    # chunks not consumed after stop may be dropped on exit
+    result_queue.cancel_join_thread()
+    _worker["connection"] = maprdb.connect(backend=backend)
+    _worker["queue"] = result_queue
+    _worker["stop"] = stop
+    _worker["credits"] = credits
+
+
+def _put(message):
+    index, kind, _ = message
+    credits = _worker["credits"]
+    if kind == _CHUNK and credits is not None:
+        # ordered scan returns chunk of a range after all previous ranges, so a worker ahead of them waits
+        while not credits[index].acquire(timeout=0.1):
+            if _worker["stop"].is_set():
+                return False
+    while not _worker["stop"].is_set():
+        try:
+            _worker["queue"].put(message, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _scan_range(index, table_name, shorthand, columns, chunk_size, json_conversion):
+    from maprdb.conditions import Condition
+    try:
+        table = _worker["connection"].get(table_name)
+        try:
+            if shorthand is None:
+                documents = table.find(columns=columns, json_conversion=json_conversion)
+            else:
+                documents = table.find_by_condition(Condition(shorthand), columns=columns,
+                                                    json_conversion=json_conversion)
+            chunk = []
+            for document in documents:
+                chunk.append(document)
+                if len(chunk) >= chunk_size:
+                    if not _put((index, _CHUNK, chunk)):
+                        documents.close()
+                        return
+                    chunk = []
+            if chunk and not _put((index, _CHUNK, chunk)):
+                return
+        finally:
+            table.close()
+    except Exception as e:
+        _put((index, _ERROR, "{}: {}".format(type(e).__name__, e)))
+        return
+    _put((index, _END, None))
+
+
+def _check_workers(futures):
+    for future in futures:
+        if future.done() and not future.cancelled() and future.exception() is not None:
+            raise MapRDBError("Worker of parallel scan failed: {}".format(future.exception()))
+
+
+def parallel_scan(backend, table_name, ranges, shorthand=None, columns=None, workers=None,
+                  ordered=True, chunk_size=1000, json_conversion=None, max_buffered_chunks=MAX_BUFFERED_CHUNKS):
+    """
+    Scans key ranges of the table in worker processes.
+    :param backend: backend of the connection, it's pickled to be passed to workers
+    :param table_name: path of the table
+    :param ranges: list of (start, stop) pairs of keys, see key_ranges
+    :param shorthand: condition shorthand
+    :param columns: list of field paths to return
+    :param workers: number of worker processes, number of CPUs by default
+    :param ordered: if True, documents are returned in the order of ranges, otherwise as soon as they are read
+    :param chunk_size: number of documents sent by a worker at once
+    :param json_conversion: passed to the scans of workers
+    :param max_buffered_chunks: number of chunks of a range, which are read ahead of previous ranges
+    by ordered scan, before its worker waits for them to be returned
+    :returns: generator of maprdb.document.Document class instances
+    """
+    try:
+        pickle.dumps(backend)
+    except Exception as e:
+        raise MapRDBError("Backend can't be passed to worker processes: {}".format(e)) from e
+
+    workers = min(workers or multiprocessing.cpu_count(), len(ranges))
+    # JVM of this process can't be forked, workers are started from scratch
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue(maxsize=workers * 2)
+    stop = context.Event()
+    credits = [context.Semaphore(max_buffered_chunks) for _ in ranges] if ordered else None
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=_init_worker, initargs=(backend, result_queue, stop, credits))
+    futures = []
+    try:
+        futures = [executor.submit(_scan_range, index, table_name, range_condition(shorthand, start, stop_key),
+                                   columns, chunk_size, json_conversion)
+                   for index, (start, stop_key) in enumerate(ranges)]
+        ended = set()
+        buffers = collections.defaultdict(list)
+        next_index = 0
+        while len(ended) < len(ranges):
+            try:
+                index, kind, payload = result_queue.get(timeout=0.1)
+            except queue.Empty:
+                _check_workers(futures)
+                continue
+            if kind == _ERROR:
+                raise MapRDBError("Scan of range {} failed: {}".format(ranges[index], payload))
+            if kind == _END:
+                ended.add(index)
+            elif ordered and index != next_index:
+                buffers[index].append(payload)
+            else:
+                if ordered:
+                    credits[index].release()
+                yield from payload
+            while ordered and next_index in ended:
+                next_index += 1
+                for chunk in buffers.pop(next_index, ()):
+                    credits[next_index].release()
+                    yield from chunk
+    finally:
+        stop.set()
+        for future in futures:
+            future.cancel()
+        while not all(future.done() for future in futures):
+            try:
+                result_queue.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        executor.shutdown(wait=True)
+        result_queue.close()
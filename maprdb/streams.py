@@ -0,0 +1,119 @@
+"""
+Iteration over com.mapr.db.DocumentStream objects.
+"""
+import queue
+import threading
+
+from maprdb.utils import handle_java_exceptions, attach_thread_to_jvm
+
+
+def iterate_documents(document_stream, convert):
+    """
+    Generator of converted documents of the stream.
+    The stream is closed when the generator is exhausted or closed.
+    """
+    try:
+        iterator = document_stream.iterator()
+        while iterator.hasNext():
+            yield convert(iterator.next())
+    finally:
+        document_stream.close()
+
+
+def iterate_chunks(document_stream, convert, chunk_size=100):
+    """
+    Generator of lists of up to chunk_size converted documents of the stream.
+    The stream is closed when the generator is exhausted or closed.
+    """
+    chunk = []
+    for document in iterate_documents(document_stream, convert):
+        chunk.append(document)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+_END = object()
+
+
+class _Failure(object):
+    def __init__(self, error):
+        self.error = error
+
+
+class _ChunksProducer(threading.Thread):
+    """
+    Thread, which reads and converts chunks of documents, and puts them into a bounded queue.
+    """
+    def __init__(self, document_stream, convert, chunk_size, prefetch):
+        super().__init__(name="maprdb-prefetch", daemon=True)
+        self.document_stream = document_stream
+        self.convert = convert
+        self.chunk_size = chunk_size
+        self.queue = queue.Queue(maxsize=prefetch)
+        self.stopped = threading.Event()
+
+    def run(self):
+        attach_thread_to_jvm()
+        try:
+            self._produce()
+        except Exception as e:
+            self._put(_Failure(e))
+        finally:
+            self._put(_END)
+
+    @handle_java_exceptions
+    def _produce(self):
+        chunks = iterate_chunks(self.document_stream, self.convert, self.chunk_size)
+        try:
+            for chunk in chunks:
+                if not self._put(chunk):
+                    break
+        finally:
+            chunks.close()
+
+    def _put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+
+def prefetch_chunks(document_stream, convert, chunk_size=100, prefetch=2):
+    """
+    Generator of lists of up to chunk_size converted documents of the stream.
+    Chunks are read and converted by a background thread, up to prefetch chunks ahead of the consumer,
+    so reading from Java side overlaps with processing of documents on python side.
+    The stream is closed when the generator is exhausted or closed.
+    """
+    producer = _ChunksProducer(document_stream, convert, chunk_size, prefetch)
+    producer.start()
+    try:
+        while True:
+            item = producer.queue.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        producer.stopped.set()
+
+
+def prefetch_documents(document_stream, convert, chunk_size=100, prefetch=2):
+    """
+    Generator of converted documents of the stream, which are read by a background thread,
+    see maprdb.streams.prefetch_chunks.
+    """
+    chunks = prefetch_chunks(document_stream, convert, chunk_size, prefetch)
+    try:
+        for chunk in chunks:
+            for document in chunk:
+                yield document
+    finally:
+        chunks.close()
@@ -0,0 +1,212 @@
+"""
+Pool of open table handles, shared by the users of a connection.
+"""
+import contextlib
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledTable(object):
+    __slots__ = ("table", "references", "released_at", "opened")
+
+    def __init__(self):
+        self.table = None
+        self.references = 0
+        self.released_at = None
+        # set when the table is opened or failed to open
+        self.opened = threading.Event()
+
+
+class TablePool(object):
+    """
+    Keeps one open maprdb.Table per path and counts its users.
+    Tables, which are not used for idle_ttl seconds, are closed.
+    Idle tables are checked whenever a table is acquired or released.
+    Tables are opened outside of the pool lock, users of other paths don't wait for it.
+    """
+    def __init__(self, open_table, idle_ttl=60.0, clock=time.monotonic):
+        """
+        :param open_table: function, which takes table path and returns maprdb.Table
+        :param idle_ttl: seconds, after which unused table is closed
+        :param clock: function returning current time in seconds
+        """
+        self._open_table = open_table
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tables = {}
+        # tables discarded while they were in use, by path, closed when released by all users
+        self._discarded = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, name):
+        """
+        Returns open table for the path, opens it if it's not in the pool.
+        Every call should be paired with release() of the returned table.
+        :param name: table path [str]
+        :returns: maprdb.Table
+        """
+        while True:
+            with self._lock:
+                pooled = self._tables.get(name)
+                opening = pooled is None
+                if opening:
+                    self.misses += 1
+                    pooled = self._tables[name] = _PooledTable()
+                else:
+                    self.hits += 1
+                pooled.references += 1
+                idle = self._pop_idle()
+            self._close(idle)
+
+            if opening:
+                try:
+                    pooled.table = self._open_table(name)
+                except Exception:
+                    with self._lock:
+                        if self._tables.get(name) is pooled:
+                            del self._tables[name]
+                        self._remove_discarded(name, pooled)
+                    raise
+                finally:
+                    pooled.opened.set()
+                return pooled.table
+
+            pooled.opened.wait()
+            if pooled.table is not None:
+                return pooled.table
+            # opening by another user failed, try again
+            with self._lock:
+                pooled.references -= 1
+
+    def release(self, name, table=None):
+        """
+        Marks that one user of the table doesn't need it anymore.
+        :param name: table path [str]
+        :param table: maprdb.Table returned by acquire(), required only if the table was discarded
+        while in use and the path was acquired again, to tell the tables apart
+        """
+        with self._lock:
+            current = self._tables.get(name)
+            candidates = ([current] if current is not None else []) + self._discarded.get(name, [])
+            if table is not None:
+                candidates = [pooled for pooled in candidates if pooled.table is table]
+            if not candidates:
+                # closed while it was in use
+                return
+            in_use = [pooled for pooled in candidates if pooled.references]
+            if not in_use:
+                raise ValueError("Table '{}' is not acquired".format(name))
+            if len(in_use) > 1:
+                raise ValueError("Table '{}' was discarded while in use, pass the released table".format(name))
+            pooled = in_use[0]
+            pooled.references -= 1
+            closed = []
+            if pooled.references == 0:
+                if pooled is current:
+                    pooled.released_at = self._clock()
+                else:
+                    self._remove_discarded(name, pooled)
+                    closed.append(pooled.table)
+            idle = self._pop_idle()
+        self._close(closed + idle)
+
+    @contextlib.contextmanager
+    def table(self, name):
+        """
+        Context manager, which acquires table for the block and releases it afterwards.
+        :param name: table path [str]
+        """
+        table = self.acquire(name)
+        try:
+            yield table
+        finally:
+            self.release(name, table)
+
+    def _pop_idle(self):
+        now = self._clock()
+        idle = [name for name, pooled in self._tables.items()
+                if pooled.references == 0 and now - pooled.released_at >= self.idle_ttl]
+        self.evictions += len(idle)
+        return [self._tables.pop(name).table for name in idle]
+
+    def _remove_discarded(self, name, pooled):
+        discarded = self._discarded.get(name, [])
+        if pooled in discarded:
+            discarded.remove(pooled)
+            if not discarded:
+                del self._discarded[name]
+
+    def _discard(self, name, pooled):
+        """
+        Removes table from the pool, returns it if it should be closed now.
+        Table in use is closed when it's released by all users.
+        """
+        if pooled.references == 0:
+            return [pooled.table]
+        self._discarded.setdefault(name, []).append(pooled)
+        return []
+
+    def _close(self, tables):
+        for table in tables:
+            try:
+                table.close()
+            except Exception as e:
+                logger.warning("Failed to close idle table: %s", e)
+
+    def evict_idle(self):
+        """
+        Closes tables, which were not used for idle_ttl seconds.
+        """
+        with self._lock:
+            idle = self._pop_idle()
+        self._close(idle)
+
+    def discard(self, name):
+        """
+        Removes table from the pool, e.g. when the table is deleted.
+        The table is closed unless it's in use.
+        """
+        with self._lock:
+            pooled = self._tables.pop(name, None)
+            tables = self._discard(name, pooled) if pooled is not None else []
+        self._close(tables)
+
+    def close(self):
+        """
+        Closes all tables of the pool, including acquired ones.
+        Tables, which are being opened, are closed when they are released.
+        """
+        with self._lock:
+            tables = []
+            for name, pooled in self._tables.items():
+                if pooled.opened.is_set():
+                    tables.append(pooled.table)
+                else:
+                    self._discarded.setdefault(name, []).append(pooled)
+            for discarded in self._discarded.values():
+                tables.extend(pooled.table for pooled in discarded if pooled.opened.is_set())
+                discarded[:] = [pooled for pooled in discarded if not pooled.opened.is_set()]
+            self._discarded = {name: discarded for name, discarded in self._discarded.items() if discarded}
+            self._tables.clear()
+        self._close(tables)
+
+    def stats(self):
+        """
+        :returns: dictionary with numbers of hits, misses and evictions,
+        open tables and tables in use.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "open": len(self._tables),
+                "in_use": sum(1 for pooled in self._tables.values() if pooled.references),
+            }
@@ -1,6 +1,38 @@
-from maprdb.utils import handle_java_exceptions, python_to_java_cast, MapRDBError, java_to_python_cast
-from maprdb.document import Document
+from maprdb.utils import handle_java_exceptions, python_to_java_cast, MapRDBError, MapRDBMultiOpError, \
+    shared_executor, call_attached_to_jvm, LRUCache
+from maprdb.document import Document, LazyDocument
+from maprdb.bulk_writer import BulkWriter
+from maprdb import columnar
+from maprdb import parallel_scan
+from maprdb import bulk_mutations
+from maprdb.backends.memory import project
+from maprdb.metrics import footprint
+from maprdb.streams import iterate_documents, iterate_chunks, prefetch_chunks, prefetch_documents
+import collections
 import copy
+import itertools
+import multiprocessing
+import threading
+
+
+_NOT_CACHED = object()
+
+
+def _future_result(future):
+    try:
+        return future.result(), None
+    except Exception as e:
+        return None, e
+
+
+def _document_size(document):
+    """
+    Approximate memory used by a cached document, None for missing documents.
+    """
+    if document is None:
+        return 16
+    values, size = footprint(document)
+    return size + 16 * values
 
 
 class Table(object):
@@ -10,59 +42,515 @@ class Table(object):
     This class is usually not instantiated by user,
     but returned from methods of maprdb.connection.Connection.get and maprdb.connection.Connection.create.
     """
-    def __init__(self, java_table):
+    def __init__(self, java_table, options=None):
         self.java_table = java_table
+        self.options = options if options is not None else {}
+        self._python_values = getattr(java_table, "python_values", False)
+        self._cache = None
+        self._negative_ttl = None
+        # incremented by every invalidation, documents read before it are not cached
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+        if self.options.get("document_cache"):
+            cache_options = self.options["document_cache"]
+            self.enable_cache(**(cache_options if isinstance(cache_options, dict) else {}))
+
+    def _cast(self, value):
+        """
+        Converts python value to the form accepted by the underlying table, see maprdb.backends.
+        """
+        return value if self._python_values else python_to_java_cast(value)
+
+    def _cast_document(self, doc, json_encoding=None):
+        if self._python_values:
+            return doc
+        if json_encoding is None:
+            json_encoding = self.options.get("json_encoding", False)
+        return Document.java_document_from_json(doc) if json_encoding else python_to_java_cast(doc)
+
+    def _document_converter(self, json_conversion=None, lazy=None):
+        if self._python_values:
+            return Document
+        if lazy is None:
+            lazy = self.options.get("lazy_documents", False)
+        if lazy:
+            return LazyDocument
+        if json_conversion is None:
+            json_conversion = self.options.get("json_conversion", False)
+        return Document.python_document_from_json if json_conversion else Document.python_document_from_java
+
+    def _run_concurrently(self, function, items, parallelism=None):
+        """
+        Calls function for every item. Calls are made on JVM-attached worker threads
+        if parallelism is above 1 or "executor" option of connection is set.
+        Without the option, at most parallelism calls run at once on threads of maprdb.utils.shared_executor.
+
+        :returns: list of (result, error) pairs in the order of items
+        """
+        if parallelism is None:
+            parallelism = self.options.get("parallelism", 1)
+        executor = self.options.get("executor")
+
+        if executor is None and (parallelism <= 1 or len(items) <= 1):
+            results = []
+            for item in items:
+                try:
+                    results.append((function(item), None))
+                except Exception as e:
+                    results.append((None, e))
+            return results
+
+        window = len(items) if executor is not None else parallelism
+        executor = executor if executor is not None else shared_executor()
+        futures = collections.deque()
+        results = []
+        try:
+            for item in items:
+                if len(futures) >= window:
+                    results.append(_future_result(futures.popleft()))
+                futures.append(executor.submit(call_attached_to_jvm, function, item))
+            while futures:
+                results.append(_future_result(futures.popleft()))
+            return results
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _for_each_key(self, function, keys, parallelism=None):
+        errors = {}
+        for k, (_, error) in zip(keys, self._run_concurrently(function, keys, parallelism)):
+            if error is not None:
+                errors[k] = error
+        if errors:
+            raise MapRDBMultiOpError(errors)
 
     @handle_java_exceptions
-    def find_by_id(self, key, columns=None):
+    def find_by_id(self, key, columns=None, json_conversion=None, batch_size=100, parallelism=4, lazy=None):
         """
         Finds the specified record (document), possibly returning only a subset of available columns.
         If key is a list, return a list of results, one for each key value.
         Results (documents) are returned as a dict.
 
-        :param key: string value, which is _id of the record to find.
+        :param key: string value, which is _id of the record to find, or iterable of such values.
+        Keys of iterable are split into batches, which are fetched concurrently.
         :param columns: list of strings, which
         specifies certain columns to select from the returned document.
+        :param json_conversion: if True, document is converted through JSON string in one call,
+        by default "json_conversion" option of connection is used.
+        :param batch_size: number of keys fetched by one worker thread at once.
+        :param parallelism: maximum number of worker threads fetching batches of keys.
+        :param lazy: if True, maprdb.document.LazyDocument is returned, which fields are converted
+        on first access, by default "lazy_documents" option of connection is used.
         :returns: maprdb.document.Document class instance,
         which is the document found. If document was not found returns None.
+        If key is iterable, returns list of results in the order of keys.
         """
+        convert = self._document_converter(json_conversion, lazy)
+        cached = self._cache is not None and convert is not LazyDocument
+        if isinstance(key, (str, bytes)) or not hasattr(key, '__iter__'):
+            if cached:
+                return self._find_cached([key], columns, convert, batch_size, parallelism)[0]
+            return self._find_by_id(key, columns, convert)
+
+        if cached:
+            return self._find_cached(list(key), columns, convert, batch_size, parallelism)
+        return self._find_by_ids(list(key), columns, convert, batch_size, parallelism)
+
+    def _find_by_ids(self, keys, columns, convert, batch_size, parallelism):
+        batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+        documents = []
+        for batch_result, error in self._run_concurrently(
+                lambda batch: self._find_batch_by_id(batch, columns, convert), batches, parallelism):
+            if error is not None:
+                raise error
+            documents.extend(batch_result)
+        return documents
+
+    def _find_by_id(self, key, columns, convert):
         java_document = self.java_table.findById(key, columns) if columns else self.java_table.findById(key)
         if java_document:
-            return Document.python_document_from_java(java_document)
+            return convert(java_document)
         else:
             return None
 
-    def _find_by_java_document_stream(self, document_stream):
-        iterator = document_stream.iterator()
+    @handle_java_exceptions
+    def _find_batch_by_id(self, keys, columns, convert):
+        return [self._find_by_id(k, columns, convert) for k in keys]
 
-        while iterator.hasNext():
-            yield Document(java_to_python_cast(iterator.next()))
-        document_stream.close()
+    def _find_cached(self, keys, columns, convert, batch_size, parallelism):
+        """
+        Looks keys up in the cache, whole documents of missing keys are read and cached,
+        columns are selected from the cached documents.
+        """
+        cache = self._cache
+        generation = self._cache_generation
+        documents = [cache.get(k, _NOT_CACHED) for k in keys]
+        missing = [i for i, document in enumerate(documents) if document is _NOT_CACHED]
+        found = []
+        if len(missing) == 1:
+            found = [self._find_by_id(keys[missing[0]], None, convert)]
+        elif missing:
+            found = self._find_by_ids([keys[i] for i in missing], None, convert, batch_size, parallelism)
+        with self._cache_lock:
+            # a write during the read could have invalidated keys, which documents are stale now
+            fresh = generation == self._cache_generation
+            for i, document in zip(missing, found):
+                documents[i] = document
+                if not fresh:
+                    continue
+                if document is not None:
+                    cache.put(keys[i], document)
+                elif self._negative_ttl != 0:
+                    cache.put(keys[i], None, ttl=self._negative_ttl)
+
+        results = []
+        for document in documents:
+            if document is None:
+                results.append(None)
+            elif columns:
+                results.append(Document(project(document, columns)))
+            else:
+                results.append(copy.deepcopy(document))
+        return results
+
+    def enable_cache(self, maxsize=10000, max_bytes=None, ttl=60.0, negative_ttl=None):
+        """
+        Enables read-through cache of documents found by find_by_id, so reads of cached keys make no calls to Java.
+        Whole documents are cached, columns are selected from them, and copies are returned.
+        Keys written by insert, insert_or_replace, update and delete of this table are invalidated,
+        changes made by other clients are seen once entries expire.
+        Lazy documents are not cached.
+
+        :param maxsize: maximum number of cached keys.
+        :param max_bytes: maximum approximate size of cached documents, unlimited if None.
+        :param ttl: seconds a document is cached for, forever if None.
+        :param negative_ttl: seconds a missing document is cached for, ttl by default, 0 disables it.
+        """
+        self._cache = LRUCache(maxsize=maxsize, max_bytes=max_bytes, ttl=ttl,
+                               sizeof=_document_size if max_bytes is not None else None)
+        self._negative_ttl = negative_ttl
+
+    def disable_cache(self):
+        """
+        Disables cache of find_by_id and drops cached documents.
+        """
+        self._cache = None
+
+    def cache_info(self):
+        """
+        Returns statistics of the cache of find_by_id.
+        :returns: dict with hits, misses, hit_rate, evictions, expirations, size, maxsize, bytes and max_bytes keys,
+        None if cache is disabled
+        """
+        return self._cache.info() if self._cache is not None else None
+
+    def _invalidate(self, keys):
+        if self._cache is not None:
+            with self._cache_lock:
+                self._cache_generation += 1
+                for k in keys:
+                    self._cache.pop(k)
+
+    def _find_by_java_document_stream(self, document_stream, json_conversion=None, prefetch=0, chunk_size=100,
+                                      lazy=None):
+        convert = self._document_converter(json_conversion, lazy)
+        if not prefetch:
+            return iterate_documents(document_stream, convert)
+        return prefetch_documents(document_stream, convert, chunk_size, prefetch)
+
+    def _open_document_stream(self, condition=None, columns=None):
+        if condition is None:
+            return self.java_table.find(columns) if columns else self.java_table.find()
+        return self.java_table.find(self._cast(condition), columns) if columns else self.java_table.find(self._cast(condition))
 
     @handle_java_exceptions
-    def find(self, columns=None):
+    def find(self, columns=None, json_conversion=None, prefetch=0, chunk_size=100, lazy=None):
         """
         Returns a generator that iterates over all documents in the table, possibly returning only some columns.
 
         :param columns: list of strings, which
         specifies certain columns to select from the returned document.
+        :param json_conversion: if True, documents are converted through JSON strings in one call each,
+        by default "json_conversion" option of connection is used.
+        :param prefetch: if above 0, documents are read and converted by a background thread
+        in chunks of chunk_size documents, up to prefetch chunks ahead of the consumer.
+        :param chunk_size: number of documents in a chunk read by the background thread.
+        :param lazy: if True, documents are maprdb.document.LazyDocument instances, which fields
+        are converted on first access, by default "lazy_documents" option of connection is used.
         :returns: generator, which returns maprdb.document.Document class instances.
         """
-        document_stream = self.java_table.find(columns) if columns else self.java_table.find()
-        return self._find_by_java_document_stream(document_stream)
+        document_stream = self._open_document_stream(columns=columns)
+        return self._find_by_java_document_stream(document_stream, json_conversion, prefetch, chunk_size, lazy)
 
 
-    def find_by_condition(self, condition, columns=None):
+    def find_by_condition(self, condition, columns=None, json_conversion=None, prefetch=0, chunk_size=100,
+                          lazy=None):
         """
         Returns a generator that iterates over all documents that satisfy the passed condition.
+        If MapRDB has no native "in" condition, long $in lists are split into several queries,
+        which results are merged.
 
         :param condition: maprdb.document.Condition class instance
         :param columns: list of strings, which
         specifies certain columns to select from the returned document.
+        :param json_conversion: if True, documents are converted through JSON strings in one call each,
+        by default "json_conversion" option of connection is used.
+        :param prefetch: if above 0, documents are read and converted by a background thread
+        in chunks of chunk_size documents, up to prefetch chunks ahead of the consumer.
+        :param chunk_size: number of documents in a chunk read by the background thread.
+        :param lazy: if True, documents are maprdb.document.LazyDocument instances, which fields
+        are converted on first access, by default "lazy_documents" option of connection is used.
+        :returns: generator, which returns maprdb.document.Document class instances.
+        """
+        split_in = None if self._python_values else getattr(condition, "_split_in", None)
+        conditions = split_in() if split_in else [condition]
+        if len(conditions) > 1:
+            return self._find_by_split_condition(conditions, columns, json_conversion, prefetch, chunk_size, lazy)
+
+        document_stream = self._open_document_stream(condition, columns)
+        return self._find_by_java_document_stream(document_stream, json_conversion, prefetch, chunk_size, lazy)
+
+    def _find_by_split_condition(self, conditions, columns, json_conversion, prefetch, chunk_size, lazy):
+        seen_keys = set()
+        for condition in conditions:
+            document_stream = self._open_document_stream(condition, columns)
+            documents = self._find_by_java_document_stream(document_stream, json_conversion, prefetch, chunk_size,
+                                                           lazy)
+            try:
+                for document in documents:
+                    if document['_id'] not in seen_keys:
+                        seen_keys.add(document['_id'])
+                        yield document
+            finally:
+                documents.close()
+
+    @handle_java_exceptions
+    def scan(self, start=None, stop=None, limit=None, reverse=False, columns=None, after=None,
+             json_conversion=None):
+        """
+        Returns a generator that iterates over documents with start <= _id < stop in the order of _id.
+        Bounds are sent to the server as _id condition, the scan is stopped after limit documents,
+        so reading the first page of a range doesn't read the rest of it.
+        Pages can be resumed from the last seen key:
+
+        >>> page = list(table.scan(start="a", stop="b", limit=100))
+        >>> next_page = list(table.scan(start="a", stop="b", limit=100, after=page[-1]["_id"]))
+
+        :param start: the smallest key of the range, unbounded if None.
+        :param stop: the key after the range, unbounded if None.
+        :param limit: maximum number of returned documents, unlimited if None.
+        :param reverse: if True, documents are returned in descending order of _id.
+        Java API has no reverse scans, so the whole range is read, and only the last limit documents are kept.
+        :param columns: list of strings, which
+        specifies certain columns to select from the returned document.
+        :param after: the last key seen by the caller, only keys after it (before it if reverse is True)
+        are returned.
+        :param json_conversion: if True, documents are converted through JSON strings in one call each,
+        by default "json_conversion" option of connection is used.
+        :returns: generator, which returns maprdb.document.Document class instances.
+        """
+        from maprdb.conditions import Condition
+        if limit is not None and limit <= 0:
+            return iter(())
+
+        bounds = {}
+        if start is not None:
+            bounds["$ge"] = start
+        if after is not None and not reverse:
+            bounds["$gt"] = after
+        upper_bounds = [key for key in (stop, after if reverse else None) if key is not None]
+        if upper_bounds:
+            bounds["$lt"] = min(upper_bounds)
+
+        if bounds:
+            documents = self.find_by_condition(Condition({"_id": bounds}), columns, json_conversion)
+        else:
+            documents = self.find(columns, json_conversion)
+        return self._limit_scan(documents, limit, reverse)
+
+    def _limit_scan(self, documents, limit, reverse):
+        try:
+            if reverse:
+                kept = collections.deque(documents, maxlen=limit)
+                documents.close()
+                while kept:
+                    yield kept.pop()
+            elif limit is None:
+                yield from documents
+            else:
+                for document in itertools.islice(documents, limit):
+                    yield document
+        finally:
+            documents.close()
+
+    @handle_java_exceptions
+    def iter_chunks(self, condition=None, columns=None, chunk_size=100, prefetch=2, json_conversion=None,
+                    lazy=None):
+        """
+        Returns a generator that iterates over lists of documents, which satisfy the passed condition.
+        Reading from the table overlaps with processing of the documents by the consumer.
+        The scan is stopped as soon as the generator is closed.
+
+        :param condition: maprdb.document.Condition class instance, if None all documents are returned.
+        :param columns: list of strings, which
+        specifies certain columns to select from the returned document.
+        :param chunk_size: maximum number of documents in a list.
+        :param prefetch: number of chunks read and converted by a background thread ahead of the consumer,
+        if 0, chunks are read by the consumer's thread.
+        :param json_conversion: if True, documents are converted through JSON strings in one call each,
+        by default "json_conversion" option of connection is used.
+        :param lazy: if True, documents are maprdb.document.LazyDocument instances, which fields
+        are converted on first access, by default "lazy_documents" option of connection is used.
+        :returns: generator, which returns lists of maprdb.document.Document class instances.
+        """
+        document_stream = self._open_document_stream(condition, columns)
+        convert = self._document_converter(json_conversion, lazy)
+        if not prefetch:
+            return iterate_chunks(document_stream, convert, chunk_size)
+        return prefetch_chunks(document_stream, convert, chunk_size, prefetch)
+
+    @handle_java_exceptions
+    def find_columnar(self, columns, condition=None, chunk_size=10000, prefetch=0,
+                      as_arrow=False, dictionary_encode=False, arrow_schema=None):
+        """
+        Reads the columns of documents, which satisfy the passed condition, into typed column arrays.
+        Only the requested fields are converted, no per-document dicts are created.
+        Requires numpy, or pyarrow if as_arrow is True.
+
+        :param columns: list of strings, which are field paths to read.
+        :param condition: maprdb.document.Condition class instance, if None all documents are read.
+        :param chunk_size: number of documents converted to column arrays at once.
+        :param prefetch: if above 0, documents are read by a background thread,
+        up to prefetch chunks ahead, see maprdb.tables.Table.iter_chunks.
+        :param as_arrow: if True, returns generator of pyarrow.RecordBatch objects, one per chunk.
+        :param dictionary_encode: if True, string columns are dictionary encoded.
+        :param arrow_schema: pyarrow.Schema or dict of pyarrow types of columns, by default types are inferred
+        from the first values of columns, see maprdb.columnar.arrow_batches.
+        :returns: dict, which maps column names to numpy.ma.MaskedArray objects
+        (masks are set for missing values) or maprdb.columnar.DictionaryEncoded objects.
+        If as_arrow is True, returns generator of pyarrow.RecordBatch objects.
+        """
+        if as_arrow:
+            columnar.require_pyarrow()
+        else:
+            columnar.require_numpy()
+
+        document_stream = self._open_document_stream(condition, columns)
+        read_row = columnar.row_reader(columns)
+        if prefetch:
+            row_chunks = prefetch_chunks(document_stream, read_row, chunk_size, prefetch)
+        else:
+            row_chunks = iterate_chunks(document_stream, read_row, chunk_size)
+
+        if as_arrow:
+            return columnar.arrow_batches(row_chunks, columns, dictionary_encode, arrow_schema)
+        return columnar.numpy_columns(row_chunks, columns, dictionary_encode)
+
+    def parallel_scan(self, workers=None, condition=None, columns=None, ordered=True, split_points=None,
+                      chunk_size=1000, json_conversion=None):
+        """
+        Returns a generator that iterates over documents, which satisfy the passed condition,
+        read by worker processes. The _id space is split into ranges, several per worker,
+        each range is scanned by a worker process with its own connection.
+        Table should be opened by maprdb.connection.Connection, which backend is passed to workers.
+
+        :param workers: number of worker processes, number of CPUs by default.
+        :param condition: maprdb.conditions.Condition created from shorthand, or the shorthand itself.
+        :param columns: list of strings, which
+        specifies certain columns to select from the returned document.
+        :param ordered: if True, documents are returned in _id order of ranges,
+        otherwise as soon as they are read by any of the workers.
+        :param split_points: sorted keys, which separate the ranges. By default ranges are tablets of the table,
+        if it has fewer tablets than workers, split points are chosen from the first
+        maprdb.parallel_scan.SPLIT_SAMPLE_SIZE keys.
+        :param chunk_size: number of documents sent by a worker at once.
+        :param json_conversion: if True, documents are converted through JSON strings by workers,
+        by default "json_conversion" option of connection is used.
         :returns: generator, which returns maprdb.document.Document class instances.
         """
-        document_stream = self.java_table.find(python_to_java_cast(condition), columns) if columns else self.java_table.find(python_to_java_cast(condition))
-        return self._find_by_java_document_stream(document_stream)
+        from maprdb.connection import Connection
+        if Connection.instance is None:
+            raise MapRDBError("Parallel scan requires a table opened by maprdb.connection.Connection")
+        shorthand = self._condition_shorthand(condition, "Parallel scan")
+        if json_conversion is None:
+            json_conversion = self.options.get("json_conversion", False)
+
+        workers = workers or multiprocessing.cpu_count()
+        self.flush()
+        if split_points is None:
+            split_points = self._split_points(shorthand, workers)
+        ranges = parallel_scan.key_ranges(split_points)
+        return parallel_scan.parallel_scan(Connection.instance.backend, str(self.java_table.getName()), ranges,
+                                           shorthand, columns, workers, ordered, chunk_size, json_conversion)
+
+    def _split_points(self, shorthand, workers):
+        split_points = parallel_scan.tablet_split_points(self.java_table)
+        if split_points is not None and len(split_points) + 1 >= workers:
+            return split_points
+        # keys are read from a bounded prefix of the table, small tables are split evenly
+        keys = self.keys(shorthand)
+        try:
+            return parallel_scan.sample_split_points(itertools.islice(keys, parallel_scan.SPLIT_SAMPLE_SIZE),
+                                                     workers * 4)
+        finally:
+            keys.close()
+
+    @staticmethod
+    def _condition_shorthand(condition, operation):
+        shorthand = condition if condition is None or isinstance(condition, (dict, list)) \
+            else getattr(condition, "_initial", None)
+        if condition is not None and shorthand is None:
+            raise MapRDBError("{} supports only conditions created from shorthand".format(operation))
+        return shorthand
+
+    @staticmethod
+    def _as_condition(condition):
+        from maprdb.conditions import Condition
+        return Condition(condition) if isinstance(condition, (dict, list)) else condition
+
+    def _open_key_stream(self, condition=None, start=None, stop=None):
+        if start is not None or stop is not None:
+            condition = parallel_scan.range_condition(self._condition_shorthand(condition, "Key range"), start, stop)
+        return self._open_document_stream(self._as_condition(condition), ["_id"])
+
+    def _document_key(self, document):
+        return document["_id"] if self._python_values else document.getIdString()
+
+    @handle_java_exceptions
+    def keys(self, condition=None, start=None, stop=None):
+        """
+        Returns a generator that iterates over _id of documents, which satisfy the passed condition.
+        Only _id is read from the server, and no documents are converted.
+
+        :param condition: maprdb.conditions.Condition class instance or its shorthand,
+        if None all keys are returned.
+        :param start: the smallest key, unbounded if None.
+        :param stop: the key after the last returned one, unbounded if None.
+        Condition should be created from shorthand, if start or stop is set.
+        :returns: generator, which returns keys in the order of the scan.
+        """
+        return iterate_documents(self._open_key_stream(condition, start, stop), self._document_key)
+
+    @handle_java_exceptions
+    def count(self, condition=None):
+        """
+        Counts documents, which satisfy the passed condition.
+        Only _id is read from the server, documents are skipped without conversion.
+
+        :param condition: maprdb.conditions.Condition class instance or its shorthand,
+        if None all documents are counted.
+        :returns: number of documents.
+        """
+        document_stream = self._open_key_stream(condition)
+        try:
+            iterator = document_stream.iterator()
+            count = 0
+            while iterator.hasNext():
+                iterator.next()
+                count += 1
+            return count
+        finally:
+            document_stream.close()
 
     def _fill_document_key(self, doc, key=None):
         if '_id' not in doc:
@@ -76,7 +564,7 @@ class Table(object):
         return doc
 
     @handle_java_exceptions
-    def insert(self, doc, key=None):
+    def insert(self, doc, key=None, json_encoding=None):
         """
         Insert the document in the database. If the document already exists,
         maprdb.utils.MapRDBError is raised
@@ -85,58 +573,229 @@ class Table(object):
         If the user specific a key, it will be added to the document automatically as _id field, if the document contains an _id and a key is passed, an maprdb.utils.MapRDBError will be raised.
         Finally if a document with this key already exist maprdb.utils.MapRDBError will be raised by the server as well.
         :param key: string value, which is _id of the record to find.
+        :param json_encoding: if True, document is passed to Java as OJAI JSON string in one call,
+        by default "json_encoding" option of connection is used.
         """
         doc = self._fill_document_key(doc, key=key)
-        self.java_table.insert(python_to_java_cast(doc))
+        try:
+            self.java_table.insert(self._cast_document(doc, json_encoding))
+        finally:
+            self._invalidate([doc['_id']])
 
     @handle_java_exceptions
-    def insert_or_replace(self, doc, key=None):
+    def insert_or_replace(self, doc, key=None, json_encoding=None):
         """
         Insert the document in the database. If the document already exists, it gets replaced.
 
         :param doc: maprdb.document.Document class instance, that should have an _id field. If not present an exception should be raised.
         If the user specific a key, it will be added to the document automatically as _id field, if the document contains an _id and a key is passed, an maprdb.utils.MapRDBError will be raised.
         :param key: string value, which is _id of the record to find.
+        :param json_encoding: if True, document is passed to Java as OJAI JSON string in one call,
+        by default "json_encoding" option of connection is used.
         """
         doc = self._fill_document_key(doc, key=key)
-        self.java_table.insertOrReplace(python_to_java_cast(doc))
+        try:
+            self.java_table.insertOrReplace(self._cast_document(doc, json_encoding))
+        finally:
+            self._invalidate([doc['_id']])
+
+    def bulk_writer(self, batch_size=1000, flush_interval=None):
+        """
+        Returns a writer, which queues documents and writes them to the table in batches.
+        Should be used as a context manager, on exit all queued documents are written and the table is flushed.
+        Documents failed to be written don't stop the writer, they are reported in its failures list.
+
+        >>> with table.bulk_writer(batch_size=1000) as writer:
+        ...     writer.insert_or_replace({'_id': 'doc1', 'count': 7})
+
+        :param batch_size: number of documents converted and written at once.
+        :param flush_interval: if set, a partial batch is written when a document is added
+        later than flush_interval seconds after the previous batch.
+        :returns: maprdb.bulk_writer.BulkWriter class instance
+        """
+        return BulkWriter(self, batch_size=batch_size, flush_interval=flush_interval)
 
     @handle_java_exceptions
-    def update(self, key, mutation):
+    def update(self, key, mutation, parallelism=None):
         """
         Performs the requested mutation on the document with the specified key(s).
 
         :param key: string value or list of strings, if it is a list,
         then the same mutation will be applied to each document specified by the elements of the list.
         :param mutation: maprdb.mutation.Mutation class instance, which is a mutation to perform.
+        :param parallelism: number of worker threads updating documents of the list,
+        by default "parallelism" option of connection is used, which defaults to 1.
+        If some of documents fail to be updated, others are still updated
+        and maprdb.utils.MapRDBMultiOpError with errors per key is raised.
         """
-        keys_list = key if isinstance(key, (list,tuple)) else [key]
+        java_mutation = self._cast(mutation)
+        if not isinstance(key, (list,tuple)):
+            self._update(key, java_mutation)
+            return
 
-        for k in keys_list:
-            self.java_table.update(k, python_to_java_cast(mutation))
+        self._for_each_key(lambda k: self._update(k, java_mutation), list(key), parallelism)
 
     @handle_java_exceptions
-    def update_all(self, values):
+    def _update(self, key, java_mutation):
+        try:
+            self.java_table.update(key, java_mutation)
+        finally:
+            self._invalidate([key])
+
+    @handle_java_exceptions
+    def update_all(self, values, parallelism=None):
         """
         For every dictionary entry, performs the requested mutation on the document with the specified key(s).
 
         :param values: dict value, which as key has a key of document to update, and as a value has a mutation,
         to perform on it.
+        :param parallelism: number of worker threads updating documents,
+        by default "parallelism" option of connection is used, which defaults to 1.
+        If some of documents fail to be updated, others are still updated
+        and maprdb.utils.MapRDBMultiOpError with errors per key is raised.
         """
-        for k in values.keys():
-            self.update(k, values[k])
+        self._for_each_key(lambda k: self._update(k, self._cast(values[k])), list(values.keys()), parallelism)
+
+    @handle_java_exceptions
+    def check_and_mutate(self, key, condition, mutation):
+        """
+        Atomically performs the mutation on the document with the specified key,
+        if the document satisfies the condition. The condition is evaluated by the server,
+        so the document is not read by the client.
+
+        >>> table.check_and_mutate("order1", {"state": "new"}, Mutation().set("state", "paid"))
+
+        :param key: string value, which is _id of the document.
+        :param condition: maprdb.conditions.Condition class instance or its shorthand.
+        :param mutation: maprdb.mutation.Mutation class instance or its shorthand.
+        :returns: True if the condition was satisfied and the document was mutated.
+        """
+        return self._check_and_mutate(key, self._cast(self._as_condition(condition)),
+                                      self._cast(self._as_mutation(mutation)))
+
+    @handle_java_exceptions
+    def _check_and_mutate(self, key, java_condition, java_mutation):
+        try:
+            return bool(self.java_table.checkAndMutate(key, java_condition, java_mutation))
+        finally:
+            self._invalidate([key])
 
     @handle_java_exceptions
-    def delete(self, key):
+    def check_and_replace(self, key, condition, doc, json_encoding=None):
+        """
+        Atomically replaces the document with the specified key, if the document satisfies the condition.
+
+        :param key: string value, which is _id of the document.
+        :param condition: maprdb.conditions.Condition class instance or its shorthand.
+        :param doc: maprdb.document.Document class instance, which replaces the document.
+        If it has _id, it should be equal to the key.
+        :param json_encoding: if True, document is passed to Java as OJAI JSON string in one call,
+        by default "json_encoding" option of connection is used.
+        :returns: True if the condition was satisfied and the document was replaced.
+        """
+        if '_id' in doc and doc['_id'] != key:
+            raise MapRDBError("_id property of document differs from the key.")
+        doc = self._fill_document_key(doc, key=None if '_id' in doc else key)
+        try:
+            return bool(self.java_table.checkAndReplace(key, self._cast(self._as_condition(condition)),
+                                                        self._cast_document(doc, json_encoding)))
+        finally:
+            self._invalidate([key])
+
+    @handle_java_exceptions
+    def check_and_mutate_all(self, operations, parallelism=None):
+        """
+        Performs maprdb.tables.Table.check_and_mutate for every operation, concurrently if parallelism is above 1.
+
+        :param operations: iterable of (key, condition, mutation) tuples.
+        :param parallelism: number of worker threads performing operations,
+        by default "parallelism" option of connection is used, which defaults to 1.
+        If some of operations fail, others are still performed
+        and maprdb.utils.MapRDBMultiOpError with errors per key is raised.
+        :returns: list of booleans in the order of operations, True if the document was mutated.
+        """
+        # conditions and mutations are converted on the caller's thread, the calls of workers are to Java only
+        casted = [(key, self._cast(self._as_condition(condition)), self._cast(self._as_mutation(mutation)))
+                  for key, condition, mutation in operations]
+        results = self._run_concurrently(lambda operation: self._check_and_mutate(*operation), casted, parallelism)
+        errors = {operation[0]: error for operation, (_, error) in zip(casted, results) if error is not None}
+        if errors:
+            raise MapRDBMultiOpError(errors)
+        return [result for result, _ in results]
+
+    @staticmethod
+    def _as_mutation(mutation):
+        from maprdb.mutation import Mutation
+        return Mutation(mutation) if isinstance(mutation, list) else mutation
+
+    @handle_java_exceptions
+    def delete(self, key, parallelism=None):
         """
         Deletes the document with the specified key.
 
-        :param key: string value or list of strings, ff it is a list, documents matching the keys are deleted as a batch.
+        :param key: string value or list of strings, if it is a list, documents matching the keys are deleted
+        by parallelism worker threads.
+        :param parallelism: number of worker threads deleting documents of the list,
+        by default "parallelism" option of connection is used, which defaults to 1.
+        If some of documents fail to be deleted, others are still deleted
+        and maprdb.utils.MapRDBMultiOpError with errors per key is raised.
+        """
+        if not isinstance(key, (list,tuple)):
+            self._delete(key)
+            return
+
+        self._for_each_key(self._delete, list(key), parallelism)
+
+    def delete_where(self, condition, parallelism=4, batch_size=100, rate=None, progress=None):
+        """
+        Deletes documents, which satisfy the passed condition.
+        Keys are streamed from a scan of _id to worker threads, so memory use doesn't depend
+        on the number of deleted documents. Failed deletes don't stop the others.
+
+        >>> report = table.delete_where({"status": "expired"}, rate=1000, progress=print)
+
+        :param condition: maprdb.conditions.Condition class instance or its shorthand.
+        :param parallelism: number of worker threads deleting documents.
+        :param batch_size: number of keys deleted by a worker thread at once.
+        :param rate: maximum number of deleted documents per second, unlimited if None.
+        :param progress: function called with maprdb.bulk_mutations.BulkMutationReport
+        after every batch of keys.
+        :returns: maprdb.bulk_mutations.BulkMutationReport with numbers of processed keys and errors per key.
+        """
+        return self._mutate_where(condition, self._delete, parallelism, batch_size, rate, progress)
+
+    def update_where(self, condition, mutation, parallelism=4, batch_size=100, rate=None, progress=None):
+        """
+        Performs the mutation on documents, which satisfy the passed condition.
+        Keys are streamed as in maprdb.tables.Table.delete_where.
+
+        :param condition: maprdb.conditions.Condition class instance or its shorthand.
+        :param mutation: maprdb.mutation.Mutation class instance, which is a mutation to perform.
+        :param parallelism: number of worker threads updating documents.
+        :param batch_size: number of keys updated by a worker thread at once.
+        :param rate: maximum number of updated documents per second, unlimited if None.
+        :param progress: function called with maprdb.bulk_mutations.BulkMutationReport
+        after every batch of keys.
+        :returns: maprdb.bulk_mutations.BulkMutationReport with numbers of processed keys and errors per key.
         """
-        keys_list = key if isinstance(key, (list,tuple)) else [key]
+        java_mutation = self._cast(mutation)
+        return self._mutate_where(condition, lambda k: self._update(k, java_mutation),
+                                  parallelism, batch_size, rate, progress)
 
-        for k in keys_list:
-            self.java_table.delete(k)
+    def _mutate_where(self, condition, mutate, parallelism, batch_size, rate, progress):
+        keys = self.keys(condition)
+        try:
+            return bulk_mutations.mutate_keys(keys, mutate, parallelism, batch_size, rate, progress,
+                                              self.options.get("executor"))
+        finally:
+            keys.close()
+
+    @handle_java_exceptions
+    def _delete(self, key):
+        try:
+            self.java_table.delete(key)
+        finally:
+            self._invalidate([key])
 
     @handle_java_exceptions
     def flush(self):
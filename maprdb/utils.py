@@ -1,5 +1,10 @@
+import calendar
+import collections
 import datetime
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 import jpype
 
@@ -11,6 +16,20 @@ class MapRDBError(Exception):
     pass
 
 
+class MapRDBMultiOpError(MapRDBError):
+    """
+    Raised when an operation on several keys failed for some of them.
+    Other keys are processed in spite of the failures.
+    """
+    def __init__(self, errors):
+        """
+        :param errors: dictionary, which maps keys to errors raised for them
+        """
+        super().__init__("Operation failed for {} key(s): {}".format(
+            len(errors), ", ".join(str(k) for k in list(errors)[:10])))
+        self.errors = errors
+
+
 def is_based_on_class(java_class, class_name_to_find):
     if java_class == None:
         return False
@@ -23,37 +42,342 @@ def is_based_on_class(java_class, class_name_to_find):
             return True
 
 
+def _java_number_to_python(value):
+    return value.value
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_DATE = _EPOCH.date()
+# time zone offsets vary at most at 15 minute boundaries of UTC time
+_OFFSET_PERIOD = 900
+# UTC offsets of local time zone in seconds, keyed by 15 minute periods since epoch
+_local_offsets = {}
+# default time zone of JVM, set once JVM is started
+_time_zone = None
+
+
+def _jvm_time_zone():
+    """
+    Returns java.util.TimeZone.getDefault(), which JVM uses for local time of dates,
+    None if JVM is not started.
+    """
+    global _time_zone
+    if _time_zone is None and jpype.isJVMStarted():
+        _time_zone = jpype.JClass("java.util.TimeZone").getDefault()
+        # offsets cached before are of python time zone
+        _local_offsets.clear()
+    return _time_zone
+
+
+def _utc_offset(seconds):
+    time_zone = _jvm_time_zone()
+    if time_zone is None:
+        return time.localtime(seconds).tm_gmtoff
+    return time_zone.getOffset(seconds * 1000) // 1000
+
+
+def _local_offset(seconds):
+    period = seconds // _OFFSET_PERIOD
+    offset = _local_offsets.get(period)
+    if offset is None:
+        start = period * _OFFSET_PERIOD
+        offset = _utc_offset(start)
+        if _utc_offset(start + _OFFSET_PERIOD - 1) != offset:
+            # historical offsets, which changed inside the period, are not cached
+            return _utc_offset(seconds)
+        if len(_local_offsets) >= 100000:
+            _local_offsets.clear()
+        _local_offsets[period] = offset
+    return offset
+
+
+def _local_datetime(millis, microseconds=None):
+    """
+    Converts milliseconds since epoch to naive datetime in local time zone, as JVM does.
+    :param microseconds: microseconds of the second, taken from millis if None
+    """
+    seconds, milliseconds = divmod(millis, 1000)
+    if microseconds is None:
+        microseconds = milliseconds * 1000
+    return _EPOCH + datetime.timedelta(seconds=seconds + _local_offset(seconds), microseconds=microseconds)
+
+
+def _epoch_millis(value):
+    """
+    Converts datetime to milliseconds since epoch, naive datetime is in local time zone, as JVM does.
+    """
+    if value.tzinfo is None and _jvm_time_zone() is not None:
+        local = calendar.timegm(value.timetuple())
+        seconds = local - _local_offset(local - _local_offset(local))
+    else:
+        # timestamp() of a whole second is exact
+        seconds = int(value.replace(microsecond=0).timestamp())
+    # sub-second part is added as integer
+    return seconds * 1000 + value.microsecond // 1000
+
+
+def _java_date_to_python(value):
+    return _local_datetime(value.getTime())
+
+
+def _java_timestamp_to_python(value):
+    return _local_datetime(value.getTime(), value.getNanos() // 1000)
+
+
+def _java_sql_date_to_python(value):
+    return _local_datetime(value.getTime()).date()
+
+
+def _java_sql_time_to_python(value):
+    return _local_datetime(value.getTime()).time()
+
+
+def _java_bytes_to_python(java_array, offset, length):
+    try:
+        # JPype versions with buffer protocol on arrays copy the range at once
+        return bytes(memoryview(java_array)[offset:offset + length])
+    except TypeError:
+        chunk = java_array[offset:offset + length]
+        return chunk if isinstance(chunk, bytes) else bytes(b & 0xFF for b in chunk)
+
+
+# if True, read-only direct buffers are returned as memoryview without copying, see set_binary_views
+_binary_views = False
+
+
+def set_binary_views(enabled):
+    """
+    Turns on or off zero-copy conversion of read-only direct java.nio.ByteBuffer values to memoryview.
+    Views keep Java buffers alive, but unlike bytes they can't be deep-copied or pickled,
+    so they should not be used with document cache of tables or parallel scans.
+    :param enabled: bool
+    """
+    global _binary_views
+    _binary_views = bool(enabled)
+
+
+def _java_byte_buffer_to_python(value):
+    """
+    Returns remaining bytes of java.nio.ByteBuffer, copied to bytes in one call.
+    Read-only direct buffer is returned as memoryview over its memory, if binary views are enabled
+    and JPype supports buffer protocol on buffers, see set_binary_views.
+    """
+    position, length = value.position(), value.remaining()
+    if value.isDirect():
+        try:
+            view = memoryview(value)[position:position + length]
+        except TypeError:
+            view = None
+        if view is not None:
+            # contents of writable buffer can be changed by Java later, so it's copied
+            return view if _binary_views and value.isReadOnly() else bytes(view)
+    elif value.hasArray():
+        return _java_bytes_to_python(value.array(), value.arrayOffset() + position, length)
+    java_array = jpype.JArray(jpype.JByte)(length)
+    value.duplicate().get(java_array)
+    return _java_bytes_to_python(java_array, 0, length)
+
+
+def _java_list_to_python(value):
+    new_value = []
+    it = value.iterator()
+    while it.hasNext():
+        new_value.append(java_to_python_cast(it.next()))
+    return new_value
+
+
+def _java_map_to_python(value):
+    new_value = {}
+    it = value.keySet().iterator()
+
+    while it.hasNext():
+        k = java_to_python_cast(it.next())
+        v = java_to_python_cast(value.get(k))
+        new_value[k] = v
+    return new_value
+
+
+def _as_is(value):
+    return value
+
+
+# Converters for Java classes of values which can be found in OJAI documents.
+# Looking them up by name saves walking the whole class hierarchy.
+_JAVA_CLASS_CONVERTERS = {
+    "java.lang.Byte": _java_number_to_python,
+    "java.lang.Short": _java_number_to_python,
+    "java.lang.Integer": _java_number_to_python,
+    "java.lang.Long": _java_number_to_python,
+    "java.lang.Float": _java_number_to_python,
+    "java.lang.Double": _java_number_to_python,
+    "java.util.Date": _java_date_to_python,
+    "java.sql.Timestamp": _java_timestamp_to_python,
+    "java.sql.Date": _java_sql_date_to_python,
+    "java.sql.Time": _java_sql_time_to_python,
+    "java.nio.HeapByteBuffer": _java_byte_buffer_to_python,
+    "java.nio.HeapByteBufferR": _java_byte_buffer_to_python,
+    "java.nio.DirectByteBuffer": _java_byte_buffer_to_python,
+    "java.nio.DirectByteBufferR": _java_byte_buffer_to_python,
+    "java.util.ArrayList": _java_list_to_python,
+    "java.util.LinkedList": _java_list_to_python,
+    "java.util.HashMap": _java_map_to_python,
+    "java.util.LinkedHashMap": _java_map_to_python,
+    "java.util.TreeMap": _java_map_to_python,
+    "org.ojai.json.impl.JsonList": _java_list_to_python,
+    "org.ojai.json.impl.JsonDocument": _java_map_to_python,
+    "com.mapr.db.rowcol.DBList": _java_list_to_python,
+    "com.mapr.db.rowcol.DBDocumentImpl": _java_map_to_python,
+}
+
+# Base classes checked, in order, for Java classes which are not registered above
+_JAVA_BASE_CLASS_CONVERTERS = [
+    ("java.lang.Number", _java_number_to_python),
+    ("java.util.Date", _java_date_to_python),
+    ("java.nio.ByteBuffer", _java_byte_buffer_to_python),
+    ("java.util.List", _java_list_to_python),
+    ("java.util.Map", _java_map_to_python),
+]
+
+# Python values passed between JPype and python as is, they never need a conversion
+_PYTHON_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+
+# Resolved converters, keyed by Python type of the value.
+# JPype creates exactly one Python type per Java class, so each class is resolved only once.
+_converters_cache = {}
+
+
+def _resolve_java_converter(value):
+    java_class = value.__javaclass__ if hasattr(value, '__javaclass__') else None
+    if java_class is None:
+        return _as_is
+
+    class_name = java_class.getName()
+    if class_name in _JAVA_CLASS_CONVERTERS:
+        return _JAVA_CLASS_CONVERTERS[class_name]
+
+    for base_class_name, converter in _JAVA_BASE_CLASS_CONVERTERS:
+        if is_based_on_class(java_class, base_class_name):
+            return converter
+    return _as_is
+
+
+def register_java_converter(class_name, converter):
+    """
+    Registers function which converts instances of Java class to python values
+    :param class_name: full name of Java class [str]
+    :param converter: function, which takes java object and returns python value
+    """
+    _JAVA_CLASS_CONVERTERS[class_name] = converter
+    _converters_cache.clear()
+
+
 def java_to_python_cast(value):
     """
     Converts java object to corresponding python value
     :param value: java object
     :returns: corresponding python value
     """
-    java_class = value.__javaclass__ if hasattr(value,'__javaclass__') else None
-
-    if is_based_on_class(java_class,'java.lang.Number'):
-        return value.value
-    elif is_based_on_class(java_class,'java.util.Date'):
-        return datetime.datetime(1900 + value.getYear(), 1 + value.getMonth(), \
-                                 value.getDate(), value.getHours(), \
-                                 value.getMinutes(), value.getSeconds(), int(value.getNanos()/1000))
-    elif is_based_on_class(java_class, 'java.util.List'):
-        new_value = []
-        it = value.iterator()
-        while it.hasNext():
-            new_value.append(java_to_python_cast(it.next()))
-        return new_value
-    elif is_based_on_class(java_class, 'java.util.Map'):
-        new_value = {}
-        it = value.keySet().iterator()
-
-        while it.hasNext():
-            k = java_to_python_cast(it.next())
-            v = java_to_python_cast(value.get(k))
-            new_value[k] = v
-        return new_value
+    value_type = type(value)
+    if value_type in _PYTHON_SCALAR_TYPES:
+        return value
 
-    return value
+    converter = _converters_cache.get(value_type)
+    if converter is None:
+        converter = _resolve_java_converter(value)
+        _converters_cache[value_type] = converter
+    return converter(value)
+
+
+_java_classes = {}
+
+
+def _java_class(name):
+    java_class = _java_classes.get(name)
+    if java_class is None:
+        java_class = _java_classes[name] = jpype.JClass(name)
+    return java_class
+
+
+def _python_object_to_java(value):
+    return value._get_java_object()
+
+
+def _python_list_to_java(value):
+    jlist = _java_class("java.util.ArrayList")(len(value))
+    for value_item in value:
+        jlist.add(python_to_java_cast(value_item))
+    return jlist
+
+
+def _python_dict_to_java(value):
+    # initial capacity for the default load factor of 0.75, so the map is never rehashed
+    jmap = _java_class("java.util.HashMap")(len(value) * 4 // 3 + 1)
+    for k, v in value.items():
+        jmap.put(python_to_java_cast(k), python_to_java_cast(v))
+    return jmap
+
+
+def _python_datetime_to_java(value):
+    timestamp = _java_class("java.sql.Timestamp")(_epoch_millis(value))
+    if value.microsecond % 1000:
+        timestamp.setNanos(value.microsecond * 1000)
+    return timestamp
+
+
+def _python_date_to_java(value):
+    return _java_class("java.sql.Date")(_epoch_millis(datetime.datetime(value.year, value.month, value.day)))
+
+
+def _python_time_to_java(value):
+    return _java_class("java.sql.Time")(_epoch_millis(datetime.datetime.combine(_EPOCH_DATE, value)))
+
+
+def _python_bytes_to_java(value):
+    """
+    Converts bytes-like value to java.nio.ByteBuffer, which wraps a copy of the value in a Java array.
+    Buffers aren't wrapped directly, as Java buffer doesn't keep python object alive
+    while it's used, e.g. by buffered writes of the table.
+    """
+    data = value if type(value) is bytes else memoryview(value).tobytes()
+    return _java_class("java.nio.ByteBuffer").wrap(jpype.JArray(jpype.JByte)(data))
+
+
+# Converters for python types, subclasses use the converter of the closest registered base class
+_PYTHON_TYPE_CONVERTERS = {
+    tuple: _python_list_to_java,
+    list: _python_list_to_java,
+    dict: _python_dict_to_java,
+    datetime.datetime: _python_datetime_to_java,
+    datetime.date: _python_date_to_java,
+    datetime.time: _python_time_to_java,
+    bytes: _python_bytes_to_java,
+    bytearray: _python_bytes_to_java,
+    memoryview: _python_bytes_to_java,
+}
+
+# Resolved converters, keyed by exact python type of the value
+_python_converters_cache = {}
+
+
+def _resolve_python_converter(value_type):
+    if value_type in _PYTHON_TYPE_CONVERTERS:
+        return _PYTHON_TYPE_CONVERTERS[value_type]
+    if hasattr(value_type, '_get_java_object'):
+        return _python_object_to_java
+    for base_type in value_type.__mro__:
+        if base_type in _PYTHON_TYPE_CONVERTERS:
+            return _PYTHON_TYPE_CONVERTERS[base_type]
+    return _as_is
+
+
+def register_python_converter(python_type, converter):
+    """
+    Registers function which converts instances of python type, and of its subclasses, to Java objects
+    :param python_type: python class
+    :param converter: function, which takes python value and returns java object
+    """
+    _PYTHON_TYPE_CONVERTERS[python_type] = converter
+    _python_converters_cache.clear()
 
 
 def python_to_java_cast(value):
@@ -62,30 +386,15 @@ def python_to_java_cast(value):
     :param value: python value
     :returns: corresponding java object
     """
-    if '_get_java_object' in dir(value):
-        return value._get_java_object()
-    elif isinstance(value, (tuple, list)):
-        jlist = jpype.java.util.ArrayList()
-        for value_item in value:
-            jlist.add(python_to_java_cast(value_item))
-        return jlist
-    elif isinstance(value, (dict,)):
-        jmap = jpype.java.util.HashMap()
-        for k,v in value.items():
-            jmap.put(python_to_java_cast(k), python_to_java_cast(v))
-        return jmap
-    elif isinstance(value, datetime.datetime):
-        time = jpype.java.sql.Timestamp(value.year - 1900, value.month - 1, value.day,
-                                        value.hour, value.minute, value.second, 1000*value.microsecond)
-        return time
-    elif isinstance(value, datetime.date):
-        date = jpype.java.sql.Date(value.year - 1900, value.month, value.day)
-        return date
-    elif isinstance(value, datetime.time):
-        time = jpype.java.sql.Time(value.hour, value.minute, value.second)
-        return time
+    value_type = type(value)
+    if value_type in _PYTHON_SCALAR_TYPES:
+        return value
 
-    return value
+    converter = _python_converters_cache.get(value_type)
+    if converter is None:
+        converter = _resolve_python_converter(value_type)
+        _python_converters_cache[value_type] = converter
+    return converter(value)
 
 
 def handle_java_exceptions(f):
@@ -108,6 +417,161 @@ def handle_java_exceptions(f):
     return wrapper
 
 
+def attach_thread_to_jvm():
+    """
+    Attaches current thread to JVM, so it can call Java methods.
+    Does nothing if JVM is not started.
+    """
+    if jpype.isJVMStarted() and not jpype.isThreadAttachedToJVM():
+        jpype.attachThreadToJVM()
+
+
+def call_attached_to_jvm(f, *args, **kwargs):
+    """
+    Calls function on current thread, attaching it to JVM first.
+    """
+    attach_thread_to_jvm()
+    return f(*args, **kwargs)
+
+
+class JVMThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Thread pool executor, which workers are attached to JVM before running submitted functions.
+    """
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(call_attached_to_jvm, fn, *args, **kwargs)
+
+
+# maximum number of threads of the shared executor
+SHARED_EXECUTOR_WORKERS = 32
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def shared_executor():
+    """
+    Returns process-wide JVM-attached thread pool used by tables for operations on lists of keys.
+    Threads are attached to JVM once and reused, so short-lived pools don't leave attached threads behind.
+    """
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = JVMThreadPoolExecutor(max_workers=SHARED_EXECUTOR_WORKERS,
+                                                     thread_name_prefix="maprdb")
+        return _shared_executor
+
+
+class LRUCache(object):
+    """
+    Thread-safe mapping of limited size, which evicts least recently used entries.
+    Size can be limited by number of entries and by total size of values, entries can expire.
+    Counts hits and misses of lookups.
+    """
+    def __init__(self, maxsize=128, max_bytes=None, ttl=None, sizeof=None, clock=time.monotonic):
+        """
+        :param maxsize: maximum number of entries [int]
+        :param max_bytes: maximum total size of values, unlimited if None [int]
+        :param ttl: seconds an entry is kept for, forever if None [float]
+        :param sizeof: function, which returns size of a value, required if max_bytes is set
+        :param clock: function, which returns current time in seconds
+        """
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("sizeof is required to limit size of values")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+        # key -> (value, size, expiration time or None)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns value stored for the key and marks it as recently used.
+        Expired entry is removed and counted as a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, ttl=None):
+        """
+        Stores value for the key, evicting least recently used entries if cache is full.
+        :param ttl: seconds the entry is kept for, ttl of the cache by default
+        """
+        ttl = self.ttl if ttl is None else ttl
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        with self._lock:
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, None if ttl is None else self._clock() + ttl)
+            self.bytes += size
+            while len(self._entries) > self.maxsize or \
+                    (self.max_bytes is not None and self.bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """
+        Removes the entry of the key.
+        :returns: removed value or default
+        """
+        with self._lock:
+            entry = self._remove(key)
+        return default if entry is None else entry[0]
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+        return entry
+
+    def clear(self):
+        """
+        Removes all entries and resets counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def info(self):
+        """
+        Returns statistics of the cache.
+        :returns: dict with hits, misses, hit_rate, evictions, expirations, size, maxsize, bytes
+        and max_bytes keys
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "expirations": self.expirations,
+                "size": len(self._entries), "maxsize": self.maxsize,
+                "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+
 class Singleton(type):
     def __init__(cls, name, bases, dict):
         super(Singleton, cls).__init__(name, bases, dict)
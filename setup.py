@@ -29,6 +29,10 @@ setup(
         "JPype1==0.6.1",
         "multipledispatch"
     ],
+    extras_require={
+        "columnar": ["numpy"],
+        "arrow": ["numpy", "pyarrow"],
+    },
 
     package_data={
         "maprdb.dependency": ['*.jar'],
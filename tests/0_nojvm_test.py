@@ -6,7 +6,8 @@ starts from '0' intentionally to make this case run before all others.
 import unittest
 import logging
 import jpype
-from maprdb import Condition, Document
+from maprdb import Condition, Document, Mutation
+from maprdb.utils import java_to_python_cast
 
 
 class TestNoJVM(unittest.TestCase):
@@ -23,6 +24,13 @@ class TestNoJVM(unittest.TestCase):
     def test_document_no_jvm(self):
         Document({"name": "Peter"})
 
+    def test_mutation_no_jvm(self):
+        Mutation([{"count": {"$inc": 1}}]).set("name", "Peter").build()
+
+    def test_python_values_cast_no_jvm(self):
+        for value in ["Peter", 42, 4.2, True, None, {"name": "Peter"}]:
+            self.assertEqual(java_to_python_cast(value), value)
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
@@ -0,0 +1,83 @@
+import asyncio
+import time
+import unittest
+import logging
+from maprdb import Table, AsyncTable
+from tests.utils import FakeJavaTable
+
+
+class TestAsyncTable(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.java_table = FakeJavaTable({'_id': 'key{:02d}'.format(i), 'n': i} for i in range(25))
+        self.table = AsyncTable(Table(self.java_table), concurrency=4)
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.table.close())
+        self.loop.close()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_find_by_id(self):
+        self.assertEqual(self.run_async(self.table.find_by_id('key03')), {'_id': 'key03', 'n': 3})
+        self.assertIsNone(self.run_async(self.table.find_by_id('missing')))
+
+    def test_concurrent_calls(self):
+        async def find_all(keys):
+            return await asyncio.gather(*[self.table.find_by_id(k) for k in keys])
+        documents = self.run_async(find_all(['key{:02d}'.format(i) for i in range(25)]))
+        self.assertEqual([d['n'] for d in documents], list(range(25)))
+
+    def test_concurrency_limit(self):
+        running = []
+        peak = []
+        find_by_id = self.java_table.findById
+
+        def counting_find_by_id(*args):
+            running.append(1)
+            peak.append(len(running))
+            time.sleep(0.01)
+            running.pop()
+            return find_by_id(*args)
+
+        self.java_table.findById = counting_find_by_id
+
+        async def find_all(keys):
+            return await asyncio.gather(*[self.table.find_by_id(k) for k in keys])
+        self.run_async(find_all(['key{:02d}'.format(i) for i in range(25)]))
+        self.assertLessEqual(max(peak), 4)
+
+    def test_update_and_delete(self):
+        self.run_async(self.table.update(['key01', 'key02'], 'mutation'))
+        self.run_async(self.table.delete('key03'))
+        self.run_async(self.table.flush())
+        self.assertEqual(self.java_table.documents['key02']['mutation'], 'mutation')
+        self.assertNotIn('key03', self.java_table.documents)
+
+    def test_async_iteration(self):
+        async def collect():
+            return [document['n'] async for document in self.table.find(chunk_size=10)]
+        self.assertEqual(self.run_async(collect()), list(range(25)))
+
+    def test_async_iteration_exact_chunks(self):
+        async def collect():
+            return [document['n'] async for document in self.table.find(chunk_size=5)]
+        self.assertEqual(self.run_async(collect()), list(range(25)))
+
+    def test_stop_iteration_early(self):
+        async def first_three():
+            documents = self.table.find(chunk_size=2)
+            result = []
+            async for document in documents:
+                result.append(document['n'])
+                if len(result) == 3:
+                    break
+            await documents.aclose()
+            return result
+        self.assertEqual(self.run_async(first_three()), [0, 1, 2])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
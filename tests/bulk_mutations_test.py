@@ -0,0 +1,69 @@
+import threading
+import unittest
+import logging
+from maprdb.bulk_mutations import RateLimiter, mutate_keys
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_spacing(self):
+        now = [0.0]
+        waits = []
+
+        def sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(10, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            limiter.acquire()
+        self.assertEqual([round(wait, 6) for wait in waits], [0.1, 0.1, 0.1])
+
+
+class TestMutateKeys(unittest.TestCase):
+    def test_failures_and_progress(self):
+        mutated = []
+        lock = threading.Lock()
+
+        def mutate(key):
+            if key % 7 == 0:
+                raise ValueError(key)
+            with lock:
+                mutated.append(key)
+
+        reports = []
+        report = mutate_keys(range(50), mutate, parallelism=3, batch_size=4,
+                             progress=lambda r: reports.append(r.processed))
+        self.assertEqual(report.processed, 50)
+        self.assertEqual(sorted(report.failures), [0, 7, 14, 21, 28, 35, 42, 49])
+        self.assertEqual(report.succeeded, 42)
+        self.assertEqual(sorted(mutated), [k for k in range(50) if k % 7])
+        self.assertEqual(len(reports), 13)
+        self.assertEqual(reports[-1], 50)
+
+    def test_keys_are_consumed_lazily(self):
+        consumed = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def keys():
+            for key in range(1000):
+                consumed.append(key)
+                yield key
+
+        def mutate(key):
+            started.set()
+            release.wait()
+
+        thread = threading.Thread(target=mutate_keys, args=(keys(), mutate),
+                                  kwargs={"parallelism": 2, "batch_size": 10})
+        thread.start()
+        started.wait()
+        self.assertLessEqual(len(consumed), 60)
+        release.set()
+        thread.join()
+        self.assertEqual(len(consumed), 1000)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
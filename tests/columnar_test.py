@@ -0,0 +1,82 @@
+import unittest
+import logging
+from maprdb import Table
+from maprdb import columnar
+from tests.utils import FakeJavaTable
+
+
+@unittest.skipIf(columnar.numpy is None, "numpy is not installed")
+class TestFindColumnar(unittest.TestCase):
+    def setUp(self):
+        documents = []
+        for i in range(25):
+            document = {'_id': 'key{:02d}'.format(i), 'n': i, 'x': i / 2.0, 'city': ['Paris', 'Rome'][i % 2],
+                        'flag': i % 3 == 0, 'nested': {'v': i * 10}}
+            if i == 5:
+                del document['n']
+            documents.append(document)
+        self.table = Table(FakeJavaTable(documents))
+
+    def test_numeric_columns(self):
+        result = self.table.find_columnar(['n', 'x', 'flag', 'nested.v'], chunk_size=10)
+        self.assertEqual(str(result['n'].dtype), 'int64')
+        self.assertEqual(str(result['x'].dtype), 'float64')
+        self.assertEqual(str(result['flag'].dtype), 'bool')
+        self.assertEqual(len(result['n']), 25)
+        self.assertTrue(result['n'].mask[5])
+        self.assertEqual(result['n'].sum(), sum(range(25)) - 5)
+        self.assertEqual(result['nested.v'][24], 240)
+
+    def test_string_columns(self):
+        result = self.table.find_columnar(['city'], prefetch=2, chunk_size=10)
+        self.assertEqual(list(result['city'][:3]), ['Paris', 'Rome', 'Paris'])
+
+        encoded = self.table.find_columnar(['city'], dictionary_encode=True)['city']
+        self.assertEqual(list(encoded.categories), ['Paris', 'Rome'])
+        self.assertEqual(list(encoded.codes[:3]), [0, 1, 0])
+
+    def test_missing_column(self):
+        result = self.table.find_columnar(['missing'])
+        self.assertTrue(result['missing'].mask.all())
+
+    @unittest.skipIf(columnar.pyarrow is None, "pyarrow is not installed")
+    def test_arrow_batches(self):
+        batches = list(self.table.find_columnar(['n', 'city'], chunk_size=10, as_arrow=True,
+                                                dictionary_encode=True))
+        self.assertEqual([batch.num_rows for batch in batches], [10, 10, 5])
+        self.assertEqual(batches[0].column(0).null_count, 1)
+        self.assertEqual(batches[0].schema.names, ['n', 'city'])
+
+
+@unittest.skipIf(columnar.numpy is None, "numpy is not installed")
+class TestColumnTypesAcrossChunks(unittest.TestCase):
+    def setUp(self):
+        documents = [{'_id': 'key{:02d}'.format(i)} for i in range(12)]
+        for i in range(4, 12):
+            documents[i]['n'] = i
+            documents[i]['flag'] = i % 2 == 0
+        documents[11]['n'] = 11.5
+        self.table = Table(FakeJavaTable(documents))
+
+    def test_same_types_for_any_chunk_size(self):
+        results = [self.table.find_columnar(['n', 'flag'], chunk_size=chunk_size) for chunk_size in (2, 4, 12)]
+        for result in results:
+            self.assertEqual(str(result['n'].dtype), 'float64')
+            self.assertEqual(str(result['flag'].dtype), 'bool')
+            self.assertEqual(result['n'].mask.tolist(), [True] * 4 + [False] * 8)
+            self.assertEqual(result['n'].sum(), results[-1]['n'].sum())
+
+    @unittest.skipIf(columnar.pyarrow is None, "pyarrow is not installed")
+    def test_arrow_schema_for_any_chunk_size(self):
+        pyarrow = columnar.pyarrow
+        for chunk_size in (2, 4, 12):
+            batches = list(self.table.find_columnar(['flag', 'n'], chunk_size=chunk_size, as_arrow=True,
+                                                    arrow_schema={'n': pyarrow.float64()}))
+            table = pyarrow.Table.from_batches(batches)
+            self.assertEqual(table.schema.types, [pyarrow.bool_(), pyarrow.float64()])
+            self.assertEqual(table.column('flag').null_count, 4)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
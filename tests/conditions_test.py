@@ -1,9 +1,11 @@
 from collections import OrderedDict
 import datetime
 import unittest
+from unittest import mock
 import logging
-from maprdb import Condition
-from maprdb.conditions import Op
+from maprdb import Condition, Param
+from maprdb.conditions import Op, condition_cache, native_in_supported
+from maprdb.utils import MapRDBError
 from tests.base import BaseMapRDBTest
 
 
@@ -77,14 +79,28 @@ class TestShorthandConditions(BaseMapRDBTest):
         c = Condition({"age": {"$between": [12, 34]}})
         self.assertEqual(c.java_condition.toString(), '((age >= {"$numberLong":12}) and (age <= {"$numberLong":34}))')
 
+    def test_several_operators_of_field(self):
+        c = Condition({"age": {"$ge": 12, "$lt": 34}})
+        self.assertEqual(c.java_condition.toString(), '((age >= {"$numberLong":12}) and (age < {"$numberLong":34}))')
+
+    @mock.patch("maprdb.conditions._native_in", False)
     def test_in(self):
         c = Condition({"age": {"$in": [1, 2]}})
         self.assertEqual(c.java_condition.toString(), '((age = {"$numberLong":1}) or (age = {"$numberLong":2}))')
 
+    @mock.patch("maprdb.conditions._native_in", False)
     def test_not_in(self):
         c = Condition({"age": {"!$in": [1, 2]}})
         self.assertEqual(c.java_condition.toString(), '((age != {"$numberLong":1}) and (age != {"$numberLong":2}))')
 
+    def test_in_native(self):
+        if not native_in_supported():
+            self.skipTest("Java condition has no native 'in'")
+        c = Condition({"age": {"$in": [1, 2]}})
+        self.assertNotIn(" or ", c.java_condition.toString())
+        c = Condition({"age": {"!$in": [1, 2]}})
+        self.assertNotIn(" and ", c.java_condition.toString())
+
     def test_exists(self):
         c = Condition({"age": {"$exists": True}})
         self.assertEqual(c.java_condition.toString(), '(age != null)')
@@ -103,6 +119,105 @@ class TestShorthandConditions(BaseMapRDBTest):
             c._get_java_object()
 
 
+@mock.patch("maprdb.conditions._native_in", False)
+class TestSplitIn(unittest.TestCase):
+    def test_split_long_in(self):
+        c = Condition({"country": "China", "age": {"$in": list(range(25))}})
+        parts = c._split_in(max_values=10)
+        self.assertEqual([len(p._initial["age"]["$in"]) for p in parts], [10, 10, 5])
+        self.assertTrue(all(p._initial["country"] == "China" for p in parts))
+
+    def test_short_in_not_split(self):
+        c = Condition({"age": {"$in": [1, 2]}})
+        self.assertEqual(c._split_in(max_values=10), [c])
+
+    def test_or_not_split(self):
+        c = Condition([{"age": {"$in": list(range(25))}}, {"country": "China"}])
+        self.assertEqual(c._split_in(max_values=10), [c])
+
+
+class TestCachedConditions(BaseMapRDBTest):
+    def setUp(self):
+        super().setUp()
+        condition_cache.clear()
+
+    def test_cached(self):
+        c1 = Condition.cached({"country": "China", "age": 34})
+        c2 = Condition.cached({"age": 34, "country": "China"})
+        self.assertIs(c1.java_condition, c2.java_condition)
+        self.assertEqual(condition_cache.info()["hits"], 1)
+        self.assertEqual(condition_cache.info()["misses"], 1)
+
+    def test_cached_types_differ(self):
+        c1 = Condition.cached({"age": 1})
+        c2 = Condition.cached({"age": 1.0})
+        self.assertIsNot(c1.java_condition, c2.java_condition)
+
+    def test_cached_immutable(self):
+        c = Condition.cached({"age": 1})
+        with self.assertRaises(MapRDBError):
+            c._and()
+
+    def test_template(self):
+        template = Condition.template({"age": {"$gt": Param("min_age")}, "country": {"$in": [Param("c1"), "China"]}})
+        self.assertEqual(template.params, {"min_age", "c1"})
+        c = template.bind(min_age=34, c1="India")
+        self.assertEqual(c.java_condition.toString(),
+                         Condition({"age": {"$gt": 34}, "country": {"$in": ["India", "China"]}}).java_condition.toString())
+        self.assertIs(template.bind(min_age=34, c1="India").java_condition, c.java_condition)
+        with self.assertRaises(MapRDBError):
+            template.bind(min_age=34)
+
+    def test_template_with_list_param(self):
+        template = Condition.template({"country": {"$in": Param("countries")}, "age": {"!$in": Param("ages")}})
+        self.assertEqual(template.params, {"countries", "ages"})
+        for countries in [["India"], ["India", "China", "Japan"]]:
+            c = template.bind(countries=countries, ages=[1, 2])
+            self.assertEqual(c.java_condition.toString(),
+                             Condition({"country": {"$in": countries}, "age": {"!$in": [1, 2]}}).java_condition.toString())
+        self.assertIs(template.bind(countries=["India"], ages=[1, 2]).java_condition,
+                      template.bind(countries=["India"], ages=[1, 2]).java_condition)
+        self.assertIsNot(template.bind(countries=["India"], ages=[1, 2]).java_condition,
+                         template.bind(countries=["India", "China"], ages=[1, 2]).java_condition)
+
+
+class TestFrozenConditions(unittest.TestCase):
+    """
+    Frozen conditions share Java objects through the cache, so they are checked before any Java call.
+    """
+    def setUp(self):
+        condition_cache.clear()
+
+    def test_frozen_condition_doesnt_call_java(self):
+        java_condition = mock.Mock()
+        c = Condition._frozen_condition({"age": 1}, ("key",), lambda: java_condition)
+        self.assertIs(c.java_condition, java_condition.build.return_value)
+        for call in [lambda: c._and(), lambda: c._or(), lambda: c._close(), lambda: c._exists("age"),
+                     lambda: c._not_exists("age"), lambda: c._is("age", None, 1),
+                     lambda: c._is_in("age", [1]), lambda: c._is_not_in("age", [1])]:
+            with self.assertRaises(MapRDBError):
+                call()
+        self.assertEqual(java_condition.build.return_value.mock_calls, [])
+
+    def test_cached_condition_is_built(self):
+        java_condition = mock.Mock()
+        c = Condition._frozen_condition({"age": 1}, ("key",), lambda: java_condition)
+        c.java_condition
+        java_condition.build.assert_called_once_with()
+        self.assertIs(condition_cache.get(("key",)), java_condition.build.return_value)
+
+    def test_template_records_list_param(self):
+        template = Condition.template({"country": {"$in": Param("countries")}})
+        template._compile()
+        self.assertEqual(template._operations, [("_in", ("country", Param("countries")))])
+
+    def test_template_rejects_exists_param(self):
+        with self.assertRaises(MapRDBError):
+            Condition.template({"age": {"$exists": Param("has_age")}})
+        with self.assertRaises(MapRDBError):
+            Condition.template([{"name": "Peter"}, {"age": {"$gt": 1, "$exists": Param("has_age")}}])
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
     unittest.main()
@@ -71,6 +71,8 @@ class TestMapRDBConnection(BaseMapRDBTest):
         document2.update({'_id': document1_key})
         self.assertEqual(document2, all_table_docs[0])
         self.assertEqual(document2, table1.find_by_id(document1_key))
+        self.assertEqual(all_table_docs, [x for x in table1.find(json_conversion=True)])
+        self.assertEqual(document2, table1.find_by_id(document1_key, json_conversion=True))
 
 
         mutation0 = Mutation().increment("some_number", 4).\
@@ -153,6 +155,17 @@ class TestMapRDBConnection(BaseMapRDBTest):
 
         table1.close()
 
+    def test_table_pool(self):
+        if not self.connection.exists("/tmp/test_table_pool"):
+            self.connection.create("/tmp/test_table_pool").close()
+        stats = self.connection.table_pool.stats()
+        with self.connection.table("/tmp/test_table_pool") as table1:
+            with self.connection.table("/tmp/test_table_pool") as table2:
+                self.assertIs(table1, table2)
+        self.assertEqual(self.connection.table_pool.stats()['hits'], stats['hits'] + 1)
+        self.connection.delete("/tmp/test_table_pool")
+        self.assertEqual(self.connection.table_pool.stats()['open'], stats['open'])
+
     def test_typeerror_raise(self):
         with self.assertRaises(TypeError):
             self.connection.exists(42)  # parameter should be string
@@ -0,0 +1,123 @@
+import base64
+import datetime
+import decimal
+import unittest
+import logging
+import jpype
+from unittest import mock
+from maprdb import extended_json, Document, utils
+from maprdb.utils import java_to_python_cast
+from tests.base import BaseMapRDBTest
+
+
+class TestExtendedJsonLoads(unittest.TestCase):
+    def test_plain_json(self):
+        self.assertEqual(extended_json.loads('{"a": [1, 2.5, "s", true, null], "b": {"c": 1}}'),
+                         {"a": [1, 2.5, "s", True, None], "b": {"c": 1}})
+
+    def test_numbers(self):
+        self.assertEqual(extended_json.loads('{"$numberLong": 34}'), 34)
+        self.assertEqual(extended_json.loads('{"$numberInt": 34}'), 34)
+        self.assertEqual(extended_json.loads('{"$numberFloat": 3.5}'), 3.5)
+        self.assertEqual(extended_json.loads('{"$numberDecimal": "1.10"}'), decimal.Decimal("1.10"))
+
+    def test_float_is_widened_from_float32(self):
+        # java.lang.Float 0.1f is converted field by field to the nearest float32 value
+        self.assertEqual(extended_json.loads('{"$numberFloat": 0.1}'), 0.10000000149011612)
+        self.assertEqual(extended_json.loads('{"$numberFloat": "Infinity"}'), float("inf"))
+
+    def test_timestamp_is_local(self):
+        value = datetime.datetime(2015, 9, 10, 12, 27, 35, 120000)
+        utc = datetime.datetime.utcfromtimestamp(value.timestamp())
+        text = '{"$date": "%s.120Z"}' % utc.strftime("%Y-%m-%dT%H:%M:%S")
+        self.assertEqual(extended_json.loads(text), value)
+
+    def test_timestamp_with_offset(self):
+        utc = extended_json.loads('{"$date": "2015-09-10T12:27:35.000Z"}')
+        shifted = extended_json.loads('{"$date": "2015-09-10T15:27:35.000+03:00"}')
+        self.assertEqual(utc, shifted)
+
+    def test_date_and_time(self):
+        self.assertEqual(extended_json.loads('{"$dateDay": "1980-01-31"}'), datetime.date(1980, 1, 31))
+        self.assertEqual(extended_json.loads('{"$time": "12:01:02.5"}'), datetime.time(12, 1, 2, 500000))
+
+    def test_binary(self):
+        text = '{"$binary": "%s"}' % base64.b64encode(b"\x00\x01blob").decode()
+        self.assertEqual(extended_json.loads(text), b"\x00\x01blob")
+
+    def test_dollar_keys_in_documents(self):
+        self.assertEqual(extended_json.loads('{"$numberLong": 1, "other": 2}'), {"$numberLong": 1, "other": 2})
+
+
+class TestExtendedJsonDumps(unittest.TestCase):
+    def test_round_trip(self):
+        document = {
+            "_id": "doc1",
+            "number": 12345678901,
+            "float": 2.5,
+            "flags": [True, False, None],
+            "timestamp": datetime.datetime(2015, 9, 10, 12, 27, 35, 120000),
+            "date": datetime.date(1980, 1, 31),
+            "time": datetime.time(12, 1, 2, 500000),
+            "decimal": decimal.Decimal("1.10"),
+            "binary": b"\x00\x01blob",
+            "nested": Document({"list": (1, "two", {"three": 3})}),
+        }
+        expected = dict(document, nested={"list": [1, "two", {"three": 3}]})
+        self.assertEqual(extended_json.loads(extended_json.dumps(document)), expected)
+
+    def test_timestamp_is_utc_with_milliseconds(self):
+        value = datetime.datetime(2015, 9, 10, 12, 27, 35, 120000)
+        utc = datetime.datetime.utcfromtimestamp(int(value.replace(microsecond=0).timestamp()))
+        self.assertEqual(extended_json.dumps(value),
+                         '{"$date":"%s.120Z"}' % utc.strftime("%Y-%m-%dT%H:%M:%S"))
+
+    def test_microseconds_are_not_truncated(self):
+        document = Document({"timestamp": datetime.datetime(2015, 9, 10, 12, 27, 35, 120999)})
+        with self.assertRaises(ValueError):
+            extended_json.dumps(document)
+        with mock.patch("maprdb.document.python_to_java_cast") as cast:
+            self.assertIs(Document.java_document_from_json(document), cast.return_value)
+        cast.assert_called_once_with(document)
+
+    def test_unsupported_values(self):
+        with self.assertRaises(TypeError):
+            extended_json.dumps({"a": object()})
+        with self.assertRaises(ValueError):
+            extended_json.dumps({"a": float("nan")})
+
+
+class TestJVMTimeZone(unittest.TestCase):
+    def setUp(self):
+        utils._local_offsets.clear()
+        utils._time_zone = mock.Mock(getOffset=lambda millis: (5 * 3600 + 1800) * 1000)
+
+    def tearDown(self):
+        utils._time_zone = None
+        utils._local_offsets.clear()
+
+    def test_timestamps_in_jvm_time_zone(self):
+        value = datetime.datetime(2015, 9, 10, 17, 57, 35, 120000)
+        self.assertEqual(extended_json.dumps(value), '{"$date":"2015-09-10T12:27:35.120Z"}')
+        self.assertEqual(extended_json.loads('{"$date": "2015-09-10T12:27:35.120Z"}'), value)
+        self.assertEqual(extended_json.loads('{"$date": "2015-09-10T15:27:35.120+03:00"}'), value)
+
+
+class TestJsonEncoding(BaseMapRDBTest):
+    def test_same_as_field_by_field(self):
+        document = Document({"_id": "doc1", "number": 33, "float": 3.1, "string": "str",
+                             "timestamp": datetime.datetime(2015, 9, 10, 12, 27, 35),
+                             "list": [5, 6, {"a": [7]}], "dict": {"a": 7, "b": {"c": 6.25}}})
+        self.assertEqual(java_to_python_cast(Document.java_document_from_json(document)),
+                         java_to_python_cast(document._get_java_object()))
+
+    def test_float_same_as_field_by_field(self):
+        java_document = Document({"_id": "doc1"})._get_java_object()
+        java_document.set("float", jpype.JFloat(0.1))
+        self.assertEqual(Document.python_document_from_json(java_document),
+                         Document.python_document_from_java(java_document))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import logging
+from unittest import mock
+from maprdb import Table, Document, LazyDocument
+from tests.utils import FakeJavaTable, FakeJavaDocument
+
+
+class TestLazyDocument(unittest.TestCase):
+    def setUp(self):
+        self.java_document = FakeJavaDocument({'_id': 'doc1', 'name': 'Peter', 'address': {'city': 'Paris'},
+                                               'tags': ['a', 'b'], 'empty': None})
+        self.document = LazyDocument(self.java_document)
+
+    def test_fields_are_converted_on_first_access(self):
+        self.assertEqual(self.document['name'], 'Peter')
+        self.assertEqual(self.document['name'], 'Peter')
+        self.assertEqual(self.document.get('missing'), None)
+        self.assertIsNone(self.document['empty'])
+        self.assertEqual(self.java_document.reads, ['name', 'empty'])
+        with self.assertRaises(KeyError):
+            self.document['missing']
+
+    def test_mapping_interface(self):
+        self.assertEqual(len(self.document), 5)
+        self.assertEqual(list(self.document), ['_id', 'name', 'address', 'tags', 'empty'])
+        self.assertIn('tags', self.document)
+        self.assertNotIn('missing', self.document)
+        self.assertEqual(self.java_document.reads, [])
+        self.assertEqual(self.document, {'_id': 'doc1', 'name': 'Peter', 'address': {'city': 'Paris'},
+                                         'tags': ['a', 'b'], 'empty': None})
+
+    def test_changes(self):
+        self.assertIs(self.document._get_java_object(), self.java_document)
+        self.document['name'] = 'Paul'
+        del self.document['tags']
+        self.document.pop('empty')
+        self.assertEqual(self.document.to_dict(), {'_id': 'doc1', 'name': 'Paul', 'address': {'city': 'Paris'}})
+        self.assertIsInstance(self.document.to_dict(), Document)
+        self.assertEqual(self.java_document.reads, ['empty', '_id', 'address'])
+
+    def test_in_place_changes(self):
+        self.assertEqual(self.document['name'], 'Peter')
+        self.assertIs(self.document._get_java_object(), self.java_document)
+        self.document['tags'].append('c')
+        self.document['address']['city'] = 'Rome'
+        self.assertEqual(self.java_document.fields['tags'], ['a', 'b'])
+        with mock.patch.object(Document, '_get_java_object', lambda document: dict(document)):
+            java_document = self.document._get_java_object()
+        self.assertIsNot(java_document, self.java_document)
+        self.assertEqual(java_document['tags'], ['a', 'b', 'c'])
+        self.assertEqual(java_document['address'], {'city': 'Rome'})
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.document.extra = 1
+
+    def test_table_option(self):
+        table = Table(FakeJavaTable())
+        table.java_table.documents = {'doc1': FakeJavaDocument({'_id': 'doc1', 'n': 1})}
+        self.assertIsInstance(table.find_by_id('doc1', lazy=True), LazyDocument)
+        self.assertEqual([d['n'] for d in table.find(lazy=True)], [1])
+
+        table.options['lazy_documents'] = True
+        self.assertIsInstance(next(iter(table.iter_chunks(prefetch=0)))[0], LazyDocument)
+        self.assertEqual(table._document_converter(lazy=False), Document.python_document_from_java)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,151 @@
+import datetime
+import shutil
+import tempfile
+import time
+import unittest
+import logging
+from maprdb import Table, Document, Condition, Mutation, Param
+from maprdb.backends import MemoryBackend, MemoryTable
+from maprdb.utils import MapRDBError
+
+
+class TestMemoryTable(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(MemoryTable())
+        self.table.insert_or_replace(Document({'count': 7, 'country': 'China', 'age': 34,
+                                               'address': {'city': 'Beijing', 'zip': 100000}}), key='doc1')
+        self.table.insert(Document({'count': 1, 'country': 'India', 'age': 20,
+                                    'dob': datetime.datetime(1990, 1, 2, 3, 4, 5)}), key='doc2')
+        self.table.insert(Document({'_id': 'doc0', 'country': 'Peru', 'tags': ['a', 'b']}))
+
+    def test_find_by_id(self):
+        self.assertEqual(self.table.find_by_id('doc2')['dob'], datetime.datetime(1990, 1, 2, 3, 4, 5))
+        self.assertIsNone(self.table.find_by_id('missing'))
+        self.assertEqual(self.table.find_by_id('doc1', columns=['age', 'address.city']),
+                         {'_id': 'doc1', 'age': 34, 'address': {'city': 'Beijing'}})
+        self.assertEqual([d['_id'] for d in self.table.find_by_id(['doc2', 'doc1'])], ['doc2', 'doc1'])
+
+    def test_documents_are_copied(self):
+        document = self.table.find_by_id('doc1')
+        document['address']['city'] = 'Shanghai'
+        self.assertEqual(self.table.find_by_id('doc1')['address']['city'], 'Beijing')
+
+    def test_insert_existing(self):
+        with self.assertRaises(MapRDBError):
+            self.table.insert(Document({'count': 8}), key='doc1')
+
+    def test_find_sorted_by_id(self):
+        self.assertEqual([d['_id'] for d in self.table.find()], ['doc0', 'doc1', 'doc2'])
+        self.assertEqual(list(self.table.find(columns=['count'])),
+                         [{'_id': 'doc0'}, {'_id': 'doc1', 'count': 7}, {'_id': 'doc2', 'count': 1}])
+
+    def test_find_by_condition(self):
+        def ids(shorthand):
+            return [d['_id'] for d in self.table.find_by_condition(Condition(shorthand))]
+
+        self.assertEqual(ids({'country': 'China'}), ['doc1'])
+        self.assertEqual(ids({'age': {'$gt': 20}}), ['doc1'])
+        self.assertEqual(ids({'age': {'$ge': 20}, 'country': {'$ne': 'China'}}), ['doc2'])
+        self.assertEqual(ids([{'country': 'Peru'}, {'count': {'$lt': 5}}]), ['doc0', 'doc2'])
+        self.assertEqual(ids({'age': {'$between': [10, 30]}}), ['doc2'])
+        self.assertEqual(ids({'age': {'$ge': 20, '$lt': 34}}), ['doc2'])
+        self.assertEqual(ids({'country': {'$in': ['Peru', 'India']}}), ['doc0', 'doc2'])
+        self.assertEqual(ids({'country': {'!$in': ['Peru', 'India']}}), ['doc1'])
+        self.assertEqual(ids({'age': {'$exists': False}}), ['doc0'])
+        self.assertEqual(ids({'address.zip': 100000}), ['doc1'])
+        self.assertEqual(ids({'age': '34'}), [])
+        self.assertEqual(ids({'dob': {'$lt': datetime.datetime(2000, 1, 1)}}), ['doc2'])
+
+    def test_cached_and_template_conditions(self):
+        self.assertEqual([d['_id'] for d in self.table.find_by_condition(Condition.cached({'age': 20}))], ['doc2'])
+        template = Condition.template({'age': {'$gt': Param('min_age')}})
+        self.assertEqual([d['_id'] for d in self.table.find_by_condition(template.bind(min_age=30))], ['doc1'])
+        template = Condition.template({'age': {'$in': Param('ages')}})
+        self.assertEqual([d['_id'] for d in self.table.find_by_condition(template.bind(ages=[20, 40]))], ['doc2'])
+
+    def test_update(self):
+        mutation = Mutation([
+            {'count': {'$inc': 4}},
+            {'tags': {'$append': ['c']}},
+            {'country': {'$delete': []}},
+            {'address.city': {'$setOrReplace': 'Shanghai'}},
+        ]).build()
+        self.table.update_all({'doc1': mutation, 'doc0': mutation})
+        self.assertEqual(self.table.find_by_id('doc1'), {'_id': 'doc1', 'count': 11, 'age': 34, 'tags': ['c'],
+                                                         'address': {'city': 'Shanghai', 'zip': 100000}})
+        self.assertEqual(self.table.find_by_id('doc0')['tags'], ['a', 'b', 'c'])
+
+        self.table.update('new', Mutation().set('count', 1))
+        self.assertEqual(self.table.find_by_id('new'), {'_id': 'new', 'count': 1})
+
+        with self.assertRaises(MapRDBError):
+            self.table.update('doc1', Mutation().set('count', 'text'))
+
+    def test_delete(self):
+        self.table.delete(['doc1', 'missing'])
+        self.assertEqual([d['_id'] for d in self.table.find()], ['doc0', 'doc2'])
+
+    def test_bulk_writer(self):
+        with self.table.bulk_writer(batch_size=2) as writer:
+            for i in range(5):
+                writer.insert({'n': i}, key='bulk{}'.format(i))
+            writer.insert({'n': 0}, key='doc1')
+        self.assertEqual(writer.written, 5)
+        self.assertEqual(len(writer.failures), 1)
+        self.assertEqual(len(list(self.table.find())), 8)
+
+    def test_latency(self):
+        table = Table(MemoryTable(latency=0.05))
+        started = time.monotonic()
+        table.find_by_id('missing')
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+
+class TestMemoryBackend(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_tables(self):
+        backend = MemoryBackend()
+        self.assertFalse(backend.table_exists('/tmp/t'))
+        backend.create_table('/tmp/t')
+        self.assertTrue(backend.table_exists('/tmp/t'))
+        with self.assertRaises(MapRDBError):
+            backend.create_table('/tmp/t')
+        backend.delete_table('/tmp/t')
+        with self.assertRaises(MapRDBError):
+            backend.get_table('/tmp/t')
+
+    def test_file_backed(self):
+        table = Table(MemoryBackend(path=self.path).create_table('/tmp/t'))
+        table.insert(Document({'_id': 'doc1', 'n': 1}))
+        table.close()
+
+        table = Table(MemoryBackend(path=self.path).get_table('/tmp/t'))
+        self.assertEqual(table.find_by_id('doc1'), {'_id': 'doc1', 'n': 1})
+
+    def test_only_modified_tables_are_saved(self):
+        backend = MemoryBackend(path=self.path)
+        backend.create_table('/tmp/t').insert({'_id': 'doc1'})
+        reader = MemoryBackend(path=self.path).get_table('/tmp/t')
+        self.assertIsNone(reader.findById('doc1'))
+
+        # changes of another process are not overwritten by a table, which was only read
+        backend.get_table('/tmp/t').close()
+        reader.close()
+        self.assertIsNotNone(MemoryBackend(path=self.path).get_table('/tmp/t').findById('doc1'))
+
+        reader.delete('missing')
+        reader.close()
+        self.assertIsNotNone(MemoryBackend(path=self.path).get_table('/tmp/t').findById('doc1'))
+        reader.insert({'_id': 'doc2'})
+        reader.close()
+        self.assertIsNotNone(MemoryBackend(path=self.path).get_table('/tmp/t').findById('doc2'))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import logging
+from maprdb import Table, Document, metrics, document, tables, utils
+from maprdb.backends import MemoryTable
+from maprdb.utils import MapRDBError
+from tests.utils import FakeJavaTable
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_operations(self):
+        table = Table(MemoryTable())
+        table.insert(Document({'_id': 'doc1', 'n': 1}))
+        table.find_by_id('doc1')
+        table.find_by_id('doc2')
+        with self.assertRaises(MapRDBError):
+            table.insert(Document({'_id': 'doc1', 'n': 2}))
+
+        operations = metrics.snapshot()['operations']
+        self.assertEqual(operations['find_by_id']['calls'], 2)
+        self.assertEqual(operations['find_by_id']['errors'], 0)
+        self.assertEqual(operations['insert']['calls'], 2)
+        self.assertEqual(operations['insert']['errors'], 1)
+        self.assertEqual(operations['find_by_id']['latency']['count'], 2)
+        self.assertGreater(operations['find_by_id']['latency']['sum'], 0)
+
+    def test_generators_are_timed_until_closed(self):
+        table = Table(MemoryTable([{'_id': 'doc{}'.format(i)} for i in range(5)]))
+        documents = table.find()
+        self.assertNotIn('find', metrics.snapshot()['operations'])
+        next(documents)
+        documents.close()
+        self.assertEqual(metrics.snapshot()['operations']['find']['errors'], 0)
+
+        self.assertEqual(len(list(table.find())), 5)
+        self.assertEqual(metrics.snapshot()['operations']['find']['calls'], 2)
+
+    def test_conversions(self):
+        table = Table(FakeJavaTable([{'_id': 'doc1', 'name': 'Peter', 'tags': ['a', 'b']}]))
+        table.find_by_id('doc1')
+
+        snapshot = metrics.snapshot()
+        conversion = snapshot['conversions']['java_to_python']
+        self.assertEqual(conversion['calls'], 1)
+        self.assertEqual(conversion['documents'], 1)
+        self.assertEqual(conversion['values'], 9)
+        self.assertEqual(conversion['bytes'], len('_id' 'doc1' 'name' 'Peter' 'tags' 'a' 'b'))
+        self.assertEqual(snapshot['operations']['find_by_id']['jni_calls'], 1 + 9)
+
+    def test_hook(self):
+        events = []
+        metrics.add_hook(events.append)
+        try:
+            Table(MemoryTable()).find_by_id('doc1')
+        finally:
+            metrics.remove_hook(events.append)
+        self.assertEqual([(event['kind'], event['name']) for event in events], [('operation', 'find_by_id')])
+
+    def test_prometheus_text(self):
+        Table(MemoryTable()).find_by_id('doc1')
+        text = metrics.prometheus_text()
+        self.assertIn('maprdb_operation_seconds_count{operation="find_by_id"} 1\n', text)
+        self.assertIn('maprdb_operation_calls_total{operation="find_by_id"} 1\n', text)
+
+    def test_disable_restores_functions(self):
+        metrics.disable()
+        find_by_id = Table.find_by_id
+        metrics.enable()
+        self.assertIsNot(Table.find_by_id, find_by_id)
+        self.assertIsNot(document.java_to_python_cast, utils.java_to_python_cast)
+
+        metrics.disable()
+        self.assertIs(Table.find_by_id, find_by_id)
+        self.assertIs(document.java_to_python_cast, utils.java_to_python_cast)
+        self.assertIs(tables.python_to_java_cast, utils.python_to_java_cast)
+        Table(MemoryTable()).find_by_id('doc1')
+        self.assertEqual(metrics.snapshot()['operations'], {})
+        self.assertFalse(metrics.snapshot()['enabled'])
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = metrics.Histogram()
+        for _ in range(99):
+            histogram.observe(0.000002)
+        histogram.observe(0.5)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 100)
+        self.assertAlmostEqual(snapshot['p50'], 10 ** 0.5 * 1e-6)
+        self.assertEqual(snapshot['p99'], snapshot['p50'])
+        self.assertEqual(snapshot['max'], 0.5)
+        self.assertEqual(snapshot['buckets'][-1][1], 100)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
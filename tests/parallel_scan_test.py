@@ -0,0 +1,118 @@
+import random
+import shutil
+import tempfile
+import unittest
+import logging
+from unittest import mock
+from maprdb import Table, Condition
+from maprdb.backends import MemoryBackend, MemoryTable
+from maprdb.connection import Connection
+from maprdb import parallel_scan as parallel_scan_module
+from maprdb.parallel_scan import sample_split_points, key_ranges, range_condition, parallel_scan, \
+    tablet_split_points
+from maprdb.utils import MapRDBError
+
+
+class TestKeyRanges(unittest.TestCase):
+    def test_sample_split_points(self):
+        keys = ["key{:04d}".format(i) for i in range(1000)]
+        self.assertEqual(sample_split_points(keys, 4), ["key0250", "key0500", "key0750"])
+        points = sample_split_points(keys, 4, sample_size=100, rng=random.Random(1))
+        self.assertEqual(len(points), 3)
+        self.assertEqual(points, sorted(points))
+        self.assertEqual(sample_split_points(["a", "a", "a"], 4), [])
+        self.assertEqual(sample_split_points([], 4), [])
+
+    def test_key_ranges(self):
+        self.assertEqual(key_ranges(["b", "d"]), [(None, "b"), ("b", "d"), ("d", None)])
+        self.assertEqual(key_ranges([]), [(None, None)])
+
+    def test_range_condition(self):
+        self.assertIsNone(range_condition(None))
+        self.assertEqual(range_condition(None, "a", "b"), {"_id": {"$ge": "a", "$lt": "b"}})
+        self.assertEqual(range_condition({"n": 1}, stop="b"), {"n": 1, "_id": {"$lt": "b"}})
+        self.assertEqual(range_condition([{"n": 1}, {"n": 2}], "a"),
+                         [{"n": 1, "_id": {"$ge": "a"}}, {"n": 2, "_id": {"$ge": "a"}}])
+        self.assertEqual(range_condition({"_id": {"$ge": "c"}}, "a", "b"), {"_id": {"$ge": "c", "$lt": "b"}})
+        self.assertEqual(range_condition({"_id": "x"}, "a"), {"_id": {"=": "x", "$ge": "a"}})
+
+    def test_tablet_split_points(self):
+        def tablet(*starts):
+            ranges = [mock.Mock(**{'getStartRow.return_value': start}) for start in starts]
+            return mock.Mock(**{'getCondition.return_value.getRowkeyRanges.return_value': ranges})
+        java_table = mock.Mock(**{'getTabletInfos.return_value': [tablet([]), tablet(list(b"doc5")), tablet(None),
+                                                                    tablet(list(b"doc2"))]})
+        self.assertEqual(tablet_split_points(java_table), ["doc2", "doc5"])
+        self.assertIsNone(tablet_split_points(MemoryTable()))
+        java_table.getTabletInfos.side_effect = RuntimeError("not supported")
+        self.assertIsNone(tablet_split_points(java_table))
+
+    def test_split_points_read_bounded_prefix(self):
+        table = Table(MemoryTable({"_id": "doc{:04d}".format(i)} for i in range(500)))
+        read = []
+        keys = table.keys
+
+        def counting_keys(*args):
+            for key in keys(*args):
+                read.append(key)
+                yield key
+
+        with mock.patch.object(table, "keys", counting_keys), \
+                mock.patch.object(parallel_scan_module, "SPLIT_SAMPLE_SIZE", 100):
+            split_points = table._split_points(None, 2)
+        self.assertEqual(len(read), 100)
+        self.assertEqual(len(split_points), 7)
+
+        with mock.patch.object(parallel_scan_module, "tablet_split_points", return_value=["doc0100", "doc0300"]):
+            self.assertEqual(table._split_points(None, 3), ["doc0100", "doc0300"])
+
+
+class TestParallelScan(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.backend = MemoryBackend(path=self.path)
+        self.table = Table(self.backend.create_table("/tmp/parallel_scan"))
+        for i in range(500):
+            self.table.insert({"_id": "doc{:04d}".format(i), "n": i, "even": i % 2 == 0})
+        self.keys = ["doc{:04d}".format(i) for i in range(500)]
+        patcher = mock.patch.object(Connection, "instance", mock.Mock(backend=self.backend))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_ordered(self):
+        documents = list(self.table.parallel_scan(workers=2, chunk_size=50))
+        self.assertEqual([d["_id"] for d in documents], self.keys)
+        self.assertEqual(documents[3], {"_id": "doc0003", "n": 3, "even": False})
+
+    def test_unordered_with_condition_and_columns(self):
+        documents = list(self.table.parallel_scan(workers=2, condition=Condition({"even": True}), columns=["n"],
+                                                  ordered=False, split_points=["doc0100", "doc0300"]))
+        self.assertEqual(sorted(d["n"] for d in documents), list(range(0, 500, 2)))
+        self.assertEqual(set(documents[0]), {"_id", "n"})
+
+    def test_ordered_with_bounded_buffers(self):
+        self.table.flush()
+        ranges = key_ranges(["doc0050", "doc0100", "doc0400"])
+        documents = list(parallel_scan(self.backend, "/tmp/parallel_scan", ranges, workers=4, chunk_size=10,
+                                       max_buffered_chunks=1))
+        self.assertEqual([d["_id"] for d in documents], self.keys)
+
+    def test_close_early(self):
+        documents = self.table.parallel_scan(workers=2, chunk_size=10)
+        self.assertEqual(next(documents)["_id"], "doc0000")
+        documents.close()
+
+    def test_errors(self):
+        with self.assertRaises(MapRDBError):
+            list(self.table.parallel_scan(workers=2, condition={"n": {"$like": "1%"}}, split_points=[]))
+        with mock.patch.object(Connection, "instance", mock.Mock(backend=MemoryBackend())):
+            with self.assertRaises(MapRDBError):
+                list(self.table.parallel_scan(workers=2, split_points=[]))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,43 @@
+import time
+import unittest
+import logging
+from maprdb import Table
+from tests.utils import FakeJavaTable
+
+
+class TestPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.java_table = FakeJavaTable({'_id': 'key{:02d}'.format(i), 'n': i} for i in range(25))
+        self.table = Table(self.java_table)
+
+    def test_find_without_prefetch(self):
+        self.assertEqual([d['n'] for d in self.table.find()], list(range(25)))
+
+    def test_find_with_prefetch(self):
+        self.assertEqual([d['n'] for d in self.table.find(prefetch=2, chunk_size=4)], list(range(25)))
+
+    def test_iter_chunks(self):
+        for prefetch in [0, 2]:
+            chunks = list(self.table.iter_chunks(chunk_size=10, prefetch=prefetch))
+            self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+            self.assertEqual(chunks[2][0]['n'], 20)
+
+    def test_stream_closed_on_early_stop(self):
+        for prefetch in [0, 2]:
+            documents = self.table.find(prefetch=prefetch, chunk_size=3)
+            next(documents)
+            documents.close()
+            stream = self.java_table.streams[-1]
+            deadline = time.monotonic() + 5
+            while not stream.closed and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(stream.closed)
+
+    def test_stream_closed_when_exhausted(self):
+        list(self.table.find())
+        self.assertTrue(self.java_table.streams[-1].closed)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,147 @@
+import threading
+import unittest
+import logging
+from maprdb.table_pool import TablePool
+
+
+class FakeTable(object):
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestTablePool(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.opened = []
+        self.pool = TablePool(self.open_table, idle_ttl=10.0, clock=lambda: self.now)
+
+    def open_table(self, name):
+        self.opened.append(FakeTable(name))
+        return self.opened[-1]
+
+    def test_reuse(self):
+        with self.pool.table('/t1') as first:
+            with self.pool.table('/t1') as second:
+                self.assertIs(first, second)
+        with self.pool.table('/t2'):
+            pass
+        self.assertEqual([table.name for table in self.opened], ['/t1', '/t2'])
+        self.assertEqual(self.pool.stats(), {'hits': 1, 'misses': 2, 'evictions': 0, 'open': 2, 'in_use': 0})
+
+    def test_idle_eviction(self):
+        table = self.pool.acquire('/t1')
+        self.now = 100.0
+        self.pool.evict_idle()
+        self.assertFalse(table.closed)
+
+        self.pool.release('/t1')
+        self.now = 105.0
+        self.pool.evict_idle()
+        self.assertFalse(table.closed)
+
+        self.now = 110.0
+        with self.pool.table('/t2'):
+            self.assertTrue(table.closed)
+        self.assertIsNot(self.pool.acquire('/t1'), table)
+        self.assertEqual(self.pool.stats()['evictions'], 1)
+
+    def test_release_not_acquired(self):
+        with self.pool.table('/t1'):
+            pass
+        with self.assertRaises(ValueError):
+            self.pool.release('/t1')
+
+    def test_discard(self):
+        table = self.pool.acquire('/t1')
+        self.pool.discard('/t1')
+        self.assertFalse(table.closed)
+        self.pool.release('/t1')
+        self.assertTrue(table.closed)
+        self.assertEqual(self.pool.stats()['open'], 0)
+
+    def test_discard_reacquired(self):
+        old = self.pool.acquire('/t1')
+        self.pool.discard('/t1')
+        new = self.pool.acquire('/t1')
+        self.assertIsNot(old, new)
+        with self.assertRaises(ValueError):
+            self.pool.release('/t1')
+        self.pool.release('/t1', old)
+        self.assertTrue(old.closed)
+        self.pool.release('/t1')
+        self.assertFalse(new.closed)
+        with self.assertRaises(ValueError):
+            self.pool.release('/t1', new)
+
+    def test_discarded_table_outlives_later_users(self):
+        with self.pool.table('/t1') as old:
+            self.pool.discard('/t1')
+            with self.pool.table('/t1') as new:
+                self.assertIsNot(old, new)
+            self.assertFalse(old.closed)
+            self.assertFalse(new.closed)
+        self.assertTrue(old.closed)
+        self.assertEqual(self.pool.stats(), {'hits': 0, 'misses': 2, 'evictions': 0, 'open': 1, 'in_use': 0})
+
+    def test_open_outside_lock(self):
+        opening = threading.Event()
+        proceed = threading.Event()
+
+        def open_table(name):
+            if name == '/slow':
+                opening.set()
+                proceed.wait(5)
+            return FakeTable(name)
+
+        pool = TablePool(open_table)
+        results = []
+        slow = [threading.Thread(target=lambda: results.append(pool.acquire('/slow'))) for _ in range(2)]
+        slow[0].start()
+        opening.wait(5)
+        slow[1].start()
+        self.assertEqual(pool.acquire('/fast').name, '/fast')
+        proceed.set()
+        for thread in slow:
+            thread.join()
+        self.assertIs(results[0], results[1])
+        self.assertEqual(pool.stats()['misses'], 2)
+
+    def test_open_failure(self):
+        def open_table(name):
+            if not self.opened:
+                self.opened.append(None)
+                raise IOError("failed")
+            return FakeTable(name)
+
+        pool = TablePool(open_table)
+        with self.assertRaises(IOError):
+            pool.acquire('/t1')
+        self.assertEqual(pool.stats()['open'], 0)
+        self.assertEqual(pool.acquire('/t1').name, '/t1')
+
+    def test_close(self):
+        table = self.pool.acquire('/t1')
+        self.pool.close()
+        self.assertTrue(table.closed)
+
+    def test_threads(self):
+        def use():
+            for _ in range(100):
+                with self.pool.table('/t1'):
+                    pass
+        threads = [threading.Thread(target=use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(self.pool.stats(), {'hits': 799, 'misses': 1, 'evictions': 0, 'open': 1, 'in_use': 0})
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
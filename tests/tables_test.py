@@ -0,0 +1,398 @@
+import threading
+import unittest
+import logging
+from unittest import mock
+from maprdb import Table
+from maprdb.backends import MemoryTable
+from maprdb.mutation import Mutation
+from maprdb import utils
+from maprdb.utils import MapRDBError, MapRDBMultiOpError
+from tests.base import BaseMapRDBTest
+from tests.utils import FakeJavaTable
+
+
+class TestFindById(unittest.TestCase):
+    def setUp(self):
+        self.java_table = FakeJavaTable({'_id': 'key{}'.format(i), 'n': i} for i in range(10))
+        self.table = Table(self.java_table)
+
+    def test_single_key(self):
+        self.assertEqual(self.table.find_by_id('key3'), {'_id': 'key3', 'n': 3})
+        self.assertIsNone(self.table.find_by_id('missing'))
+
+    def test_columns(self):
+        self.assertEqual(self.table.find_by_id('key3', columns=['other']), {'_id': 'key3'})
+
+    def test_list_of_keys_keeps_order(self):
+        keys = ['key{}'.format(i) for i in reversed(range(10))]
+        documents = self.table.find_by_id(keys, batch_size=3, parallelism=4)
+        self.assertEqual([d['n'] for d in documents], list(reversed(range(10))))
+        self.assertEqual(self.java_table.calls, 10)
+
+    def test_worker_threads_are_reused(self):
+        threads = set()
+        find_by_id = self.java_table.findById
+
+        def recording_find_by_id(*args):
+            threads.add(threading.current_thread())
+            return find_by_id(*args)
+
+        self.java_table.findById = recording_find_by_id
+        keys = ['key{}'.format(i) for i in range(10)]
+        for _ in range(5):
+            self.table.find_by_id(keys, batch_size=1, parallelism=3)
+        self.assertLessEqual(len(threads), utils.SHARED_EXECUTOR_WORKERS)
+        self.assertTrue(all(thread.is_alive() for thread in threads))
+
+    def test_missing_keys(self):
+        documents = self.table.find_by_id(iter(['key1', 'missing', 'key2']), batch_size=1)
+        self.assertEqual(documents, [{'_id': 'key1', 'n': 1}, None, {'_id': 'key2', 'n': 2}])
+
+    def test_empty_list(self):
+        self.assertEqual(self.table.find_by_id([]), [])
+
+
+class TestKeyListOperations(unittest.TestCase):
+    def setUp(self):
+        self.java_table = FakeJavaTable({'_id': 'key{}'.format(i)} for i in range(10))
+        self.table = Table(self.java_table)
+        self.keys = ['key{}'.format(i) for i in range(10)]
+
+    def test_update_parallel(self):
+        self.table.update(self.keys, 'mutation', parallelism=4)
+        self.assertTrue(all(d['mutation'] == 'mutation' for d in self.java_table.documents.values()))
+
+    def test_update_all(self):
+        self.table.update_all({k: k.upper() for k in self.keys}, parallelism=3)
+        self.assertEqual(self.java_table.documents['key7']['mutation'], 'KEY7')
+
+    def test_delete_parallel(self):
+        self.table.delete(self.keys, parallelism=4)
+        self.assertEqual(self.java_table.documents, {})
+
+    def test_errors_per_key(self):
+        with self.assertRaises(MapRDBMultiOpError) as raised:
+            self.table.delete(['missing', 'key1', 'key2'], parallelism=4)
+        self.assertEqual(list(raised.exception.errors), ['missing'])
+        self.assertNotIn('key2', self.java_table.documents)
+
+    def test_errors_per_key_serial(self):
+        with self.assertRaises(MapRDBMultiOpError) as raised:
+            self.table.update(['key1', 'missing', 'key2'], 'mutation')
+        self.assertEqual(list(raised.exception.errors), ['missing'])
+        self.assertEqual(self.java_table.documents['key2']['mutation'], 'mutation')
+
+    def test_connection_parallelism_option(self):
+        table = Table(self.java_table, options={'parallelism': 4})
+        table.delete(self.keys[:5])
+        self.assertEqual(len(self.java_table.documents), 5)
+
+
+class RecordingMemoryTable(MemoryTable):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.conditions = []
+        self.streams = []
+        self.reads = 0
+
+    def findById(self, *args):
+        self.reads += 1
+        return super().findById(*args)
+
+    def find(self, *args):
+        stream = super().find(*args)
+        self.conditions.append(self._condition(args[0]) if args and not isinstance(args[0], list) else None)
+        self.streams.append(stream)
+        return stream
+
+
+class TestScan(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(RecordingMemoryTable({'_id': 'key{}'.format(i), 'n': i} for i in range(10)))
+
+    def ids(self, documents):
+        return [document['_id'] for document in documents]
+
+    def test_range(self):
+        self.assertEqual(self.ids(self.table.scan(start='key3', stop='key6')), ['key3', 'key4', 'key5'])
+        self.assertEqual(self.table.java_table.conditions[-1], {'_id': {'$ge': 'key3', '$lt': 'key6'}})
+        self.assertEqual(self.ids(self.table.scan(stop='key2')), ['key0', 'key1'])
+        self.assertEqual(len(list(self.table.scan())), 10)
+        self.assertIsNone(self.table.java_table.conditions[-1])
+
+    def test_limit_and_pagination(self):
+        page = list(self.table.scan(start='key2', limit=3, columns=['n']))
+        self.assertEqual(page, [{'_id': 'key2', 'n': 2}, {'_id': 'key3', 'n': 3}, {'_id': 'key4', 'n': 4}])
+        self.assertTrue(self.table.java_table.streams[-1].closed)
+
+        page = list(self.table.scan(start='key2', limit=3, after=page[-1]['_id']))
+        self.assertEqual(self.ids(page), ['key5', 'key6', 'key7'])
+        self.assertEqual(self.table.java_table.conditions[-1], {'_id': {'$ge': 'key2', '$gt': 'key4'}})
+        self.assertEqual(list(self.table.scan(limit=0)), [])
+
+    def test_reverse(self):
+        self.assertEqual(self.ids(self.table.scan(stop='key3', reverse=True)), ['key2', 'key1', 'key0'])
+        page = list(self.table.scan(start='key1', stop='key8', reverse=True, limit=2))
+        self.assertEqual(self.ids(page), ['key7', 'key6'])
+        page = list(self.table.scan(start='key1', stop='key8', reverse=True, limit=2, after=page[-1]['_id']))
+        self.assertEqual(self.ids(page), ['key5', 'key4'])
+        self.assertEqual(self.table.java_table.conditions[-1], {'_id': {'$ge': 'key1', '$lt': 'key6'}})
+
+
+class TestKeysAndCount(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(RecordingMemoryTable({'_id': 'key{}'.format(i), 'n': i} for i in range(10)))
+
+    def test_keys(self):
+        self.assertEqual(list(self.table.keys(stop='key3')), ['key0', 'key1', 'key2'])
+        self.assertEqual(self.table.java_table.streams[-1].columns, ['_id'])
+        self.assertEqual(list(self.table.keys({'n': {'$gt': 6}}, start='key8')), ['key8', 'key9'])
+        self.assertEqual(self.table.java_table.conditions[-1], {'n': {'$gt': 6}, '_id': {'$ge': 'key8'}})
+        self.assertEqual(len(list(self.table.keys())), 10)
+
+    def test_count(self):
+        self.assertEqual(self.table.count(), 10)
+        self.assertEqual(self.table.count({'n': {'$lt': 4}}), 4)
+        self.assertEqual(self.table.java_table.streams[-1].columns, ['_id'])
+        self.assertTrue(self.table.java_table.streams[-1].closed)
+
+
+class TestMutateWhere(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(RecordingMemoryTable({'_id': 'key{:02}'.format(i), 'n': i} for i in range(40)))
+
+    def test_delete_where(self):
+        progress = []
+        report = self.table.delete_where({'n': {'$lt': 25}}, batch_size=10, progress=progress.append)
+        self.assertEqual((report.processed, report.failures), (25, {}))
+        self.assertEqual(len(progress), 3)
+        self.assertEqual(self.table.count(), 15)
+        self.assertEqual(self.table.java_table.streams[0].columns, ['_id'])
+
+    def test_update_where(self):
+        report = self.table.update_where({'n': {'$ge': 30}}, Mutation().set('done', True), parallelism=2)
+        self.assertEqual(report.succeeded, 10)
+        self.assertEqual(self.table.count({'done': True}), 10)
+
+    def test_failed_keys(self):
+        def delete(key):
+            if key == 'key03':
+                raise KeyError(key)
+        self.table.java_table.delete = delete
+        report = self.table.delete_where({'n': {'$lt': 5}}, rate=1000)
+        self.assertEqual(list(report.failures), ['key03'])
+        self.assertEqual(report.succeeded, 4)
+
+
+class TestCheckAndMutate(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(RecordingMemoryTable({'_id': 'key{}'.format(i), 'state': 'new'} for i in range(5)))
+
+    def test_check_and_mutate(self):
+        self.assertTrue(self.table.check_and_mutate('key1', {'state': 'new'}, Mutation().set('state', 'paid')))
+        self.assertFalse(self.table.check_and_mutate('key1', {'state': 'new'}, Mutation().set('state', 'lost')))
+        self.assertFalse(self.table.check_and_mutate('missing', {'state': 'new'}, Mutation().set('state', 'paid')))
+        self.assertEqual(self.table.find_by_id('key1')['state'], 'paid')
+
+    def test_check_and_replace(self):
+        self.assertTrue(self.table.check_and_replace('key2', {'state': 'new'}, {'state': 'done'}))
+        self.assertFalse(self.table.check_and_replace('key2', {'state': 'new'}, {'_id': 'key2', 'state': 'x'}))
+        self.assertEqual(self.table.find_by_id('key2'), {'_id': 'key2', 'state': 'done'})
+        with self.assertRaises(MapRDBError):
+            self.table.check_and_replace('key2', {'state': 'done'}, {'_id': 'key3'})
+
+    def test_invalidates_cache(self):
+        self.table.enable_cache()
+        self.table.find_by_id('key1')
+        self.table.check_and_mutate('key1', {'state': 'new'}, Mutation().set('state', 'paid'))
+        self.assertEqual(self.table.find_by_id('key1')['state'], 'paid')
+
+    def test_check_and_mutate_all(self):
+        operations = [('key{}'.format(i), {'state': 'new'}, Mutation().set('state', 'paid')) for i in range(5)]
+        self.assertEqual(self.table.check_and_mutate_all(operations[2:], parallelism=2), [True, True, True])
+        self.assertEqual(self.table.check_and_mutate_all(operations[:3]), [True, True, False])
+        self.assertEqual(self.table.count({'state': 'paid'}), 5)
+
+
+class TestDocumentCache(unittest.TestCase):
+    def setUp(self):
+        self.java_table = RecordingMemoryTable({'_id': 'key{}'.format(i), 'n': i} for i in range(10))
+        self.table = Table(self.java_table)
+        self.table.enable_cache(maxsize=100)
+
+    def test_hits_do_not_read_table(self):
+        for _ in range(3):
+            self.assertEqual(self.table.find_by_id('key1'), {'_id': 'key1', 'n': 1})
+            self.assertIsNone(self.table.find_by_id('missing'))
+        self.assertEqual(self.table.find_by_id('key1', columns=['other']), {'_id': 'key1'})
+        self.assertEqual(self.java_table.reads, 2)
+        info = self.table.cache_info()
+        self.assertEqual((info['hits'], info['misses']), (5, 2))
+        self.assertAlmostEqual(info['hit_rate'], 5 / 7)
+
+    def test_returned_documents_are_copies(self):
+        self.table.find_by_id('key1')['n'] = 100
+        self.assertEqual(self.table.find_by_id('key1')['n'], 1)
+
+    def test_list_of_keys_reads_only_missing(self):
+        self.table.find_by_id(['key1', 'key2'])
+        documents = self.table.find_by_id(['key3', 'key1', 'missing', 'key2'], batch_size=1)
+        self.assertEqual([d and d['n'] for d in documents], [3, 1, None, 2])
+        self.assertEqual(self.java_table.reads, 4)
+
+    def test_writes_invalidate(self):
+        self.table.find_by_id(['key1', 'key2', 'key3', 'missing'])
+        self.table.insert({'_id': 'missing', 'n': -1})
+        self.table.insert_or_replace({'_id': 'key1', 'n': -1})
+        self.table.update('key2', Mutation().set('n', -1))
+        self.table.delete('key3')
+        documents = self.table.find_by_id(['key1', 'key2', 'key3', 'missing'])
+        self.assertEqual([d and d['n'] for d in documents], [-1, -1, None, -1])
+        self.assertEqual(self.java_table.reads, 8)
+
+    def test_write_during_miss(self):
+        reading = threading.Event()
+        written = threading.Event()
+        find_by_id = self.java_table.findById
+
+        def blocked_find_by_id(key, *args):
+            document = find_by_id(key, *args)
+            reading.set()
+            written.wait(5)
+            return document
+
+        results = []
+        with mock.patch.object(self.java_table, 'findById', side_effect=blocked_find_by_id):
+            reader = threading.Thread(target=lambda: results.append(self.table.find_by_id('key1')))
+            reader.start()
+            reading.wait(5)
+            self.table.update('key1', Mutation().set('n', 2))
+            written.set()
+            reader.join()
+        self.assertEqual(results[0]['n'], 1)
+        self.assertEqual(self.table.find_by_id('key1')['n'], 2)
+
+    def test_ttl_and_negative_caching(self):
+        now = [0.0]
+        self.table.enable_cache(ttl=10, negative_ttl=0)
+        self.table._cache._clock = lambda: now[0]
+        self.table.find_by_id(['key1', 'missing'])
+        self.table.find_by_id(['key1', 'missing'])
+        self.assertEqual(self.java_table.reads, 3)
+        now[0] = 11
+        self.table.find_by_id('key1')
+        self.assertEqual(self.java_table.reads, 4)
+
+    def test_max_bytes(self):
+        self.table.enable_cache(max_bytes=100)
+        self.table.find_by_id(['key{}'.format(i) for i in range(10)])
+        info = self.table.cache_info()
+        self.assertLessEqual(info['bytes'], 100)
+        self.assertGreater(info['evictions'], 0)
+
+    def test_connection_option(self):
+        table = Table(self.java_table, options={'document_cache': {'maxsize': 5}})
+        self.assertEqual(table.cache_info()['maxsize'], 5)
+        self.assertIsNone(Table(self.java_table).cache_info())
+
+
+class TestBulkWriterThreads(unittest.TestCase):
+    def test_writers_share_threads(self):
+        java_table = RecordingMemoryTable()
+        threads = set()
+        insert_or_replace = java_table.insertOrReplace
+
+        def recording_insert_or_replace(document):
+            threads.add(threading.current_thread())
+            written.append(document['n'])
+            insert_or_replace(document)
+
+        java_table.insertOrReplace = recording_insert_or_replace
+        table = Table(java_table)
+        for _ in range(20):
+            written = []
+            with table.bulk_writer(batch_size=3) as writer:
+                for i in range(10):
+                    writer.insert_or_replace({'n': i}, key='doc{:02d}'.format(i))
+            # batches of a writer are written one at a time, in order
+            self.assertEqual(written, list(range(10)))
+            self.assertEqual((writer.written, writer.failures), (10, []))
+        self.assertLessEqual(len(threads), utils.SHARED_EXECUTOR_WORKERS)
+        self.assertTrue(all(thread.is_alive() for thread in threads))
+
+
+class BufferingMemoryTable(MemoryTable):
+    """
+    Memory table with buffered writes option, which flush fails once.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.options = {}
+        self.fail_flush = False
+
+    def getOption(self, option):
+        return self.options.get(option, False)
+
+    def setOption(self, option, value):
+        self.options[option] = value
+
+    def flush(self):
+        if self.fail_flush:
+            self.fail_flush = False
+            raise MapRDBError("flush failed")
+
+
+class TestBulkWriterOptions(unittest.TestCase):
+    def setUp(self):
+        self.java_table = BufferingMemoryTable()
+        self.table = Table(self.java_table)
+        table_option = mock.Mock(BUFFERWRITE="BUFFERWRITE")
+        patches = [mock.patch("jpype.isJVMStarted", return_value=True),
+                   mock.patch("jpype.JClass", return_value=table_option)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_option_restored(self):
+        with self.table.bulk_writer(batch_size=2) as writer:
+            self.assertTrue(self.java_table.options["BUFFERWRITE"])
+            writer.insert_or_replace({'n': 1}, key='doc1')
+        self.assertFalse(self.java_table.options["BUFFERWRITE"])
+
+    def test_flush_failure_attributed_to_batch(self):
+        self.java_table.fail_flush = True
+        with self.table.bulk_writer(batch_size=2) as writer:
+            for i in range(4):
+                writer.insert_or_replace({'n': i}, key='doc{}'.format(i))
+        self.assertEqual(writer.written, 2)
+        self.assertEqual(sorted(doc['_id'] for doc, _ in writer.failures), ['doc0', 'doc1'])
+
+
+class TestBulkWriter(BaseMapRDBTest):
+    def setUp(self):
+        super().setUp()
+        if self.connection.exists("/tmp/test_bulk_writer"):
+            self.connection.delete("/tmp/test_bulk_writer")
+        self.table = self.connection.create("/tmp/test_bulk_writer")
+
+    def tearDown(self):
+        self.table.close()
+        self.connection.delete("/tmp/test_bulk_writer")
+
+    def test_write_batches(self):
+        with self.table.bulk_writer(batch_size=10) as writer:
+            for i in range(25):
+                writer.insert_or_replace({'n': i}, key='doc{}'.format(i))
+            writer.insert({'n': -1})  # no key, fails without stopping the writer
+            writer.insert({'n': 25}, key='doc25')
+
+        self.assertEqual(writer.written, 26)
+        self.assertEqual(len(writer.failures), 1)
+        self.assertIsInstance(writer.failures[0][1], MapRDBError)
+        self.assertEqual(len(list(self.table.find())), 26)
+        self.assertEqual(self.table.find_by_id('doc25')['n'], 25)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -1,3 +1,4 @@
+import copy
 import os
 import maprdb
 
@@ -13,3 +14,98 @@ def maprdb_connect():
     if not connection:
         connection = maprdb.connect(mapr_home=os.path.dirname(__file__))
     return connection
+
+
+class FakeJavaTable(object):
+    """
+    In-process stand-in of com.mapr.db.Table, which stores python dicts.
+    Allows to test maprdb.Table without JVM and cluster.
+    """
+    def __init__(self, documents=()):
+        self.documents = {document['_id']: document for document in documents}
+        self.calls = 0
+        self.streams = []
+
+    def findById(self, key, columns=None):
+        self.calls += 1
+        document = self.documents.get(key)
+        if document is not None and columns:
+            fields = set(column.split('.')[0] for column in columns)
+            document = {k: v for k, v in document.items() if k == '_id' or k in fields}
+        return document
+
+    def find(self, columns=None):
+        documents = [self.findById(key, columns) for key in sorted(self.documents)]
+        self.streams.append(FakeDocumentStream(documents))
+        return self.streams[-1]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def update(self, key, mutation):
+        self.calls += 1
+        if key not in self.documents:
+            raise KeyError(key)
+        self.documents[key] = dict(self.documents[key], mutation=mutation)
+
+    def delete(self, key):
+        self.calls += 1
+        if key not in self.documents:
+            raise KeyError(key)
+        del self.documents[key]
+
+
+class FakeDocumentStream(object):
+    """
+    Stand-in of com.mapr.db.DocumentStream over a list of python dicts.
+    """
+    def __init__(self, documents):
+        self.documents = documents
+        self.closed = False
+
+    def iterator(self):
+        return FakeIterator(self.documents)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeIterator(object):
+    def __init__(self, items):
+        self.items = list(items)
+        self.position = 0
+
+    def hasNext(self):
+        return self.position < len(self.items)
+
+    def next(self):
+        self.position += 1
+        return self.items[self.position - 1]
+
+
+class FakeJavaDocument(object):
+    """
+    Stand-in of Java document, which counts reads of fields.
+    """
+    def __init__(self, fields):
+        self.fields = fields
+        self.reads = []
+
+    def keySet(self):
+        return FakeKeySet(list(self.fields))
+
+    def get(self, key):
+        self.reads.append(key)
+        # Java document holds its own values, changes of converted python values don't reach it
+        return copy.deepcopy(self.fields.get(key))
+
+
+class FakeKeySet(object):
+    def __init__(self, keys):
+        self.keys = keys
+
+    def iterator(self):
+        return FakeIterator(self.keys)
@@ -0,0 +1,290 @@
+import datetime
+import os
+import time
+import unittest
+from unittest import mock
+import logging
+import jpype
+import decimal
+from maprdb import utils
+from maprdb.utils import java_to_python_cast, python_to_java_cast, register_java_converter, \
+    register_python_converter, _java_list_to_python, LRUCache
+from tests.base import BaseMapRDBTest
+
+
+class TestJavaToPythonCast(BaseMapRDBTest):
+    def test_nested_document(self):
+        document = {'some_number': 33,
+                    'some_float': 3.1,
+                    'some_string': 'str',
+                    'some_date': datetime.datetime(2015, 9, 10, 12, 27, 35),
+                    'some_list': [5, 6, {'a': [7]}],
+                    'some_dict': {'a': 7, 'b': {'c': 6.25}}}
+        java_document = python_to_java_cast(document)
+        self.assertEqual(java_to_python_cast(java_document), document)
+        # second conversion is served from resolved converters
+        self.assertEqual(java_to_python_cast(java_document), document)
+
+    def test_dates_and_times_round_trip(self):
+        values = [datetime.datetime(2015, 9, 10, 12, 27, 35, 123456),
+                  datetime.datetime(1969, 12, 31, 23, 59, 59, 999000),
+                  datetime.date(2015, 12, 31),
+                  datetime.date(1960, 1, 1),
+                  datetime.time(23, 59, 58, 125000),
+                  datetime.time(0, 0)]
+        for value in values:
+            self.assertEqual(java_to_python_cast(python_to_java_cast(value)), value)
+        self.assertEqual(python_to_java_cast(datetime.date(2015, 12, 31)).toString(), "2015-12-31")
+
+    def test_binary_round_trip(self):
+        for value in [b"\x00\xff" * 1000, bytearray(b"\x01\x80abc"), memoryview(b"xyz"), b""]:
+            converted = java_to_python_cast(python_to_java_cast(value))
+            self.assertEqual(bytes(converted), bytes(value))
+
+    def test_bytearray_is_copied(self):
+        value = bytearray(b"abc")
+        java_buffer = python_to_java_cast(value)
+        value[0] = ord("x")
+        self.assertEqual(java_to_python_cast(java_buffer), b"abc")
+
+    def test_direct_buffer_to_bytes(self):
+        java_buffer = jpype.java.nio.ByteBuffer.allocateDirect(4)
+        java_buffer.put(jpype.JArray(jpype.JByte)(b"abcd"))
+        java_buffer.position(1)
+        self.assertEqual(java_to_python_cast(java_buffer), b"bcd")
+
+    def test_tuple_and_document_subclass(self):
+        class Record(dict):
+            pass
+        self.assertEqual(java_to_python_cast(python_to_java_cast((1, Record(a=[2])))), [1, {'a': [2]}])
+
+    def test_subclass_of_known_base(self):
+        java_list = jpype.java.util.Vector()
+        java_list.add(1)
+        self.assertEqual(java_to_python_cast(java_list), [1])
+
+    def test_register_converter(self):
+        register_java_converter("java.util.Vector", lambda value: "vector")
+        try:
+            self.assertEqual(java_to_python_cast(jpype.java.util.Vector()), "vector")
+        finally:
+            register_java_converter("java.util.Vector", _java_list_to_python)
+
+
+class TestPythonToJavaCast(unittest.TestCase):
+    class Wrapper(object):
+        def _get_java_object(self):
+            return "java object"
+
+    class Amount(decimal.Decimal):
+        pass
+
+    def test_scalars(self):
+        for value in ["Peter", 42, 4.2, True, None]:
+            self.assertIs(python_to_java_cast(value), value)
+
+    def test_java_object_protocol(self):
+        self.assertEqual(python_to_java_cast(self.Wrapper()), "java object")
+
+    def test_register_converter(self):
+        value = self.Amount("1.5")
+        self.assertIs(python_to_java_cast(value), value)
+        register_python_converter(decimal.Decimal, str)
+        try:
+            self.assertEqual(python_to_java_cast(value), "1.5")
+        finally:
+            del utils._PYTHON_TYPE_CONVERTERS[decimal.Decimal]
+            utils._python_converters_cache.clear()
+
+
+class FakeByteBuffer(object):
+    def __init__(self, data, position=0, limit=None):
+        self.data = data
+        self._position = position
+        self._limit = len(data) if limit is None else limit
+
+    def position(self):
+        return self._position
+
+    def remaining(self):
+        return self._limit - self._position
+
+    def isDirect(self):
+        return False
+
+    def hasArray(self):
+        return True
+
+    def array(self):
+        return self.data
+
+    def arrayOffset(self):
+        return 1
+
+
+class FakeDirectByteBuffer(bytearray):
+    """
+    Direct buffer of JPype, which supports buffer protocol.
+    """
+    def __init__(self, data, position=0, read_only=True):
+        super().__init__(data)
+        self._position = position
+        self._read_only = read_only
+
+    def position(self):
+        return self._position
+
+    def remaining(self):
+        return len(self) - self._position
+
+    def isDirect(self):
+        return True
+
+    def isReadOnly(self):
+        return self._read_only
+
+
+class TestBinaryConversion(unittest.TestCase):
+    def test_heap_buffer_to_python(self):
+        self.assertEqual(utils._java_byte_buffer_to_python(FakeByteBuffer(b"0abcdef", 1, 4)), b"bcd")
+
+    def test_direct_buffer_views(self):
+        read_only = FakeDirectByteBuffer(b"0abc", 1)
+        writable = FakeDirectByteBuffer(b"0abc", 1, read_only=False)
+        self.assertEqual(utils._java_byte_buffer_to_python(read_only), b"abc")
+        self.assertIsInstance(utils._java_byte_buffer_to_python(read_only), bytes)
+        utils.set_binary_views(True)
+        self.addCleanup(utils.set_binary_views, False)
+        view = utils._java_byte_buffer_to_python(read_only)
+        self.assertIsInstance(view, memoryview)
+        read_only[1] = ord("x")
+        self.assertEqual(view.tobytes(), b"xbc")
+        self.assertIsInstance(utils._java_byte_buffer_to_python(writable), bytes)
+
+    def test_signed_java_bytes(self):
+        self.assertEqual(utils._java_bytes_to_python([-1, 0, 127, -128], 1, 3), b"\x00\x7f\x80")
+
+    def test_writable_buffers_are_copied(self):
+        with mock.patch.object(utils, "jpype") as jpype_module, \
+                mock.patch.object(utils, "_java_class", return_value=mock.Mock(wrap=lambda array: array)):
+            jpype_module.JArray.return_value = lambda data: data
+            value = bytearray(b"abc")
+            java_buffer = python_to_java_cast(value)
+            value[0] = ord("x")
+            self.assertEqual(java_buffer, b"abc")
+            self.assertEqual(python_to_java_cast(memoryview(bytearray(8)).cast("d")), bytes(8))
+
+
+class TestEpochConversion(unittest.TestCase):
+    def setUp(self):
+        if not hasattr(time, "tzset"):
+            self.skipTest("time zone can't be changed")
+        self.saved_tz = os.environ.get("TZ")
+        # time zone with daylight saving time
+        os.environ["TZ"] = "Europe/Berlin"
+        time.tzset()
+        utils._local_offsets.clear()
+
+    def tearDown(self):
+        if self.saved_tz is None:
+            del os.environ["TZ"]
+        else:
+            os.environ["TZ"] = self.saved_tz
+        time.tzset()
+        utils._local_offsets.clear()
+
+    def test_local_datetime(self):
+        for seconds in [0, -1, 1445734800 - 1, 1445734800, 1445734800 + 3599, 1445738400, 1459040400, -2e9, 4e9]:
+            seconds = int(seconds)
+            self.assertEqual(utils._local_datetime(seconds * 1000 + 250),
+                             datetime.datetime.fromtimestamp(seconds) + datetime.timedelta(milliseconds=250))
+        self.assertEqual(utils._local_datetime(-1, 999999), datetime.datetime(1970, 1, 1, 0, 59, 59, 999999))
+
+    def test_round_trip(self):
+        # local times skipped at the start of daylight saving time can't round trip, its end is crossed
+        for value in [datetime.datetime(2015, 3, 29, 3, 0), datetime.datetime(2015, 10, 25, 1, 0)]:
+            for i in range(5000):
+                value += datetime.timedelta(seconds=1, milliseconds=i % 1000)
+                self.assertEqual(utils._local_datetime(utils._epoch_millis(value)), value)
+        self.assertEqual(utils._epoch_millis(datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)), 0)
+
+    def test_jvm_time_zone_with_daylight_saving_time(self):
+        time_zone = mock.Mock()
+        time_zone.getOffset.side_effect = lambda millis: time.localtime(millis // 1000).tm_gmtoff * 1000
+        with mock.patch.object(utils, "_time_zone", time_zone):
+            self.test_local_datetime()
+            self.test_round_trip()
+
+
+class FakeTimeZone(object):
+    """
+    Stand-in of java.util.TimeZone with a fixed offset.
+    """
+    def __init__(self, offset):
+        self.offset = offset
+
+    def getOffset(self, millis):
+        return self.offset * 1000
+
+
+class TestJVMTimeZone(unittest.TestCase):
+    def setUp(self):
+        utils._local_offsets.clear()
+        utils._time_zone = FakeTimeZone(5 * 3600 + 1800)
+
+    def tearDown(self):
+        utils._time_zone = None
+        utils._local_offsets.clear()
+
+    def test_offset_of_jvm_time_zone(self):
+        self.assertEqual(utils._local_datetime(250), datetime.datetime(1970, 1, 1, 5, 30, 0, 250000))
+        self.assertEqual(utils._epoch_millis(datetime.datetime(1970, 1, 1, 5, 30, 0, 250000)), 250)
+        self.assertEqual(utils._epoch_millis(datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)), 0)
+
+    def test_round_trip(self):
+        value = datetime.datetime(2015, 3, 29, 1, 0)
+        for i in range(1000):
+            value += datetime.timedelta(minutes=7, milliseconds=i % 1000)
+            self.assertEqual(utils._local_datetime(utils._epoch_millis(value)), value)
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.info(), {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "evictions": 1,
+                                        "expirations": 0, "size": 2, "maxsize": 2, "bytes": 0, "max_bytes": None})
+
+    def test_max_bytes(self):
+        cache = LRUCache(maxsize=10, max_bytes=10, sizeof=len)
+        cache.put("a", "xxxx")
+        cache.put("b", "yyyy")
+        cache.put("c", "zzzz")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "yyyy")
+        self.assertEqual(cache.info()["bytes"], 8)
+        cache.put("d", "x" * 11)
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(cache.pop("b"), "yyyy")
+        self.assertEqual(cache.info()["bytes"], 4)
+
+    def test_ttl(self):
+        now = [0.0]
+        cache = LRUCache(ttl=10, clock=lambda: now[0])
+        cache.put("a", 1)
+        cache.put("b", 2, ttl=20)
+        now[0] = 15
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(cache.info()["expirations"], 1)
+        self.assertEqual(len(cache), 1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()